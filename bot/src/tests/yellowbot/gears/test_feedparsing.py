@@ -0,0 +1,40 @@
+"""Test parse_feed_entries
+"""
+
+from unittest import TestCase
+import os
+import arrow
+
+from yellowbot.gears.feedparsing import parse_feed_entries
+
+
+class TestFeedParsing(TestCase):
+    TESTDATA_RSS_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_rssfeed_1.txt")
+    TESTDATA_YOUTUBE_FEED_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_youtube_feed.txt")
+    TESTDATA_COMMITSTRIP_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_commitstrip_1.txt")
+
+    def test_rss(self):
+        parsing_error, entries = parse_feed_entries(open(self.TESTDATA_RSS_FEED_1_FILENAME).read())
+        self.assertIsNone(parsing_error)
+        entry_id, title, link, timestamp, content = entries[0]
+        self.assertEqual("Introducing App Lab: A New Way to Distribute Oculus Quest Apps", title)
+        self.assertEqual("https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", link)
+        self.assertEqual(arrow.get("2021-02-02T19:00:00+00:00").int_timestamp, timestamp)
+        self.assertIsNone(content)
+
+    def test_rss_with_content(self):
+        _, entries = parse_feed_entries(open(self.TESTDATA_COMMITSTRIP_FEED_1_FILENAME).read())
+        self.assertEqual(10, len(entries))
+        self.assertIn('src="https://www.commitstrip.com/wp-content/uploads/2021/02/', entries[0][4])
+
+    def test_youtube_published(self):
+        _, entries = parse_feed_entries(open(self.TESTDATA_YOUTUBE_FEED_FILENAME).read(), True)
+        self.assertTrue(len(entries) > 0)
+        for entry in entries:
+            self.assertIsNotNone(entry[0])
+            self.assertIsNotNone(entry[3])
+
+    def test_invalid_feed(self):
+        parsing_error, entries = parse_feed_entries("this is not a feed")
+        self.assertIsNotNone(parsing_error)
+        self.assertEqual(0, len(entries))
@@ -0,0 +1,96 @@
+"""
+Test HostCircuitBreaker class
+"""
+
+from unittest import TestCase
+import arrow
+
+from yellowbot.gears.hostcircuitbreaker import HostCircuitBreaker
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+
+
+class TestHostCircuitBreaker(TestCase):
+    def test_open_after_failures(self):
+        breaker = HostCircuitBreaker(2, 30)
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+        breaker.record_failure("https://down.com/feed/", "ConnectionError")
+        self.assertTrue(breaker.allow_request("https://down.com/rss/"))
+        self.assertEqual(0, len(breaker.pop_messages()))
+
+        breaker.record_failure("https://down.com/rss/", "HTTP 503")
+        self.assertFalse(breaker.allow_request("https://down.com/feed/"))
+        # Other hosts are not affected
+        self.assertTrue(breaker.allow_request("https://up.com/feed/"))
+        self.assertEqual(["down.com"], breaker.get_open_hosts())
+        messages = breaker.pop_messages()
+        self.assertEqual(1, len(messages))
+        self.assertTrue(messages[0].startswith("Host down.com failed 2 times in a row (HTTP 503)"))
+        self.assertEqual(0, len(breaker.pop_messages()))
+
+        host_circuits = breaker.get_changed_host_circuits()
+        self.assertEqual(1, len(host_circuits))
+        self.assertEqual("down.com", host_circuits[0].host)
+        self.assertEqual(2, host_circuits[0].failures)
+        self.assertTrue(arrow.get(host_circuits[0].open_until) > arrow.utcnow().shift(minutes=29))
+
+    def test_probe_after_cooldown(self):
+        host_circuit = HostCircuitEntity()
+        host_circuit.host = "down.com"
+        host_circuit.failures = 3
+        host_circuit.open_until = arrow.utcnow().shift(minutes=-1).datetime
+        breaker = HostCircuitBreaker(3, 30, [host_circuit])
+
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+
+        # Probe fails, host paused again
+        breaker.record_failure("https://down.com/feed/", "ConnectTimeout")
+        self.assertFalse(breaker.allow_request("https://down.com/feed/"))
+        self.assertEqual(4, host_circuit.failures)
+        breaker.pop_messages()
+
+        # Probe succeeds, host back to normal
+        host_circuit.open_until = arrow.utcnow().shift(minutes=-1).datetime
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+        breaker.record_success("https://down.com/feed/")
+        self.assertTrue(breaker.allow_request("https://down.com/rss/"))
+        self.assertEqual(0, host_circuit.failures)
+        self.assertIsNone(host_circuit.open_until)
+        self.assertEqual(0, len(breaker.get_open_hosts()))
+        self.assertEqual(
+            ["Host down.com is reachable again, its news sources are checked as usual"],
+            breaker.pop_messages())
+
+    def test_failures_while_open(self):
+        # Requests already sent when the breaker opens fail too
+        breaker = HostCircuitBreaker(3, 30)
+        for _ in range(6):
+            breaker.record_failure("https://down.com/feed/", "ConnectTimeout")
+        self.assertEqual(1, len(breaker.pop_messages()))
+        self.assertEqual(6, breaker.get_changed_host_circuits()[0].failures)
+
+    def test_single_probe(self):
+        host_circuit = HostCircuitEntity()
+        host_circuit.host = "down.com"
+        host_circuit.failures = 3
+        host_circuit.open_until = arrow.utcnow().shift(minutes=-1).datetime
+        breaker = HostCircuitBreaker(3, 30, [host_circuit])
+
+        self.assertFalse(breaker.is_paused("https://down.com/feed/"))
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+        # Only one request probes the host
+        self.assertTrue(breaker.is_paused("https://down.com/rss/"))
+        self.assertFalse(breaker.allow_request("https://down.com/rss/"))
+
+        # The probe was not sent, another request can probe the host
+        breaker.cancel_request("https://down.com/feed/")
+        self.assertTrue(breaker.allow_request("https://down.com/rss/"))
+        self.assertFalse(breaker.allow_request("https://down.com/feed/"))
+        breaker.record_success("https://down.com/rss/")
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+        self.assertTrue(breaker.allow_request("https://down.com/feed/"))
+
+    def test_success_without_failures(self):
+        breaker = HostCircuitBreaker(3, 30)
+        breaker.record_success("https://up.com/feed/")
+        # Nothing to save for healthy hosts
+        self.assertEqual(0, len(breaker.get_changed_host_circuits()))
@@ -0,0 +1,41 @@
+"""
+Test NewsCheckContext class
+"""
+
+from unittest import TestCase
+import time
+
+from yellowbot.gears.hostcircuitbreaker import HostCircuitBreaker
+from yellowbot.gears.newscheckcontext import NewsCheckContext
+
+
+class TestNewsCheckContext(TestCase):
+    def test_deadline(self):
+        self.assertIsNone(NewsCheckContext().get_remaining_time())
+        self.assertIsNone(NewsCheckContext.with_deadline(0).get_remaining_time())
+        remaining_time = NewsCheckContext.with_deadline(10).get_remaining_time()
+        self.assertTrue(9 < remaining_time <= 10)
+        # Never negative
+        self.assertEqual(0, NewsCheckContext(time.monotonic() - 1).get_remaining_time())
+
+    def test_skipped_and_deferred_news_sources(self):
+        check_context = NewsCheckContext()
+        check_context.add_skipped_news_source("http://b")
+        check_context.add_skipped_news_source("http://a")
+        check_context.add_deferred_news_source("https://www.youtube.com/channel/UC1")
+        self.assertEqual(["http://a", "http://b"], check_context.get_skipped_news_sources())
+        self.assertEqual(["https://www.youtube.com/channel/UC1"], check_context.get_deferred_news_sources())
+
+    def test_checks_are_independent(self):
+        first_context = NewsCheckContext.with_deadline(10)
+        first_context.set_host_circuit_breaker(HostCircuitBreaker(1, 60, []))
+        first_context.add_skipped_news_source("http://a")
+        first_context.get_host_circuit_breaker().record_failure("http://a/feed", "HTTP 503")
+
+        second_context = NewsCheckContext()
+        self.assertIsNone(second_context.get_remaining_time())
+        self.assertIsNone(second_context.get_host_circuit_breaker())
+        self.assertEqual([], second_context.get_skipped_news_sources())
+        second_context.set_host_circuit_breaker(HostCircuitBreaker(1, 60, []))
+        self.assertTrue(second_context.get_host_circuit_breaker().allow_request("http://a/feed"))
+        self.assertFalse(first_context.get_host_circuit_breaker().allow_request("http://a/feed"))
@@ -0,0 +1,30 @@
+"""
+Test NewsRecord class
+"""
+
+from unittest import TestCase
+
+from yellowbot.gears.newsrecord import NewsRecord
+
+
+class TestNewsRecord(TestCase):
+    def test_to_message(self):
+        record = NewsRecord("https://www.youtube.com/channel/abc", "A video", "https://www.youtube.com/watch?v=1", 1612293304, NewsRecord.KIND_VIDEO)
+        self.assertEqual("New video published: A video - https://www.youtube.com/watch?v=1", record.to_message())
+        record = NewsRecord("https://www.home-assistant.io/atom.xml", "An article", "https://www.home-assistant.io/blog/1")
+        self.assertEqual(NewsRecord.KIND_ARTICLE, record.kind)
+        self.assertEqual("New article published: An article - https://www.home-assistant.io/blog/1", record.to_message())
+        record = NewsRecord("http://www.commitstrip.com/en/feed/", "A strip", "https://www.commitstrip.com/1.jpg", 0, NewsRecord.KIND_COMMITSTRIP)
+        self.assertEqual("New CommitStrip content: A strip - https://www.commitstrip.com/1.jpg", record.to_message())
+
+    def test_error(self):
+        record = NewsRecord.error("http://ciao.me", "Something went wrong")
+        self.assertTrue(record.is_error())
+        self.assertEqual("http://ciao.me", record.source)
+        self.assertEqual("Something went wrong", record.to_message())
+
+    def test_slots(self):
+        record = NewsRecord("http://ciao.me", "Title", "http://ciao.me/1")
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(AttributeError):
+            record.another_field = "value"
@@ -7,23 +7,41 @@ Unfortunately, PyTest fixtures feature do not work when pytest is used in unitte
 Source: https://docs.pytest.org/en/stable/unittest.html#pytest-features-in-unittest-testcase-subclasses
 """
 
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+import asyncio
+import hmac
+import time
 from unittest import TestCase
+from urllib.parse import parse_qs, urlparse
 import responses
+import json
 import os
+import tempfile
 import arrow
 import pytest
 
+from yellowbot.gears.newscheckcontext import NewsCheckContext
+from yellowbot.gears.newsrecord import NewsRecord
 from yellowbot.gears.newsreportergear import NewsReportGear
+from yellowbot.gears.streamingfeedparser import StreamingFeedParser
+from yellowbot.gears.youtubequotaledger import YouTubeQuotaExceededError, YouTubeQuotaLedger
 from yellowbot.globalbag import GlobalBag
+from yellowbot.httpcacheservice import HttpCacheService
 from yellowbot.storage.basestorageservice import BaseStorageService
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
 from yellowbot.storage.newsitementity import NewsItemEntity
+from yellowbot.storage.youtubequotaentity import YouTubeQuotaEntity
 from yellowbot.gears.gearexecutionresult import GearExecutionResult
+from tests.yellowbot.storage.fakestorageservice import FakeStorageService
 
 # https://docs.pytest.org/en/stable/warnings.html#deprecationwarning-and-pendingdeprecationwarning
 @pytest.mark.filterwarnings("ignore:To avoid breaking existing software while fixing issue 310.*:DeprecationWarning")
 class TestNewsReportGear(TestCase):
     TESTDATA_YOUTUBE_CHANNEL_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_youtube_channel.txt")
     TESTDATA_YOUTUBE_PLAYLIST_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_youtube_playlist.txt")
+    TESTDATA_YOUTUBE_FEED_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_youtube_feed.txt")
     TESTDATA_RSS_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_rssfeed_1.txt")
     TESTDATA_ATOM_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_atom_1.txt")
     TESTDATA_COMMITSTRIP_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_commitstrip_1.txt")
@@ -80,27 +98,27 @@ class TestNewsReportGear(TestCase):
         item = results[0]
         self.assertEqual('https://www.youtube.com/watch?v=WFeny7l1Ev4', item.url)
         self.assertEqual('The 7 Types of VR Users 2', item.title)
-        self.assertEqual('2021-02-02T19:15:04Z', item.published)
+        self.assertEqual(arrow.get('2021-02-02T19:15:04Z').int_timestamp, item.published)
 
         item = results[1]
         self.assertEqual('https://www.youtube.com/watch?v=veVx0AuhHFw', item.url)
         self.assertEqual('Valve\'s next VR projects are SCARILY similar to Sword Art Online', item.title)
-        self.assertEqual('2021-01-27T20:00:10Z', item.published)
+        self.assertEqual(arrow.get('2021-01-27T20:00:10Z').int_timestamp, item.published)
 
         item = results[2]
         self.assertEqual('https://www.youtube.com/watch?v=lILlWMLTn0c', item.url)
         self.assertEqual('What Happened to my Valve Index After 2000 Hours?', item.title)
-        self.assertEqual('2021-01-23T19:15:01Z', item.published)
+        self.assertEqual(arrow.get('2021-01-23T19:15:01Z').int_timestamp, item.published)
 
         item = results[3]
         self.assertEqual('https://www.youtube.com/watch?v=EzHjucDrNsY', item.url)
         self.assertEqual('The Oculus Quest 2 gets a HUGE Update for QoL', item.title)
-        self.assertEqual('2021-01-19T19:35:57Z', item.published)
+        self.assertEqual(arrow.get('2021-01-19T19:35:57Z').int_timestamp, item.published)
 
         item = results[4]
         self.assertEqual('https://www.youtube.com/watch?v=PIIXyfuxOcU', item.url)
         self.assertEqual('CES 2021 brings INSANE new VR Technology', item.title)
-        self.assertEqual('2021-01-12T19:13:35Z', item.published)
+        self.assertEqual(arrow.get('2021-01-12T19:13:35Z').int_timestamp, item.published)
 
     @responses.activate
     def test_youtube_analize_channel(self):
@@ -129,21 +147,26 @@ class TestNewsReportGear(TestCase):
         )
         # There are no videos for current data, as all the mock data refers to past vides
         self.assertEqual(0, len(new_videos))
+        # But all the videos are now seen ones
+        self.assertEqual(10, len(news_item.seen_ids))
 
+        # Dates are used only for channels without seen videos
+        news_item.seen_ids = None
         new_videos = self._gear._youtube_analize_channel(
             news_item,
             arrow.get("2021-02-02T00:15:04Z")
         )
         self.assertEqual(1, len(new_videos))
-        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0])
+        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0].to_message())
 
+        news_item.seen_ids = None
         new_videos = self._gear._youtube_analize_channel(
             news_item,
             arrow.get("2021-01-26T10:00:10Z")
         )
         self.assertEqual(2, len(new_videos))
-        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0])
-        self.assertEqual("New video published: Valve's next VR projects are SCARILY similar to Sword Art Online - https://www.youtube.com/watch?v=veVx0AuhHFw", new_videos[1])
+        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0].to_message())
+        self.assertEqual("New video published: Valve's next VR projects are SCARILY similar to Sword Art Online - https://www.youtube.com/watch?v=veVx0AuhHFw", new_videos[1].to_message())
 
     @responses.activate
     def test_rss_analize_feed_rss(self):
@@ -168,17 +191,17 @@ class TestNewsReportGear(TestCase):
             arrow.get("2021-02-01T08:00:10Z")
         )
         self.assertEqual(1, len(new_feeds))
-        self.assertEqual("New article published: Introducing App Lab: A New Way to Distribute Oculus Quest Apps - https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", new_feeds[0])
+        self.assertEqual("New article published: Introducing App Lab: A New Way to Distribute Oculus Quest Apps - https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", new_feeds[0].to_message())
 
         new_feeds = self._gear._rss_analize_feed(
             "https://developer.oculus.com/blog/rss/",
             arrow.get("2021-01-20T08:00:10Z")
         )
         self.assertEqual(4, len(new_feeds))
-        self.assertEqual("New article published: Introducing App Lab: A New Way to Distribute Oculus Quest Apps - https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", new_feeds[0])
-        self.assertEqual("New article published: Art Direction for All-in-One VR Performance - https://developer.oculus.com/blog/art-direction-for-all-in-one-vr-performance/", new_feeds[1])
-        self.assertEqual("New article published: Verify Your Oculus Developer Account by February 1 - https://developer.oculus.com/blog/verify-your-oculus-developer-account-by-february-1/", new_feeds[2])
-        self.assertEqual("New article published: Now Available: VR Locomotion Design Guide - https://developer.oculus.com/blog/now-available-vr-locomotion-design-guide/", new_feeds[3])
+        self.assertEqual("New article published: Introducing App Lab: A New Way to Distribute Oculus Quest Apps - https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", new_feeds[0].to_message())
+        self.assertEqual("New article published: Art Direction for All-in-One VR Performance - https://developer.oculus.com/blog/art-direction-for-all-in-one-vr-performance/", new_feeds[1].to_message())
+        self.assertEqual("New article published: Verify Your Oculus Developer Account by February 1 - https://developer.oculus.com/blog/verify-your-oculus-developer-account-by-february-1/", new_feeds[2].to_message())
+        self.assertEqual("New article published: Now Available: VR Locomotion Design Guide - https://developer.oculus.com/blog/now-available-vr-locomotion-design-guide/", new_feeds[3].to_message())
 
     @responses.activate
     def test_rss_analize_feed_atom(self):
@@ -203,25 +226,25 @@ class TestNewsReportGear(TestCase):
             arrow.get("2021-02-11T00:00:00+00:00")
         )
         self.assertEqual(1, len(new_feeds))
-        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0])
+        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0].to_message())
 
         new_feeds = self._gear._rss_analize_feed(
             "https://www.home-assistant.io/atom.xml",
             arrow.get("2021-02-02T00:00:00+00:00")
         )
         self.assertEqual(2, len(new_feeds))
-        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0])
-        self.assertEqual("New article published: 2021.2: Z-Wave... JS! - https://www.home-assistant.io/blog/2021/02/03/release-20212/", new_feeds[1])
+        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0].to_message())
+        self.assertEqual("New article published: 2021.2: Z-Wave... JS! - https://www.home-assistant.io/blog/2021/02/03/release-20212/", new_feeds[1].to_message())
 
         new_feeds = self._gear._rss_analize_feed(
             "https://www.home-assistant.io/atom.xml",
             arrow.get("2021-01-22T00:00:00+00:00")
         )
         self.assertEqual(4, len(new_feeds))
-        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0])
-        self.assertEqual("New article published: 2021.2: Z-Wave... JS! - https://www.home-assistant.io/blog/2021/02/03/release-20212/", new_feeds[1])
-        self.assertEqual("New article published: Security Disclosure 2: vulnerabilities in custom integrations HACS, Font Awesome and others - https://www.home-assistant.io/blog/2021/01/23/security-disclosure2/", new_feeds[2])
-        self.assertEqual("New article published: Disclosure: security vulnerabilities in custom integrations HACS, Dwains Dashboard, Font Awesome and others - https://www.home-assistant.io/blog/2021/01/22/security-disclosure/", new_feeds[3])
+        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0].to_message())
+        self.assertEqual("New article published: 2021.2: Z-Wave... JS! - https://www.home-assistant.io/blog/2021/02/03/release-20212/", new_feeds[1].to_message())
+        self.assertEqual("New article published: Security Disclosure 2: vulnerabilities in custom integrations HACS, Font Awesome and others - https://www.home-assistant.io/blog/2021/01/23/security-disclosure2/", new_feeds[2].to_message())
+        self.assertEqual("New article published: Disclosure: security vulnerabilities in custom integrations HACS, Dwains Dashboard, Font Awesome and others - https://www.home-assistant.io/blog/2021/01/22/security-disclosure/", new_feeds[3].to_message())
 
     @responses.activate
     def test_rss_analize_feed_commitstrip(self):
@@ -246,17 +269,17 @@ class TestNewsReportGear(TestCase):
             arrow.get("2021-02-01T08:00:10Z")
         )
         self.assertEqual(1, len(new_feeds))
-        self.assertEqual("New CommitStrip content: A theory about PHP - https://www.commitstrip.com/wp-content/uploads/2021/02/Stripo-Cest-lhistoire-de-PHP-et-React-800-finalenglish.jpg", new_feeds[0])
+        self.assertEqual("New CommitStrip content: A theory about PHP - https://www.commitstrip.com/wp-content/uploads/2021/02/Stripo-Cest-lhistoire-de-PHP-et-React-800-finalenglish.jpg", new_feeds[0].to_message())
 
         new_feeds = self._gear._rss_analize_feed(
             "http://www.commitstrip.com/en/feed/",
             arrow.get("2020-10-06T08:00:10Z")
         )
         self.assertEqual(4, len(new_feeds))
-        self.assertEqual("New CommitStrip content: A theory about PHP - https://www.commitstrip.com/wp-content/uploads/2021/02/Stripo-Cest-lhistoire-de-PHP-et-React-800-finalenglish.jpg", new_feeds[0])
-        self.assertEqual("New CommitStrip content: The best bet for 2030 - https://www.commitstrip.com/wp-content/uploads/2020/12/Strip-Top-langage-web-650-finalenglish.jpg", new_feeds[1])
-        self.assertEqual("New CommitStrip content: Weird bots - https://www.commitstrip.com/wp-content/uploads/2020/10/Strip-Drole-de-bot-650-finalenglish.jpg", new_feeds[2])
-        self.assertEqual("New CommitStrip content: The ‘no-code’ dream&#8230; - https://www.commitstrip.com/wp-content/uploads/2020/10/Strip-PM-et-le-Nocode650-finalenglish.jpg", new_feeds[3])
+        self.assertEqual("New CommitStrip content: A theory about PHP - https://www.commitstrip.com/wp-content/uploads/2021/02/Stripo-Cest-lhistoire-de-PHP-et-React-800-finalenglish.jpg", new_feeds[0].to_message())
+        self.assertEqual("New CommitStrip content: The best bet for 2030 - https://www.commitstrip.com/wp-content/uploads/2020/12/Strip-Top-langage-web-650-finalenglish.jpg", new_feeds[1].to_message())
+        self.assertEqual("New CommitStrip content: Weird bots - https://www.commitstrip.com/wp-content/uploads/2020/10/Strip-Drole-de-bot-650-finalenglish.jpg", new_feeds[2].to_message())
+        self.assertEqual("New CommitStrip content: The ‘no-code’ dream&#8230; - https://www.commitstrip.com/wp-content/uploads/2020/10/Strip-PM-et-le-Nocode650-finalenglish.jpg", new_feeds[3].to_message())
 
     @responses.activate
     def test_simulate_error_in_request(self):
@@ -277,7 +300,7 @@ class TestNewsReportGear(TestCase):
         )
 
         self.assertEqual(1, len(new_feeds))
-        self.assertEqual("Error while getting RSS feed information from http://www.commitstrip.com/en/feed/", new_feeds[0])
+        self.assertEqual("Error while getting RSS feed information from http://www.commitstrip.com/en/feed/", new_feeds[0].to_message())
 
     @responses.activate
     def test_find_latest_news(self):
@@ -290,3 +313,962 @@ class TestNewsReportGear(TestCase):
         new_news = self._gear._find_latest_news(False)
         self.assertEqual(1, len(new_news))
         self.assertEqual("No recent news available", new_news[0])
+
+    @responses.activate
+    def test_find_latest_news_with_workers(self):
+        testdata1 = open(self.TESTDATA_ATOM_1_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = testdata1,
+            status = 200,
+            content_type='application/xml'
+        )
+        responses.add(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            body = "",
+            status = 404,
+            content_type="application/xml"
+        )
+        newssources_urls = [
+            "http://ciao.me",
+            "https://www.home-assistant.io/atom.xml",
+            "http://www.commitstrip.com/en/feed/",
+            "http://ciao.you",
+        ]
+
+        # Same result, in the same order, regardless of the number of workers
+        sequential_gear = NewsReportGear(self._youtube_key, newssources_urls, BaseStorageService())
+        parallel_gear = NewsReportGear(self._youtube_key, newssources_urls, BaseStorageService(), 4)
+        sequential_news = sequential_gear._find_latest_news(True)
+        parallel_news = parallel_gear._find_latest_news(True)
+        self.assertEqual(sequential_news, parallel_news)
+        self.assertEqual(3, len(parallel_news))
+        self.assertEqual("I don't know how to process the source http://ciao.me", parallel_news[0])
+        self.assertEqual("Error while getting RSS feed information from http://www.commitstrip.com/en/feed/", parallel_news[1])
+        self.assertEqual("I don't know how to process the source http://ciao.you", parallel_news[2])
+
+    def test_find_latest_news_asyncio(self):
+        testdata1 = open(self.TESTDATA_YOUTUBE_CHANNEL_FILENAME).read()
+        testdata2 = open(self.TESTDATA_YOUTUBE_PLAYLIST_FILENAME).read()
+        requested_urls = []
+
+        async def fake_http_get_async(session, url, headers=None, check_context=None):
+            # Replaces the aiohttp call with test data
+            requested_urls.append(url)
+            if url.startswith("https://youtube.googleapis.com/youtube/v3/channels?"):
+                return SimpleNamespace(status=200, headers={}, text=testdata1)
+            elif url.startswith("https://youtube.googleapis.com/youtube/v3/playlistItems?"):
+                return SimpleNamespace(status=200, headers={}, text=testdata2)
+            raise ValueError("404 Not Found for url {}".format(url))
+
+        newssources_urls = [
+            "https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA",
+            "http://ciao.me",
+            "http://www.commitstrip.com/en/feed/",
+        ]
+        gear = NewsReportGear(
+            self._youtube_key,
+            newssources_urls,
+            BaseStorageService(),
+            fetch_mode=NewsReportGear.FETCH_MODE_ASYNCIO)
+        gear._http_get_async = fake_http_get_async
+
+        new_news = gear._find_latest_news(True)
+        # Mock videos are too old to be reported
+        self.assertEqual(2, len(new_news))
+        self.assertEqual("I don't know how to process the source http://ciao.me", new_news[0])
+        self.assertEqual("Error while getting RSS feed information from http://www.commitstrip.com/en/feed/", new_news[1])
+        # Upload playlist id is derived from the channel id, no channel call
+        self.assertEqual(2, len(requested_urls))
+        self.assertIn(
+            'https://youtube.googleapis.com/youtube/v3/playlistItems?part=snippet&maxResults=5&playlistId=UUSbdMXOI_3HGiFviLZO6kNA&key=mock_youtube_key',
+            requested_urls)
+
+        # The same entry point is used, regardless of the fetch mode
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {})
+        self.assertTrue(result.went_well())
+        self.assertEqual(2, len(result.get_messages()))
+
+    @responses.activate
+    def test_rss_analize_feed_conditional_get(self):
+        testdata1 = open(self.TESTDATA_ATOM_1_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = testdata1,
+            status = 200,
+            content_type='application/xml',
+            headers = {"ETag": '"5f2b-etag"', "Last-Modified": "Sat, 13 Feb 2021 19:35:34 GMT"}
+        )
+
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.home-assistant.io/atom.xml"
+        new_feeds = self._gear._rss_analize_feed(
+            news_item.url,
+            arrow.get("2021-02-11T00:00:00+00:00"),
+            news_item
+        )
+        self.assertEqual(1, len(new_feeds))
+        self.assertNotIn("If-None-Match", responses.calls[0].request.headers)
+        self.assertEqual('"5f2b-etag"', news_item.etag)
+        self.assertEqual("Sat, 13 Feb 2021 19:35:34 GMT", news_item.last_modified)
+
+        # Now the server says the feed hasn't changed
+        responses.replace(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = "",
+            status = 304
+        )
+        new_feeds = self._gear._rss_analize_feed(
+            news_item.url,
+            arrow.get("2021-02-11T00:00:00+00:00"),
+            news_item
+        )
+        self.assertEqual(0, len(new_feeds))
+        self.assertEqual('"5f2b-etag"', responses.calls[1].request.headers["If-None-Match"])
+        self.assertEqual("Sat, 13 Feb 2021 19:35:34 GMT", responses.calls[1].request.headers["If-Modified-Since"])
+        # Validators are kept for the next request
+        self.assertEqual('"5f2b-etag"', news_item.etag)
+
+    @responses.activate
+    def test_rss_analize_feed_validators_after_error(self):
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = "",
+            status = 200,
+            content_type='application/xml',
+            headers = {"ETag": '"broken-etag"', "Last-Modified": "Sat, 13 Feb 2021 19:35:34 GMT"}
+        )
+
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.home-assistant.io/atom.xml"
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(1, len(new_feeds))
+        self.assertTrue(new_feeds[0].is_error())
+        # Otherwise the next check gets a 304, and the entries are lost
+        self.assertIsNone(getattr(news_item, "etag", None))
+        self.assertIsNone(getattr(news_item, "last_modified", None))
+
+        responses.replace(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = open(self.TESTDATA_ATOM_1_FILENAME).read(),
+            status = 200,
+            content_type='application/xml',
+            headers = {"ETag": '"5f2b-etag"'}
+        )
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(1, len(new_feeds))
+        self.assertNotIn("If-None-Match", responses.calls[1].request.headers)
+        self.assertEqual('"5f2b-etag"', news_item.etag)
+
+    @responses.activate
+    def test_find_latest_news_bulk_storage(self):
+        responses.add(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            body = "",
+            status = 304
+        )
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = "",
+            status = 304
+        )
+        storage = FakeStorageService()
+        news_item = NewsItemEntity()
+        news_item.url = "http://www.commitstrip.com/en/feed/"
+        news_item.last_check = arrow.get("2021-02-01T08:00:10Z").datetime
+        storage.put(news_item)
+        storage.calls.clear()
+
+        gear = NewsReportGear(
+            self._youtube_key,
+            ["http://www.commitstrip.com/en/feed/", "http://ciao.me", "https://www.home-assistant.io/atom.xml"],
+            storage)
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(1, len(new_news))
+        # One read for all the sources, then a save for each checked source,
+        #  because the storage uses the generic put_multi implementation
+        self.assertEqual({"get_all": 1, "put": 2}, storage.calls)
+        self.assertEqual(2, len(storage.entities))
+        self.assertTrue(arrow.get(storage.entities[news_item.id].last_check) > arrow.get("2021-02-01T08:00:10Z"))
+        self.assertEqual(1, len(storage.get_by_property(NewsItemEntity, "url", "=", "https://www.home-assistant.io/atom.xml")))
+
+        # With native batch support, all the entities are saved at once
+        batches = []
+        storage.put_multi = lambda entities: batches.append(list(entities))
+        storage.calls.clear()
+        gear._find_latest_news(True)
+        self.assertEqual({"get_all": 1}, storage.calls)
+        self.assertEqual(1, len(batches))
+        self.assertEqual(2, len(batches[0]))
+
+    @responses.activate
+    def test_find_latest_news_adaptive_polling(self):
+        responses.add(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            body = "",
+            status = 304
+        )
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = "",
+            status = 404
+        )
+        storage = FakeStorageService()
+        gear = NewsReportGear(
+            self._youtube_key,
+            ["http://www.commitstrip.com/en/feed/", "https://www.home-assistant.io/atom.xml"],
+            storage,
+            min_check_interval=60,
+            max_check_interval=240)
+
+        # First check, all the sources are new
+        gear._find_latest_news(True)
+        self.assertEqual(2, len(responses.calls))
+        commitstrip = storage.get_by_property(NewsItemEntity, "url", "=", "http://www.commitstrip.com/en/feed/")[0]
+        homeassistant = storage.get_by_property(NewsItemEntity, "url", "=", "https://www.home-assistant.io/atom.xml")[0]
+        # Nothing known on the cadence yet, the min interval is used
+        self.assertEqual(60, commitstrip.check_interval)
+        self.assertEqual(
+            arrow.get(commitstrip.last_check).shift(minutes=60),
+            arrow.get(commitstrip.next_check))
+        self.assertEqual(60, homeassistant.check_interval)
+
+        # No source is due
+        gear._find_latest_news(True)
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(["No recent news available"], gear._find_latest_news(False))
+
+        # Only the source whose next check is in the past is checked
+        homeassistant.next_check = arrow.utcnow().shift(minutes=-1).datetime
+        storage.put(homeassistant)
+        gear._find_latest_news(True)
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual("https://www.home-assistant.io/atom.xml", responses.calls[2].request.url)
+
+        # Forcing the check, all the sources are checked
+        gear._find_latest_news(True, True)
+        gear._find_latest_news(True, True)
+        self.assertEqual(7, len(responses.calls))
+
+        # The force param is read from the intent
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {GlobalBag.CHECKFORNEWS_PARAM_FORCE: True})
+        self.assertTrue(result.went_well())
+        self.assertEqual(9, len(responses.calls))
+
+    def test_schedule_next_check(self):
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), min_check_interval=60, max_check_interval=1440)
+        last_check = arrow.get("2021-02-11T12:00:00+00:00")
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.home-assistant.io/atom.xml"
+        news_item.last_check = last_check.datetime
+
+        def records(*hours_ago):
+            return [
+                NewsRecord(news_item.url, "Title", "https://link", last_check.shift(hours=-hours).int_timestamp)
+                for hours in hours_ago
+            ]
+
+        # Entries every two hours, the interval moves halfway towards the gap
+        gear._schedule_next_check(news_item, records(6, 8, 10))
+        self.assertEqual(90, news_item.check_interval)
+        self.assertEqual(last_check.shift(hours=-6).datetime, news_item.last_entry_date)
+        self.assertEqual(last_check.shift(minutes=90).datetime, news_item.next_check)
+
+        # Nothing new, and errors are not entries: the interval grows towards
+        #  the time passed since the newest entry
+        last_check = last_check.shift(minutes=90)
+        news_item.last_check = last_check.datetime
+        gear._schedule_next_check(news_item, [NewsRecord.error(news_item.url, "Error")])
+        self.assertEqual((90 + 450) // 2, news_item.check_interval)
+        self.assertEqual(last_check.shift(hours=-7, minutes=-30).datetime, news_item.last_entry_date)
+
+        # The gap with the newest entry of previous checks counts too
+        gear._schedule_next_check(news_item, records(1))
+        self.assertEqual((270 + 390) // 2, news_item.check_interval)
+
+        # A burst of entries, or a long silence, stay within the bounds
+        gear._schedule_next_check(news_item, records(0.1, 0.2, 0.3, 0.4))
+        self.assertEqual((330 + 6) // 2, news_item.check_interval)
+        gear._schedule_next_check(news_item, records(0.1, 0.2, 0.3, 0.4))
+        gear._schedule_next_check(news_item, records(0.1, 0.2, 0.3, 0.4))
+        self.assertEqual(60, news_item.check_interval)
+        news_item.last_check = last_check.shift(days=30).datetime
+        gear._schedule_next_check(news_item, [])
+        self.assertEqual(1440, news_item.check_interval)
+
+    @responses.activate
+    def test_find_latest_news_circuit_breaker(self):
+        responses.add(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            body = "",
+            status = 503
+        )
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = "",
+            status = 304
+        )
+        storage = FakeStorageService()
+        newssources_urls = ["http://www.commitstrip.com/en/feed/", "https://www.home-assistant.io/atom.xml"]
+        gear = NewsReportGear(self._youtube_key, newssources_urls, storage, breaker_failure_threshold=2)
+
+        # First failure, reported as usual
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(["Error while getting RSS feed information from http://www.commitstrip.com/en/feed/"], new_news)
+        self.assertEqual(2, len(responses.calls))
+
+        # Second failure, the host is paused
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(2, len(new_news))
+        self.assertTrue(new_news[1].startswith("Host www.commitstrip.com failed 2 times in a row (HTTP 503)"))
+        self.assertEqual(4, len(responses.calls))
+        # The state of the host survives across checks
+        host_circuits = storage.get_all(HostCircuitEntity)
+        self.assertEqual(1, len(host_circuits))
+        self.assertIsNotNone(host_circuits[0].open_until)
+
+        # The paused host is not contacted anymore, and no error is reported
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(0, len(new_news))
+        self.assertEqual(5, len(responses.calls))
+        self.assertEqual("https://www.home-assistant.io/atom.xml", responses.calls[4].request.url)
+        result = gear.process_intent(GlobalBag.NEWSSOURCES_INTENT, {})
+        self.assertTrue(result.get_plan_message().endswith("Hosts currently paused because of errors: www.commitstrip.com"))
+
+        # After the cool-down, the host is probed and it's back
+        host_circuits[0].open_until = arrow.utcnow().shift(minutes=-1).datetime
+        storage.put(host_circuits[0])
+        responses.replace(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            body = "",
+            status = 304
+        )
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(["Host www.commitstrip.com is reachable again, its news sources are checked as usual"], new_news)
+        self.assertEqual(7, len(responses.calls))
+        self.assertEqual(0, storage.get_all(HostCircuitEntity)[0].failures)
+
+    @responses.activate
+    def test_find_latest_news_deadline(self):
+        def slow_callback(request):
+            time.sleep(1.1)
+            return (304, {}, "")
+        responses.add_callback(
+            responses.GET,
+            "http://www.commitstrip.com/en/feed/",
+            callback=slow_callback
+        )
+        newssources_urls = [
+            "http://www.commitstrip.com/en/feed/",
+            "https://www.home-assistant.io/atom.xml",
+            "https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA"
+        ]
+        gear = NewsReportGear(self._youtube_key, newssources_urls, BaseStorageService(), read_timeout=30)
+
+        # No deadline, requests use the configured timeouts
+        self.assertEqual((5, 30), gear._request_timeout())
+
+        # The first source uses all the time, the others are skipped
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {GlobalBag.CHECKFORNEWS_PARAM_DEADLINE: 1})
+        self.assertTrue(result.went_well())
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(
+            ["Time is up, these news sources will be checked next time: https://www.home-assistant.io/atom.xml, https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA"],
+            result.get_messages())
+        # The deadline applies only to the check
+        self.assertEqual((5, 30), gear._request_timeout())
+        self.assertEqual((5, 30), gear._request_timeout(NewsCheckContext.with_deadline(0)))
+
+        # Once the deadline is expired, no more requests are sent
+        self.assertRaises(TimeoutError, gear._request_timeout, NewsCheckContext(time.monotonic() - 1))
+
+        # Timeouts are never longer than the time left
+        connect_timeout, read_timeout = gear._request_timeout(NewsCheckContext.with_deadline(10))
+        self.assertEqual(5, connect_timeout)
+        self.assertTrue(9 < read_timeout <= 10)
+
+    def test_find_latest_news_asyncio_deadline(self):
+        async def slow_http_get_async(session, url, headers=None, check_context=None):
+            await asyncio.sleep(5)
+            return SimpleNamespace(status=304, headers={}, text="")
+
+        newssources_urls = ["http://www.commitstrip.com/en/feed/", "https://www.home-assistant.io/atom.xml"]
+        gear = NewsReportGear(
+            self._youtube_key,
+            newssources_urls,
+            BaseStorageService(),
+            fetch_mode=NewsReportGear.FETCH_MODE_ASYNCIO,
+            check_deadline=1)
+        gear._http_get_async = slow_http_get_async
+
+        # The deadline comes from the gear configuration
+        start_time = time.monotonic()
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {})
+        self.assertTrue(time.monotonic() - start_time < 3)
+        self.assertEqual(
+            ["Time is up, these news sources will be checked next time: http://www.commitstrip.com/en/feed/, https://www.home-assistant.io/atom.xml"],
+            result.get_messages())
+
+    def test_merge_news_records(self):
+        news_records = [
+            NewsRecord("https://www.youtube.com/channel/a", "Video", "https://www.youtube.com/watch?v=1", 10, NewsRecord.KIND_VIDEO),
+            NewsRecord.error("http://ciao.me", "Error 1"),
+            NewsRecord("https://www.home-assistant.io/atom.xml", "Article", "https://www.home-assistant.io/blog/1", 20),
+            # Same video, shared by another channel
+            NewsRecord("https://www.youtube.com/channel/b", "Video", "https://www.youtube.com/watch?v=1", 10, NewsRecord.KIND_VIDEO),
+            NewsRecord.error("http://ciao.me", "Error 1"),
+        ]
+        merged_records = self._gear._merge_news_records(news_records)
+        self.assertEqual(4, len(merged_records))
+        self.assertEqual("https://www.youtube.com/channel/a", merged_records[0].source)
+        self.assertEqual("Error 1", merged_records[1].title)
+        self.assertEqual("https://www.home-assistant.io/blog/1", merged_records[2].url)
+        self.assertTrue(merged_records[3].is_error())
+
+        # Entries without a link are different contents
+        news_records = [
+            NewsRecord("https://example.com/feed", "Article 1", None, 10),
+            NewsRecord("https://example.com/feed", "Article 2", None, 20),
+        ]
+        merged_records = self._gear._merge_news_records(news_records)
+        self.assertEqual(["Article 1", "Article 2"], [news_record.title for news_record in merged_records])
+
+    @responses.activate
+    def test_http_get_cache(self):
+        responses.add(
+            responses.GET,
+            "http://ciao.me/feed",
+            body = "feed content",
+            status = 200,
+            headers = {"Cache-Control": "max-age=600"}
+        )
+        with tempfile.TemporaryDirectory() as cache_folder:
+            gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), http_cache=HttpCacheService(cache_folder))
+            self.assertEqual("feed content", gear._http_get("http://ciao.me/feed").text)
+            # Second read from the cache, not from the network
+            req = gear._http_get("http://ciao.me/feed")
+            self.assertEqual(200, req.status_code)
+            self.assertEqual("feed content", req.text)
+            self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_websub_stub_hub(self):
+        feed_template = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Home Assistant</title>
+  <link rel="hub" href="http://hub.local/"/>
+  <link rel="self" href="https://www.home-assistant.io/atom.xml"/>
+  <entry>
+    <id>https://www.home-assistant.io/blog/{0}</id>
+    <title>Article {0}</title>
+    <link href="https://www.home-assistant.io/blog/{0}"/>
+    <updated>2021-01-0{0}T10:00:00Z</updated>
+  </entry>
+</feed>"""
+        feed_url = "https://www.home-assistant.io/atom.xml"
+        responses.add(responses.GET, feed_url, body = feed_template.format(1), status = 200)
+
+        # The source was already checked before
+        storage = FakeStorageService()
+        news_item = NewsItemEntity()
+        news_item.url = feed_url
+        news_item.seen_ids = ["0000000000000000"]
+        storage.put(news_item)
+        gear = NewsReportGear(self._youtube_key, [feed_url], storage, websub_callback_url="https://bot.me/websub/")
+
+        # A stub hub, that verifies the intent of the subscriber calling it
+        #  back, as a real hub would do
+        hub_subscriptions = {}
+        def stub_hub(request):
+            form = parse_qs(request.body)
+            self.assertEqual("subscribe", form["hub.mode"][0])
+            subscription_id = form["hub.callback"][0].rsplit("/", 1)[1]
+            self.assertEqual("https://bot.me/websub/{}".format(subscription_id), form["hub.callback"][0])
+            result = gear.process_intent(GlobalBag.WEBSUB_VERIFY_INTENT, {
+                GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID: subscription_id,
+                GlobalBag.WEBSUB_PARAM_MODE: "subscribe",
+                GlobalBag.WEBSUB_PARAM_TOPIC: form["hub.topic"][0],
+                GlobalBag.WEBSUB_PARAM_CHALLENGE: "challenge-1",
+                GlobalBag.WEBSUB_PARAM_LEASE_SECONDS: "3600"
+            })
+            if not result.went_well() or ["challenge-1"] != result.get_messages():
+                return (500, {}, "")
+            hub_subscriptions[form["hub.topic"][0]] = (subscription_id, form["hub.secret"][0])
+            return (202, {}, "")
+        responses.add_callback(responses.POST, "http://hub.local/", callback=stub_hub)
+
+        # A verification for an unknown subscription is refused
+        result = gear.process_intent(GlobalBag.WEBSUB_VERIFY_INTENT, {
+            GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID: "unknown",
+            GlobalBag.WEBSUB_PARAM_MODE: "subscribe",
+            GlobalBag.WEBSUB_PARAM_TOPIC: feed_url,
+            GlobalBag.WEBSUB_PARAM_CHALLENGE: "challenge-0"
+        })
+        self.assertFalse(result.went_well())
+
+        # The check polls the source, and subscribes to its hub
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {GlobalBag.CHECKFORNEWS_PARAM_SILENT: True})
+        self.assertEqual(["New article published: Article 1 - https://www.home-assistant.io/blog/1"], result.get_messages())
+        self.assertIn(feed_url, hub_subscriptions)
+        subscription_id, secret = hub_subscriptions[feed_url]
+
+        # Then the source is not polled anymore, unless forced
+        calls_count = len(responses.calls)
+        result = gear.process_intent(GlobalBag.CHECKFORNEWS_INTENT, {GlobalBag.CHECKFORNEWS_PARAM_SILENT: True})
+        self.assertEqual(0, len(result.get_messages()))
+        self.assertEqual(calls_count, len(responses.calls))
+
+        # The hub pushes the new content
+        pushed_content = feed_template.format(2).encode("utf-8")
+        notification_params = {
+            GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID: subscription_id,
+            GlobalBag.WEBSUB_PARAM_CONTENT: pushed_content,
+            GlobalBag.WEBSUB_PARAM_SIGNATURE: "sha256={}".format(hmac.new(secret.encode("utf-8"), pushed_content, "sha256").hexdigest())
+        }
+        result = gear.process_intent(GlobalBag.WEBSUB_NOTIFICATION_INTENT, notification_params)
+        self.assertTrue(result.went_well())
+        self.assertEqual(["New article published: Article 2 - https://www.home-assistant.io/blog/2"], result.get_messages())
+        # Same content pushed again
+        result = gear.process_intent(GlobalBag.WEBSUB_NOTIFICATION_INTENT, notification_params)
+        self.assertEqual(0, len(result.get_messages()))
+
+        # Content not signed with the secret is ignored
+        notification_params[GlobalBag.WEBSUB_PARAM_SIGNATURE] = "sha256=0000"
+        result = gear.process_intent(GlobalBag.WEBSUB_NOTIFICATION_INTENT, notification_params)
+        self.assertFalse(result.went_well())
+
+    def test_save_news_items_after_websub(self):
+        feed_url = "https://www.home-assistant.io/atom.xml"
+        storage = FakeStorageService()
+        gear = NewsReportGear(self._youtube_key, [feed_url], storage, websub_callback_url="https://bot.me/websub/")
+        # The check read the entity, and found the entry "b"
+        news_item = NewsItemEntity()
+        news_item.url = feed_url
+        news_item.seen_ids = ["b", "a"]
+        # In the meantime, the pushed content of the same source was processed
+        pushed_news_item = NewsItemEntity()
+        pushed_news_item.url = feed_url
+        pushed_news_item.seen_ids = ["c", "a"]
+        storage.put(pushed_news_item)
+
+        gear._save_news_items([news_item])
+        self.assertEqual(1, len(storage.get_all(NewsItemEntity)))
+        self.assertEqual(pushed_news_item.id, news_item.id)
+        self.assertEqual(["b", "a", "c"], storage.get_all(NewsItemEntity)[0].seen_ids)
+
+    def test_websub_discover_youtube_hub(self):
+        self.assertEqual(
+            ("https://pubsubhubbub.appspot.com/subscribe", "https://www.youtube.com/feeds/videos.xml?channel_id=UCSbdMXOI_3HGiFviLZO6kNA"),
+            self._gear._websub_discover_hub("https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA")
+        )
+
+    def test_rss_analize_feed_content_process_pool(self):
+        testdata1 = open(self.TESTDATA_COMMITSTRIP_FEED_1_FILENAME).read()
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), parse_processes=1)
+        try:
+            new_items = gear._rss_analize_feed_content(
+                "https://www.commitstrip.com/en/feed/",
+                testdata1,
+                arrow.get("2021-01-26T10:00:10Z")
+            )
+        finally:
+            gear._parse_executor.shutdown()
+        # Same results of the parsing in the calling thread
+        expected_items = self._gear._rss_analize_feed_content(
+            "https://www.commitstrip.com/en/feed/",
+            testdata1,
+            arrow.get("2021-01-26T10:00:10Z")
+        )
+        self.assertEqual(
+            [item.to_message() for item in expected_items],
+            [item.to_message() for item in new_items]
+        )
+        self.assertTrue(len(new_items) > 0)
+
+    def test_rss_analize_feed_content_broken_process_pool(self):
+        testdata1 = open(self.TESTDATA_COMMITSTRIP_FEED_1_FILENAME).read()
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), parse_processes=1)
+        # A worker of the pool dies while parsing the feed
+        class BrokenExecutor:
+            def submit(self, *args):
+                future = Future()
+                future.set_exception(BrokenProcessPool("A worker died"))
+                return future
+        gear._parse_executor = BrokenExecutor()
+        new_items = gear._rss_analize_feed_content(
+            "https://www.commitstrip.com/en/feed/",
+            testdata1,
+            arrow.get("2021-01-26T10:00:10Z")
+        )
+        # Parsed in the calling thread, and a new pool is used next time
+        self.assertTrue(len(new_items) > 0)
+        self.assertFalse(any(item.is_error() for item in new_items))
+        self.assertIsNone(gear._parse_executor)
+
+    @responses.activate
+    def test_youtube_analize_channel_feed(self):
+        testdata1 = open(self.TESTDATA_YOUTUBE_FEED_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.youtube.com/feeds/videos.xml?channel_id=UCSbdMXOI_3HGiFviLZO6kNA",
+            body = testdata1,
+            status = 200,
+            content_type='application/xml',
+            headers = {"ETag": '"yt-etag"'}
+        )
+
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), youtube_use_feed=True)
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA"
+        new_videos = gear._youtube_analize_channel(
+            news_item,
+            arrow.get("2021-01-26T10:00:10Z")
+        )
+        self.assertEqual(2, len(new_videos))
+        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0].to_message())
+        self.assertEqual("New video published: Valve's next VR projects are SCARILY similar to Sword Art Online - https://www.youtube.com/watch?v=veVx0AuhHFw", new_videos[1].to_message())
+        # No YouTube API calls
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual('"yt-etag"', news_item.etag)
+
+        # Conditional GET, as for any other feed
+        responses.replace(
+            responses.GET,
+            "https://www.youtube.com/feeds/videos.xml?channel_id=UCSbdMXOI_3HGiFviLZO6kNA",
+            body = "",
+            status = 304
+        )
+        new_videos = gear._youtube_analize_channel(
+            news_item,
+            arrow.get("2021-01-26T10:00:10Z")
+        )
+        self.assertEqual(0, len(new_videos))
+        self.assertEqual('"yt-etag"', responses.calls[1].request.headers["If-None-Match"])
+
+    @responses.activate
+    def test_youtube_analize_channel_feed_fallback(self):
+        testdata1 = open(self.TESTDATA_YOUTUBE_CHANNEL_FILENAME).read()
+        testdata2 = open(self.TESTDATA_YOUTUBE_PLAYLIST_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.youtube.com/feeds/videos.xml?channel_id=UCSbdMXOI_3HGiFviLZO6kNA",
+            body = "",
+            status = 500
+        )
+        responses.add(
+            responses.GET,
+            'https://youtube.googleapis.com/youtube/v3/channels?part=contentDetails&id=UCSbdMXOI_3HGiFviLZO6kNA&key=mock_youtube_key',
+            body = testdata1,
+            status = 200,
+            content_type='application/json'
+        )
+        responses.add(
+            responses.GET,
+            'https://youtube.googleapis.com/youtube/v3/playlistItems?part=snippet&maxResults=5&playlistId=UUSbdMXOI_3HGiFviLZO6kNA&key=mock_youtube_key',
+            body = testdata2,
+            status = 200,
+            content_type='application/json'
+        )
+
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), youtube_use_feed=True)
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.youtube.com/channel/UCSbdMXOI_3HGiFviLZO6kNA"
+        new_videos = gear._youtube_analize_channel(
+            news_item,
+            arrow.get("2021-02-02T00:15:04Z")
+        )
+        # Feed is not available, so YouTube API is used, with the upload
+        #  playlist id derived from the channel id
+        self.assertEqual(1, len(new_videos))
+        self.assertEqual("New video published: The 7 Types of VR Users 2 - https://www.youtube.com/watch?v=WFeny7l1Ev4", new_videos[0].to_message())
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual("UUSbdMXOI_3HGiFviLZO6kNA", news_item.param1)
+
+    @responses.activate
+    def test_youtube_resolve_upload_playlists_errors(self):
+        responses.add(responses.GET, NewsReportGear.YOUTUBE_API_URL + "channels", body = "", status = 500)
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService())
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.youtube.com/channel/HCabc"
+
+        # The channel is left without playlist, and the error is logged
+        with self.assertLogs(level="ERROR") as logs:
+            gear._youtube_resolve_upload_playlists([news_item])
+        self.assertFalse(getattr(news_item, "param1", None))
+        self.assertIn("HCabc", logs.output[0])
+
+        # Budget used up, the caller has to defer the channel
+        check_context = NewsCheckContext()
+        quota_ledger = YouTubeQuotaLedger(1)
+        quota_ledger.charge(NewsReportGear.YOUTUBE_API_URL + "channels")
+        check_context.set_youtube_quota_ledger(quota_ledger)
+        calls_count = len(responses.calls)
+        with self.assertRaises(YouTubeQuotaExceededError):
+            gear._youtube_resolve_upload_playlists([news_item], check_context)
+        self.assertEqual(calls_count, len(responses.calls))
+
+    @responses.activate
+    def test_youtube_quota_budget(self):
+        testdata_playlist = open(self.TESTDATA_YOUTUBE_PLAYLIST_FILENAME).read()
+        testdata_feed = open(self.TESTDATA_YOUTUBE_FEED_FILENAME).read()
+        channel_ids = ["UCSbdMXOI_3HGiFviLZO6kNA", "UCkRfArvrzheW2E7b6SVT7vQ"]
+        for channel_id in channel_ids:
+            responses.add(
+                responses.GET,
+                "https://youtube.googleapis.com/youtube/v3/playlistItems?part=snippet&maxResults=5&playlistId=UU{}&key=mock_youtube_key".format(channel_id[2:]),
+                body = testdata_playlist,
+                status = 200,
+                content_type='application/json'
+            )
+            responses.add(
+                responses.GET,
+                "https://www.youtube.com/feeds/videos.xml?channel_id={}".format(channel_id),
+                body = testdata_feed,
+                status = 200
+            )
+        storage = FakeStorageService()
+        newssources_urls = ["https://www.youtube.com/channel/{}".format(channel_id) for channel_id in channel_ids]
+        gear = NewsReportGear(self._youtube_key, newssources_urls, storage, youtube_daily_budget=3)
+
+        # Far from the budget, the API is used for all the channels
+        gear._find_latest_news(True)
+        self.assertEqual(2, len(responses.calls))
+        quota_entities = storage.get_all(YouTubeQuotaEntity)
+        self.assertEqual(1, len(quota_entities))
+        self.assertEqual(YouTubeQuotaLedger.get_quota_day(), quota_entities[0].day)
+        self.assertEqual(2, quota_entities[0].units)
+
+        # The first channel reaches the budget, so the second one is
+        #  checked with its feed
+        gear._find_latest_news(True)
+        self.assertEqual(4, len(responses.calls))
+        self.assertTrue(responses.calls[2].request.url.startswith(NewsReportGear.YOUTUBE_API_URL))
+        self.assertTrue(responses.calls[3].request.url.startswith("https://www.youtube.com/feeds/"))
+        self.assertEqual(1, len(storage.get_all(YouTubeQuotaEntity)))
+        self.assertEqual(3, storage.get_all(YouTubeQuotaEntity)[0].units)
+
+        # Budget used up, the channel without a feed is deferred, and no
+        #  API call is sent
+        responses.replace(
+            responses.GET,
+            "https://www.youtube.com/feeds/videos.xml?channel_id=UCkRfArvrzheW2E7b6SVT7vQ",
+            body = "",
+            status = 500
+        )
+        new_news = gear._find_latest_news(True)
+        self.assertEqual(["YouTube API daily budget used up, these channels will be checked next time: https://www.youtube.com/channel/UCkRfArvrzheW2E7b6SVT7vQ"], new_news)
+        self.assertEqual(6, len(responses.calls))
+        self.assertTrue(all(not call.request.url.startswith(NewsReportGear.YOUTUBE_API_URL) for call in responses.calls[4:]))
+
+        result = gear.process_intent(GlobalBag.YOUTUBE_QUOTA_INTENT, {})
+        self.assertEqual(GearExecutionResult.RESULT_OK, result.get_result())
+        self.assertEqual(
+            "YouTube API quota used on {}: 3 units in 3 calls, daily budget is 3 units, used up".format(YouTubeQuotaLedger.get_quota_day()),
+            result.get_plan_message()
+        )
+
+    @responses.activate
+    def test_youtube_resolve_upload_playlists(self):
+        # Channel ids that cannot be used to derive the upload playlist id
+        channel_ids = ["HCchannel{}".format(i) for i in range(60)]
+        def channels_callback(request):
+            # Returns the information only for the even channels
+            ids = parse_qs(urlparse(request.url).query)["id"][0].split(",")
+            items = [
+                {"id": channel_id, "contentDetails": {"relatedPlaylists": {"uploads": "PL" + channel_id}}}
+                for channel_id in ids if 0 == int(channel_id[len("HCchannel"):]) % 2
+            ]
+            return (200, {}, json.dumps({"items": items}))
+        responses.add_callback(
+            responses.GET,
+            "https://youtube.googleapis.com/youtube/v3/channels",
+            callback = channels_callback,
+            content_type='application/json'
+        )
+
+        news_items = []
+        for channel_id in channel_ids + ["UCSbdMXOI_3HGiFviLZO6kNA"]:
+            news_item = NewsItemEntity()
+            news_item.url = "https://www.youtube.com/channel/{}".format(channel_id)
+            news_items.append(news_item)
+        cached_item = NewsItemEntity()
+        cached_item.url = "https://www.youtube.com/channel/HCcached"
+        cached_item.param1 = "PLcached"
+        news_items.append(cached_item)
+
+        self._gear._youtube_resolve_upload_playlists(news_items)
+        # 60 channels to resolve, in batches of 50
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual("PLHCchannel0", news_items[0].param1)
+        self.assertFalse(hasattr(news_items[1], "param1"))
+        self.assertEqual("PLHCchannel58", news_items[58].param1)
+        self.assertEqual("UUSbdMXOI_3HGiFviLZO6kNA", news_items[60].param1)
+        self.assertEqual("PLcached", news_items[61].param1)
+
+    def test_rss_analize_feed_content_undated_entries(self):
+        feed_template = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>Undated</title>{}</channel></rss>"""
+        item_template = "<item><guid>https://example.com/{0}</guid><title>Article {0}</title><link>https://example.com/{0}</link></item>"
+        for feed_stop_after_old_entries in (0, 2):
+            gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), feed_stop_after_old_entries=feed_stop_after_old_entries)
+            # The first time, there is no way to tell if the entries are new
+            news_item = NewsItemEntity()
+            new_feeds = gear._rss_analize_feed_content(
+                "https://example.com/feed",
+                feed_template.format(item_template.format(1)),
+                arrow.get("2021-02-11T00:00:00+00:00"),
+                news_item
+            )
+            self.assertEqual(0, len(new_feeds))
+            self.assertEqual(1, len(news_item.seen_ids))
+
+            # Then they are matched by id
+            new_feeds = gear._rss_analize_feed_content(
+                "https://example.com/feed",
+                feed_template.format(item_template.format(2) + item_template.format(1)),
+                arrow.get("2021-02-11T00:00:00+00:00"),
+                news_item
+            )
+            self.assertEqual(1, len(new_feeds), feed_stop_after_old_entries)
+            self.assertEqual("New article published: Article 2 - https://example.com/2", new_feeds[0].to_message())
+            self.assertEqual(0, new_feeds[0].published)
+
+    def test_rss_analize_feed_content_streaming(self):
+        testdata1 = open(self.TESTDATA_ATOM_1_FILENAME).read()
+        gear = NewsReportGear(self._youtube_key, [], BaseStorageService(), feed_stop_after_old_entries=2)
+
+        new_feeds = gear._rss_analize_feed_content(
+            "https://www.home-assistant.io/atom.xml",
+            testdata1,
+            arrow.get("2021-01-22T00:00:00+00:00")
+        )
+        self.assertEqual(4, len(new_feeds))
+        self.assertEqual("New article published: Community Highlights: 8th edition - https://www.home-assistant.io/blog/2021/02/12/community-highlights/", new_feeds[0].to_message())
+        self.assertEqual("New article published: Disclosure: security vulnerabilities in custom integrations HACS, Dwains Dashboard, Font Awesome and others - https://www.home-assistant.io/blog/2021/01/22/security-disclosure/", new_feeds[3].to_message())
+
+        # The first time, the whole feed is parsed, to find all the entries
+        news_item = NewsItemEntity()
+        new_feeds = gear._rss_analize_feed_content(
+            "https://www.home-assistant.io/atom.xml",
+            testdata1,
+            arrow.get("2021-02-11T00:00:00+00:00"),
+            news_item
+        )
+        self.assertEqual(1, len(new_feeds))
+        self.assertEqual(6, len(news_item.seen_ids))
+
+        # Then parsing stops after two seen entries, the rest of the feed is ignored
+        testdata2 = testdata1.replace("<entry>", """<entry>
+    <title type="html"><![CDATA[A new article]]></title>
+    <link href="https://www.home-assistant.io/blog/2021/02/14/new-article/"/>
+    <updated>2021-02-14T00:00:00+00:00</updated>
+    <id>https://www.home-assistant.io/blog/2021/02/14/new-article</id>
+    <content type="html"><![CDATA[New]]></content>
+  </entry>
+  <entry>""", 1)
+        parsed_entries = []
+        original_iter_entries = StreamingFeedParser.iter_entries
+        def tracking_iter_entries(parser, feed_content):
+            for entry in original_iter_entries(parser, feed_content):
+                parsed_entries.append(entry)
+                yield entry
+        StreamingFeedParser.iter_entries = tracking_iter_entries
+        try:
+            new_feeds = gear._rss_analize_feed_content(
+                "https://www.home-assistant.io/atom.xml",
+                testdata2,
+                arrow.get("2021-02-11T00:00:00+00:00"),
+                news_item
+            )
+        finally:
+            StreamingFeedParser.iter_entries = original_iter_entries
+        self.assertEqual(1, len(new_feeds))
+        self.assertEqual("A new article", new_feeds[0].title)
+        self.assertEqual(3, len(parsed_entries))
+        self.assertEqual(7, len(news_item.seen_ids))
+
+        # Not well-formed feeds are parsed with feedparser
+        new_feeds = gear._rss_analize_feed_content(
+            "https://www.home-assistant.io/atom.xml",
+            testdata1.replace("<title><![CDATA[Home Assistant]]></title>", "<title>Home&nbsp;Assistant</title>"),
+            arrow.get("2021-02-11T00:00:00+00:00")
+        )
+        self.assertEqual(1, len(new_feeds))
+
+    @responses.activate
+    def test_rss_analize_feed_same_content(self):
+        testdata1 = open(self.TESTDATA_ATOM_1_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = testdata1,
+            status = 200,
+            content_type='application/xml'
+        )
+
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.home-assistant.io/atom.xml"
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(1, len(new_feeds))
+        self.assertIsNotNone(news_item.content_hash)
+        first_hash = news_item.content_hash
+
+        # The server doesn't support conditional requests, but returns the
+        #  same content, so it isn't parsed again
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(0, len(new_feeds))
+        self.assertEqual(first_hash, news_item.content_hash)
+
+        # Content changes, the feed is parsed again, but the edited entry
+        #  has already been seen
+        responses.replace(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = testdata1.replace("Community Highlights: 8th edition", "Community Highlights: 9th edition"),
+            status = 200,
+            content_type='application/xml'
+        )
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(0, len(new_feeds))
+        self.assertNotEqual(first_hash, news_item.content_hash)
+
+    @responses.activate
+    def test_rss_analize_feed_same_content_after_error(self):
+        testdata1 = open(self.TESTDATA_ATOM_1_FILENAME).read()
+        responses.add(
+            responses.GET,
+            "https://www.home-assistant.io/atom.xml",
+            body = testdata1,
+            status = 200,
+            content_type='application/xml'
+        )
+
+        def failing_parse(feed_content, use_published=False):
+            raise ValueError("Parsing failed")
+
+        news_item = NewsItemEntity()
+        news_item.url = "https://www.home-assistant.io/atom.xml"
+        self._gear._parse_feed_entries = failing_parse
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(1, len(new_feeds))
+        self.assertTrue(new_feeds[0].is_error())
+        self.assertIsNone(getattr(news_item, "content_hash", None))
+
+        # The same content is parsed again, and the entries aren't lost
+        del self._gear._parse_feed_entries
+        new_feeds = self._gear._rss_analize_feed(news_item.url, arrow.get("2021-02-11T00:00:00+00:00"), news_item)
+        self.assertEqual(1, len(new_feeds))
+        self.assertIsNotNone(news_item.content_hash)
@@ -0,0 +1,66 @@
+"""
+Test SeenEntryIndex class
+"""
+
+from unittest import TestCase
+import arrow
+
+from yellowbot.gears.seenentryindex import SeenEntryIndex
+
+
+class TestSeenEntryIndex(TestCase):
+    def test_bootstrap_with_dates(self):
+        last_check_date = arrow.get("2021-02-10T00:00:00Z")
+        index = SeenEntryIndex(None)
+        self.assertTrue(index.is_bootstrap())
+        self.assertTrue(index.is_new("a", arrow.get("2021-02-11T00:00:00Z"), last_check_date))
+        self.assertFalse(index.is_new("b", arrow.get("2021-02-09T00:00:00Z"), last_check_date))
+        # Old or new, all the entries are remembered
+        self.assertEqual([SeenEntryIndex.digest("a"), SeenEntryIndex.digest("b")], index.to_list())
+
+    def test_seen_entries(self):
+        last_check_date = arrow.get("2021-02-10T00:00:00Z")
+        index = SeenEntryIndex([SeenEntryIndex.digest("a"), SeenEntryIndex.digest("b")])
+        self.assertFalse(index.is_bootstrap())
+        # Dates are not used anymore: back-dated entries are new, edited ones are not
+        self.assertTrue(index.is_new("c", arrow.get("2021-01-01T00:00:00Z"), last_check_date))
+        self.assertFalse(index.is_new("a", arrow.get("2021-02-11T00:00:00Z"), last_check_date))
+        # Same entry twice in the same source
+        self.assertFalse(index.is_new("c", arrow.get("2021-01-01T00:00:00Z"), last_check_date))
+        self.assertEqual(
+            [SeenEntryIndex.digest("c"), SeenEntryIndex.digest("a"), SeenEntryIndex.digest("b")],
+            index.to_list())
+
+    def test_capacity(self):
+        last_check_date = arrow.get("2021-02-10T00:00:00Z")
+        index = SeenEntryIndex([SeenEntryIndex.digest(str(i)) for i in range(5)], 5)
+        index.is_new("new", last_check_date, last_check_date)
+        seen_ids = index.to_list()
+        self.assertEqual(5, len(seen_ids))
+        self.assertEqual(SeenEntryIndex.digest("new"), seen_ids[0])
+        self.assertNotIn(SeenEntryIndex.digest("4"), seen_ids)
+
+        # All the entries found in the source are kept, even over the capacity
+        index = SeenEntryIndex([SeenEntryIndex.digest("a")], 2)
+        for entry_id in ["b", "c", "d"]:
+            index.is_new(entry_id, last_check_date, last_check_date)
+        self.assertEqual(3, len(index.to_list()))
+
+    def test_merge(self):
+        self.assertEqual(["c", "a", "b", "d"], SeenEntryIndex.merge(["c", "a", "b"], ["d", "a", "b"]))
+        self.assertEqual(["a"], SeenEntryIndex.merge(["a"], None))
+        self.assertEqual(["d"], SeenEntryIndex.merge(None, ["d"]))
+        # Capped, but the identifiers about to be saved are all kept
+        self.assertEqual(["c", "a"], SeenEntryIndex.merge(["c", "a"], ["d", "e"], 2))
+        self.assertEqual(["c", "a", "b"], SeenEntryIndex.merge(["c", "a", "b"], ["d"], 2))
+
+    def test_undated_entries(self):
+        last_check_date = arrow.get("2021-02-10T00:00:00Z")
+        # Without an index, undated entries are not new, but remembered
+        index = SeenEntryIndex(None)
+        self.assertFalse(index.is_new("a", None, last_check_date))
+        self.assertEqual([SeenEntryIndex.digest("a")], index.to_list())
+
+        index = SeenEntryIndex(index.to_list())
+        self.assertTrue(index.is_new("b", None, last_check_date))
+        self.assertFalse(index.is_new("a", None, last_check_date))
@@ -0,0 +1,83 @@
+"""Test StreamingFeedParser
+"""
+
+from unittest import TestCase
+from xml.etree import ElementTree
+import os
+import arrow
+
+from yellowbot.gears.streamingfeedparser import StreamingFeedParser
+
+
+class TestStreamingFeedParser(TestCase):
+    TESTDATA_RSS_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_rssfeed_1.txt")
+    TESTDATA_ATOM_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_atom_1.txt")
+    TESTDATA_COMMITSTRIP_FEED_1_FILENAME = os.path.join(os.path.dirname(__file__), "testdata_commitstrip_1.txt")
+
+    def setUp(self):
+        # Small chunks, so entries are split between different chunks
+        self._parser = StreamingFeedParser(chunk_size=512)
+
+    def tearDown(self):
+        pass
+
+    def test_rss(self):
+        entries = list(self._parser.iter_entries(open(self.TESTDATA_RSS_FEED_1_FILENAME).read()))
+        self.assertEqual("Introducing App Lab: A New Way to Distribute Oculus Quest Apps", entries[0].title)
+        self.assertEqual("https://developer.oculus.com/blog/introducing-app-lab-a-new-way-to-distribute-oculus-quest-apps/", entries[0].link)
+        self.assertEqual(arrow.get("2021-02-02T19:00:00+00:00"), entries[0].date)
+        self.assertIsNone(entries[0].content)
+
+    def test_rss_with_content(self):
+        entries = list(self._parser.iter_entries(open(self.TESTDATA_COMMITSTRIP_FEED_1_FILENAME).read()))
+        self.assertEqual(10, len(entries))
+        self.assertEqual("A theory about PHP", entries[0].title)
+        self.assertEqual(arrow.get("2021-02-03T19:07:41+00:00"), entries[0].date)
+        self.assertTrue(entries[0].content.startswith('<img src="https://www.commitstrip.com/wp-content/uploads/2021/02/'))
+
+    def test_atom(self):
+        entries = self._parser.iter_entries(open(self.TESTDATA_ATOM_1_FILENAME).read())
+        entry = next(entries)
+        self.assertEqual("Community Highlights: 8th edition", entry.title)
+        self.assertEqual("https://www.home-assistant.io/blog/2021/02/12/community-highlights/", entry.link)
+        self.assertEqual(arrow.get("2021-02-12T00:00:00+00:00"), entry.date)
+        entry = next(entries)
+        self.assertEqual("2021.2: Z-Wave... JS!", entry.title)
+
+    def test_invalid_feed(self):
+        with self.assertRaises(ElementTree.ParseError):
+            list(self._parser.iter_entries("<rss><channel><item><title>No closing tags"))
+
+    def test_undated_entry(self):
+        entries = list(self._parser.iter_entries(
+            "<rss><channel><item><guid>https://example.com/1</guid><title>Undated</title></item></channel></rss>"))
+        self.assertEqual("https://example.com/1", entries[0].id)
+        self.assertIsNone(entries[0].date)
+
+    def test_rdf(self):
+        feed_content = """<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://example.com/">
+    <title>Example</title>
+    <link>https://example.com/</link>
+    <items><rdf:Seq><rdf:li rdf:resource="https://example.com/1"/></rdf:Seq></items>
+  </channel>
+  <item rdf:about="https://example.com/1">
+    <title>First article</title>
+    <link>https://example.com/1</link>
+    <dc:date>2021-02-03T19:07:41+00:00</dc:date>
+  </item>
+</rdf:RDF>"""
+        entries = list(self._parser.iter_entries(feed_content))
+        self.assertEqual(1, len(entries))
+        self.assertEqual("https://example.com/1", entries[0].id)
+        self.assertEqual("First article", entries[0].title)
+        self.assertEqual("https://example.com/1", entries[0].link)
+        self.assertEqual(arrow.get("2021-02-03T19:07:41+00:00"), entries[0].date)
+
+    def test_no_entries(self):
+        # Unsupported format, or an empty feed: the caller falls back to feedparser
+        with self.assertRaises(ValueError):
+            list(self._parser.iter_entries("<unknown><entry><title>Not a feed</title></entry></unknown>"))
+        with self.assertRaises(ValueError):
+            list(self._parser.iter_entries("<rss><channel><title>Empty</title></channel></rss>"))
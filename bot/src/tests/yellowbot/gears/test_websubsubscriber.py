@@ -0,0 +1,98 @@
+"""Test WebSubSubscriber
+"""
+
+from unittest import TestCase
+import hmac
+
+import arrow
+
+from yellowbot.gears.websubsubscriber import WebSubSubscriber
+from yellowbot.storage.websubsubscriptionentity import WebSubSubscriptionEntity
+
+
+class TestWebSubSubscriber(TestCase):
+    def setUp(self):
+        self._subscriber = WebSubSubscriber("https://bot.me/websub/", 3600)
+
+    def tearDown(self):
+        pass
+
+    def test_discover_hub_link_headers(self):
+        links = {
+            "hub": {"url": "https://hub.me/", "rel": "hub"},
+            "self": {"url": "https://ciao.me/feed/topic", "rel": "self"}
+        }
+        self.assertEqual(
+            ("https://hub.me/", "https://ciao.me/feed/topic"),
+            WebSubSubscriber.discover_hub("https://ciao.me/feed/", "", links)
+        )
+
+    def test_discover_hub_feed(self):
+        rss_feed = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <atom:link rel="hub" href="https://pubsubhubbub.appspot.com/"/>
+    <title>Ciao</title>
+  </channel>
+</rss>"""
+        # No self link, the topic is the url of the feed
+        self.assertEqual(
+            ("https://pubsubhubbub.appspot.com/", "https://ciao.me/feed/"),
+            WebSubSubscriber.discover_hub("https://ciao.me/feed/", rss_feed, {})
+        )
+        self.assertIsNone(WebSubSubscriber.discover_hub("https://ciao.me/feed/", "<rss><channel/></rss>", {}))
+        self.assertIsNone(WebSubSubscriber.discover_hub("https://ciao.me/feed/", "not a feed", {}))
+
+    def test_is_signature_valid(self):
+        content = b"<feed/>"
+        signature = hmac.new(b"secret", content, "sha1").hexdigest()
+        self.assertTrue(WebSubSubscriber.is_signature_valid("secret", content, "sha1={}".format(signature)))
+        self.assertFalse(WebSubSubscriber.is_signature_valid("other secret", content, "sha1={}".format(signature)))
+        self.assertFalse(WebSubSubscriber.is_signature_valid("secret", b"<feed></feed>", "sha1={}".format(signature)))
+        self.assertFalse(WebSubSubscriber.is_signature_valid("secret", content, "md5={}".format(signature)))
+        self.assertFalse(WebSubSubscriber.is_signature_valid("secret", content, None))
+
+    def test_subscription_lifecycle(self):
+        news_source = "https://ciao.me/feed/"
+        self.assertTrue(self._subscriber.needs_subscription(news_source))
+        self.assertFalse(self._subscriber.is_pushed(news_source))
+
+        subscription, form = self._subscriber.request_subscription(news_source, "https://hub.me/", news_source)
+        self.assertEqual("https://bot.me/websub/{}".format(subscription.subscription_id), form["hub.callback"])
+        self.assertEqual("3600", form["hub.lease_seconds"])
+        self.assertEqual(subscription.secret, form["hub.secret"])
+        self.assertEqual(WebSubSubscriber.STATE_PENDING, subscription.state)
+        self.assertFalse(self._subscriber.needs_subscription(news_source))
+
+        # Wrong topic
+        self.assertIsNone(self._subscriber.verify_intent(subscription.subscription_id, "subscribe", "https://ciao.me/other"))
+        # Unsubscribe is never requested
+        self.assertIsNone(self._subscriber.verify_intent(subscription.subscription_id, "unsubscribe", news_source))
+        self.assertIs(subscription, self._subscriber.verify_intent(subscription.subscription_id, "subscribe", news_source, "86400"))
+        self.assertTrue(self._subscriber.is_pushed(news_source))
+        self.assertTrue(arrow.get(subscription.lease_until) > arrow.utcnow().shift(hours=23))
+        # Renewed a day before the lease ends
+        self.assertTrue(arrow.get(subscription.next_attempt) < arrow.utcnow().shift(hours=1, minutes=1))
+        self.assertEqual([subscription], self._subscriber.get_changed_subscriptions())
+
+        # A renewal keeps id and secret
+        renewed_subscription, _ = self._subscriber.request_subscription(news_source, "https://hub.me/", news_source)
+        self.assertEqual(subscription.subscription_id, renewed_subscription.subscription_id)
+        self.assertEqual(WebSubSubscriber.STATE_ACTIVE, renewed_subscription.state)
+
+        # Saved subscriptions are restored
+        subscriber = WebSubSubscriber("https://bot.me/websub", 3600, [subscription])
+        self.assertTrue(subscriber.is_pushed(news_source))
+        self.assertIs(subscription, subscriber.get_subscription_by_id(subscription.subscription_id))
+
+    def test_denied_and_unsupported(self):
+        subscription, _ = self._subscriber.request_subscription("https://ciao.me/feed/", "https://hub.me/", "https://ciao.me/feed/")
+        self._subscriber.verify_intent(subscription.subscription_id, "denied", "https://ciao.me/feed/")
+        self.assertEqual(WebSubSubscriber.STATE_DENIED, subscription.state)
+        self.assertFalse(self._subscriber.is_pushed("https://ciao.me/feed/"))
+        self.assertFalse(self._subscriber.needs_subscription("https://ciao.me/feed/"))
+
+        unsupported_subscription = self._subscriber.mark_unsupported("https://ciao.you/rss/")
+        self.assertEqual(WebSubSubscriber.STATE_UNSUPPORTED, unsupported_subscription.state)
+        self.assertFalse(self._subscriber.needs_subscription("https://ciao.you/rss/"))
+        self.assertIsNone(self._subscriber.get_subscription_by_id(None))
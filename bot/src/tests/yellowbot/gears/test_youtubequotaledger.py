@@ -0,0 +1,93 @@
+"""
+Test YouTubeQuotaLedger class
+"""
+
+from unittest import TestCase
+
+from yellowbot.gears.youtubequotaledger import YouTubeQuotaLedger
+from yellowbot.storage.youtubequotaentity import YouTubeQuotaEntity
+
+
+class TestYouTubeQuotaLedger(TestCase):
+    def test_unit_costs(self):
+        self.assertEqual(1, YouTubeQuotaLedger.get_unit_cost("https://youtube.googleapis.com/youtube/v3/channels?part=contentDetails&id=UC1"))
+        self.assertEqual(1, YouTubeQuotaLedger.get_unit_cost("https://youtube.googleapis.com/youtube/v3/playlistItems?part=snippet&playlistId=UU1"))
+        self.assertEqual(100, YouTubeQuotaLedger.get_unit_cost("https://youtube.googleapis.com/youtube/v3/search?part=snippet"))
+        self.assertEqual(YouTubeQuotaLedger.DEFAULT_UNIT_COST, YouTubeQuotaLedger.get_unit_cost("https://youtube.googleapis.com/youtube/v3/unknown"))
+
+    def test_charge_and_budget(self):
+        ledger = YouTubeQuotaLedger(10)
+        self.assertEqual(0, ledger.get_charged_units())
+        for _ in range(8):
+            ledger.charge("https://youtube.googleapis.com/youtube/v3/playlistItems?playlistId=UU1")
+        self.assertEqual(8, ledger.get_used_units())
+        self.assertFalse(ledger.is_budget_near())
+
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/channels?id=UC1")
+        self.assertTrue(ledger.is_budget_near())
+        self.assertFalse(ledger.is_budget_used_up())
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/channels?id=UC1")
+        self.assertTrue(ledger.is_budget_used_up())
+
+        self.assertEqual(YouTubeQuotaLedger.get_quota_day(), ledger.get_day())
+        self.assertEqual(10, ledger.get_charged_units())
+        self.assertEqual(10, ledger.get_calls())
+
+        # Without a budget, units are only counted
+        ledger = YouTubeQuotaLedger(0)
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/search?part=snippet")
+        self.assertEqual(100, ledger.get_used_units())
+        self.assertFalse(ledger.is_budget_near())
+        self.assertFalse(ledger.is_budget_used_up())
+
+    def test_usage_of_previous_runs(self):
+        quota_entity = YouTubeQuotaEntity()
+        quota_entity.day = YouTubeQuotaLedger.get_quota_day()
+        quota_entity.units = 95
+        quota_entity.calls = 40
+        ledger = YouTubeQuotaLedger(100, quota_entity)
+        self.assertTrue(ledger.is_budget_near())
+        self.assertEqual(0, ledger.get_charged_units())
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/channels?id=UC1")
+        self.assertEqual(96, ledger.get_used_units())
+        self.assertEqual(1, ledger.get_charged_units())
+        self.assertEqual(1, ledger.get_charged_calls())
+        # The entity read from the storage is left untouched
+        self.assertEqual(95, quota_entity.units)
+
+        # The quota resets every day
+        quota_entity = YouTubeQuotaEntity()
+        quota_entity.day = "2021-02-01"
+        quota_entity.units = 95
+        ledger = YouTubeQuotaLedger(100, quota_entity)
+        self.assertEqual(0, ledger.get_used_units())
+        self.assertFalse(ledger.is_budget_near())
+        self.assertEqual(
+            "YouTube API quota used on {}: 0 units in 0 calls, daily budget is 100 units".format(YouTubeQuotaLedger.get_quota_day()),
+            ledger.get_summary()
+        )
+
+    def test_merge_charges(self):
+        quota_entity = YouTubeQuotaEntity()
+        quota_entity.day = YouTubeQuotaLedger.get_quota_day()
+        quota_entity.units = 10
+        quota_entity.calls = 10
+        ledger = YouTubeQuotaLedger(100, quota_entity)
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/channels?id=UC1")
+        ledger.charge("https://youtube.googleapis.com/youtube/v3/search?channelId=UC1")
+
+        # Another run saved its charges in the meantime
+        saved_entity = YouTubeQuotaEntity()
+        saved_entity.day = ledger.get_day()
+        saved_entity.units = 15
+        saved_entity.calls = 12
+        merged_entity = ledger.merge_charges(saved_entity)
+        self.assertIs(saved_entity, merged_entity)
+        self.assertEqual(116, merged_entity.units)
+        self.assertEqual(14, merged_entity.calls)
+
+        # Nothing saved yet
+        merged_entity = ledger.merge_charges(None)
+        self.assertEqual(ledger.get_day(), merged_entity.day)
+        self.assertEqual(101, merged_entity.units)
+        self.assertEqual(2, merged_entity.calls)
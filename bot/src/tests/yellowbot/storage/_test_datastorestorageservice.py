@@ -162,6 +162,35 @@ class TestDatastoreStorageService(TestCase):
         read_entities = self._datastore.get_all(DummyEntity)
         self.assertEqual(0, len(read_entities))
 
+    def test_multi(self):
+        # Add several entities at once
+        test_entities = [self._create_dummy_entity() for i in range(3)]
+        entity_ids = self._datastore.put_multi(test_entities)
+        self.assertEqual(3, len(entity_ids))
+        for test_entity, entity_id in zip(test_entities, entity_ids):
+            self.assertIsNotNone(entity_id)
+            self.assertEqual(entity_id, test_entity.id)
+        read_entities = self._datastore.get_all(DummyEntity)
+        self.assertEqual(3, len(read_entities))
+
+        # Update them, ids don't change
+        test_entities[1].url = "updated_url"
+        self.assertEqual(entity_ids, self._datastore.put_multi(test_entities))
+
+        # Read them, in the same order of the ids
+        read_entities = self._datastore.get_multi(DummyEntity, [entity_ids[1], 123123812381, entity_ids[0]])
+        self.assertEqual(3, len(read_entities))
+        self.assertEqual(entity_ids[1], read_entities[0].id)
+        self.assertEqual("updated_url", read_entities[0].url)
+        self.assertIsNone(read_entities[1])
+        self.assertEqual(entity_ids[0], read_entities[2].id)
+
+        # Delete some of them
+        self._datastore.delete_multi(DummyEntity, entity_ids[:2])
+        read_entities = self._datastore.get_all(DummyEntity)
+        self.assertEqual(1, len(read_entities))
+        self.assertEqual(entity_ids[2], read_entities[0].id)
+
     def _create_dummy_entity(self) -> DummyEntity:
         """Created an entity with some test data
         """
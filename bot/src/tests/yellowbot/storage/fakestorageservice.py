@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional, Type
+
+from yellowbot.storage.basestorageservice import BaseStorageService, BE
+
+
+class FakeStorageService(BaseStorageService):
+    """
+    Storage that keeps entities in memory and counts the calls received,
+     to check how the storage is used by the gears
+    Cannot call it TestStorageService, otherwise tests will be execute
+     on this class too
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.entities: Dict[int, BE] = {}
+        self.calls: Dict[str, int] = {}
+        self._next_id = 1
+
+    def _count(self, method_name: str) -> None:
+        self.calls[method_name] = self.calls.get(method_name, 0) + 1
+
+    def put(self, entity: BE) -> int:
+        self._count("put")
+        if not entity.id:
+            entity.id = self._next_id
+            self._next_id += 1
+        self.entities[entity.id] = entity
+        return entity.id
+
+    def get_all(self, entity_class: Type[BE]) -> List[BE]:
+        self._count("get_all")
+        return [
+            entity for entity in self.entities.values()
+            if entity.get_entity_name() == entity_class.get_entity_name()
+        ]
+
+    def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
+        self._count("get_by_id")
+        return self.entities.get(entity_id)
+
+    def get_by_property(self, entity_class, property_name, operator, property_value) -> List[BE]:
+        self._count("get_by_property")
+        return [
+            entity for entity in self.entities.values()
+            if entity.get_entity_name() == entity_class.get_entity_name()
+            and "=" == operator
+            and getattr(entity, property_name, None) == property_value
+        ]
+
+    def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
+        self._count("delete_by_id")
+        self.entities.pop(entity_id, None)
+
+    def delete_all(self, entity_class: Type[BE]) -> None:
+        self._count("delete_all")
+        for entity_id in [
+            entity_id for entity_id, entity in self.entities.items()
+            if entity.get_entity_name() == entity_class.get_entity_name()
+        ]:
+            del self.entities[entity_id]
@@ -0,0 +1,70 @@
+"""Test the generic implementation of batch methods in BaseStorageService
+"""
+
+from unittest import TestCase
+
+from tests.yellowbot.storage.fakestorageservice import FakeStorageService
+from yellowbot.storage.basestorageservice import BaseStorageService
+from yellowbot.storage.newsitementity import NewsItemEntity
+
+
+class TestBaseStorageService(TestCase):
+    def setUp(self):
+        self._storage = FakeStorageService()
+
+    def tearDown(self):
+        pass
+
+    def test_not_implemented(self):
+        storage = BaseStorageService()
+        with self.assertRaises(ValueError):
+            storage.put_multi([NewsItemEntity()])
+        with self.assertRaises(ValueError):
+            storage.get_multi(NewsItemEntity, [1])
+        with self.assertRaises(ValueError):
+            storage.delete_multi(NewsItemEntity, [1])
+        # Nothing to do, so nothing is called
+        self.assertEqual([], storage.put_multi([]))
+
+    def test_multi(self):
+        entities = []
+        for i in range(3):
+            entity = NewsItemEntity()
+            entity.url = "https://url_{}".format(i)
+            entities.append(entity)
+
+        ids = self._storage.put_multi(entities)
+        self.assertEqual(3, len(ids))
+        self.assertEqual([entity.id for entity in entities], ids)
+        self.assertEqual(3, self._storage.calls["put"])
+
+        read_entities = self._storage.get_multi(NewsItemEntity, [ids[2], 123456, ids[0]])
+        self.assertEqual(3, len(read_entities))
+        self.assertEqual("https://url_2", read_entities[0].url)
+        self.assertIsNone(read_entities[1])
+        self.assertEqual("https://url_0", read_entities[2].url)
+
+        self._storage.delete_multi(NewsItemEntity, [ids[0], ids[1]])
+        read_entities = self._storage.get_all(NewsItemEntity)
+        self.assertEqual(1, len(read_entities))
+        self.assertEqual(ids[2], read_entities[0].id)
+
+    def test_iter(self):
+        for i in range(5):
+            entity = NewsItemEntity()
+            entity.url = "https://url_{}".format(i)
+            entity.check_interval = i
+            self._storage.put(entity)
+
+        self.assertEqual(5, len(list(self._storage.iter_all(NewsItemEntity))))
+        read_entities = list(self._storage.iter_all(NewsItemEntity, limit=2, projection=["url"]))
+        self.assertEqual(["https://url_0", "https://url_1"], [entity.url for entity in read_entities])
+        self.assertNotEqual(0, read_entities[0].id)
+        self.assertFalse(hasattr(read_entities[0], "check_interval"))
+        self.assertEqual(0, len(list(self._storage.iter_all(NewsItemEntity, limit=0))))
+
+        read_entities = list(self._storage.iter_by_property(NewsItemEntity, "url", "=", "https://url_3"))
+        self.assertEqual([3], [entity.check_interval for entity in read_entities])
+
+        with self.assertRaises(ValueError):
+            BaseStorageService().iter_all(NewsItemEntity)
@@ -0,0 +1,129 @@
+"""Test the read-through cache in front of a storage service
+"""
+
+import time
+from unittest import TestCase
+
+from tests.yellowbot.storage.fakestorageservice import FakeStorageService
+from yellowbot.storage.cachingstorageservice import CachingStorageService
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+from yellowbot.storage.newsitementity import NewsItemEntity
+
+
+class TestCachingStorageService(TestCase):
+    def setUp(self):
+        self._backend = FakeStorageService()
+        self._storage = CachingStorageService(self._backend)
+
+    def tearDown(self):
+        pass
+
+    def _create_news_item(self, url):
+        news_item = NewsItemEntity()
+        news_item.url = url
+        return news_item
+
+    def test_read_through(self):
+        entity_id = self._storage.put(self._create_news_item("https://url_1"))
+        self._backend.calls.clear()
+
+        # Written by this process, so it's already cached
+        read_entity = self._storage.get_by_id(NewsItemEntity, entity_id)
+        self.assertEqual("https://url_1", read_entity.url)
+        self.assertEqual(entity_id, read_entity.id)
+        self.assertEqual({}, self._backend.calls)
+
+        # Returned entities can be changed without changing the cache
+        read_entity.url = "https://changed"
+        self.assertEqual("https://url_1", self._storage.get_by_id(NewsItemEntity, entity_id).url)
+
+        # Queries are sent once, then read from the cache
+        for _ in range(3):
+            self.assertEqual(1, len(self._storage.get_all(NewsItemEntity)))
+            self.assertEqual(1, len(self._storage.get_by_property(NewsItemEntity, "url", "=", "https://url_1")))
+        self.assertEqual({"get_all": 1, "get_by_property": 1}, self._backend.calls)
+        self.assertEqual(0, len(self._storage.get_by_property(NewsItemEntity, "url", "=", "https://url_2")))
+        self.assertEqual(2, self._backend.calls["get_by_property"])
+
+        # Entities not yet cached are read from the storage
+        other_id = self._backend.put(self._create_news_item("https://url_3"))
+        self._backend.calls.clear()
+        read_entities = self._storage.get_multi(NewsItemEntity, [entity_id, other_id])
+        self.assertEqual(["https://url_1", "https://url_3"], [entity.url for entity in read_entities])
+        self.assertEqual({"get_by_id": 1}, self._backend.calls)
+        self.assertEqual("https://url_3", self._storage.get_by_id(NewsItemEntity, other_id).url)
+        self.assertEqual({"get_by_id": 1}, self._backend.calls)
+
+    def test_iter_not_cached(self):
+        self._storage.put(self._create_news_item("https://url_1"))
+        self._backend.calls.clear()
+        for _ in range(2):
+            self.assertEqual(["https://url_1"], [entity.url for entity in self._storage.iter_all(NewsItemEntity)])
+            self.assertEqual(1, len(list(self._storage.iter_by_property(NewsItemEntity, "url", "=", "https://url_1"))))
+        self.assertEqual({"get_all": 2, "get_by_property": 2}, self._backend.calls)
+
+    def test_write_invalidation(self):
+        news_item = self._create_news_item("https://url_1")
+        self._storage.put(news_item)
+        self._storage.put(HostCircuitEntity())
+        self.assertEqual(1, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual(1, len(self._storage.get_all(HostCircuitEntity)))
+        self._backend.calls.clear()
+
+        # Saving an entity drops only the queries of its kind
+        news_item.url = "https://url_2"
+        self._storage.put_multi([news_item, self._create_news_item("https://url_3")])
+        self.assertEqual(["https://url_2", "https://url_3"], sorted(entity.url for entity in self._storage.get_all(NewsItemEntity)))
+        self.assertEqual(1, len(self._storage.get_all(HostCircuitEntity)))
+        self.assertEqual(1, self._backend.calls["get_all"])
+        self.assertEqual("https://url_2", self._storage.get_by_id(NewsItemEntity, news_item.id).url)
+
+        self._storage.delete_by_id(NewsItemEntity, news_item.id)
+        self.assertIsNone(self._storage.get_by_id(NewsItemEntity, news_item.id))
+        self.assertEqual(1, len(self._storage.get_all(NewsItemEntity)))
+
+        self._storage.delete_all(NewsItemEntity)
+        self.assertEqual(0, len(self._storage.get_all(NewsItemEntity)))
+
+        # A failed write removes the entity from the cache
+        host_circuit = self._storage.get_all(HostCircuitEntity)[0]
+        self._backend.put = None
+        with self.assertRaises(TypeError):
+            self._storage.put(host_circuit)
+        self._backend.calls.clear()
+        self._storage.get_all(HostCircuitEntity)
+        self.assertEqual({"get_all": 1}, self._backend.calls)
+
+    def test_lru_and_ttl(self):
+        storage = CachingStorageService(self._backend, 2, 1, 60, {"HostCircuitEntity": 0})
+        ids = [storage.put(self._create_news_item("https://url_{}".format(i))) for i in range(3)]
+        self._backend.calls.clear()
+        # The least recently used entity was removed
+        storage.get_by_id(NewsItemEntity, ids[2])
+        storage.get_by_id(NewsItemEntity, ids[1])
+        self.assertEqual({}, self._backend.calls)
+        storage.get_by_id(NewsItemEntity, ids[0])
+        self.assertEqual({"get_by_id": 1}, self._backend.calls)
+
+        # Only one query is kept
+        storage.get_by_property(NewsItemEntity, "url", "=", "https://url_0")
+        storage.get_by_property(NewsItemEntity, "url", "=", "https://url_1")
+        storage.get_by_property(NewsItemEntity, "url", "=", "https://url_0")
+        self.assertEqual(3, self._backend.calls["get_by_property"])
+
+        # Kinds with a time to live of 0 are never cached
+        storage.put(HostCircuitEntity())
+        storage.get_all(HostCircuitEntity)
+        storage.get_all(HostCircuitEntity)
+        self.assertEqual(2, self._backend.calls["get_all"])
+
+        # Expired entities are read again
+        storage = CachingStorageService(self._backend, default_ttl=1)
+        storage.put(self._create_news_item("https://url_4"))
+        storage.get_all(NewsItemEntity)
+        self._backend.calls.clear()
+        storage.get_all(NewsItemEntity)
+        self.assertEqual({}, self._backend.calls)
+        time.sleep(1.1)
+        storage.get_all(NewsItemEntity)
+        self.assertEqual({"get_all": 1}, self._backend.calls)
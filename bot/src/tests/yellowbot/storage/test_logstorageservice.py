@@ -0,0 +1,171 @@
+"""Test append-only log storage service
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import os
+import tempfile
+from unittest import TestCase
+
+import arrow
+
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+from yellowbot.storage.logstorageservice import LogStorageService
+from yellowbot.storage.newsitementity import NewsItemEntity
+
+
+class TestLogStorageService(TestCase):
+    def setUp(self):
+        self._temp_folder = tempfile.TemporaryDirectory()
+        self._log_file = os.path.join(self._temp_folder.name, "test_db.log")
+        self._storage = LogStorageService(self._log_file)
+
+    def tearDown(self):
+        self._storage.close()
+        self._temp_folder.cleanup()
+
+    def _create_news_item(self, url, check_interval=None, last_check=None):
+        news_item = NewsItemEntity()
+        news_item.url = url
+        news_item.check_interval = check_interval
+        news_item.last_check = last_check
+        news_item.seen_ids = ["a", "b"]
+        return news_item
+
+    def _reopen(self, **kwargs):
+        self._storage.close()
+        self._storage = LogStorageService(self._log_file, **kwargs)
+
+    def test_write_and_read(self):
+        last_check = arrow.get("2021-02-01T08:00:10.123456+01:00").datetime
+        news_item = self._create_news_item("https://url_1", 60, last_check)
+        entity_id = self._storage.put(news_item)
+        self.assertEqual(entity_id, news_item.id)
+        self.assertNotEqual(0, entity_id)
+
+        read_entity = self._storage.get_by_id(NewsItemEntity, entity_id)
+        self.assertEqual("https://url_1", read_entity.url)
+        self.assertEqual(60, read_entity.check_interval)
+        self.assertEqual(["a", "b"], read_entity.seen_ids)
+        # Returned in UTC, as Datastore does
+        self.assertEqual(last_check, read_entity.last_check)
+        self.assertEqual(datetime.timezone.utc, read_entity.last_check.tzinfo)
+
+        # Update
+        read_entity.url = "https://url_2"
+        self.assertEqual(entity_id, self._storage.put(read_entity))
+        self.assertEqual(["https://url_2"], [entity.url for entity in self._storage.get_all(NewsItemEntity)])
+        # Other kinds are separated
+        self.assertEqual(0, len(self._storage.get_all(HostCircuitEntity)))
+        self.assertIsNone(self._storage.get_by_id(HostCircuitEntity, entity_id))
+
+        # The index is rebuilt from the log, and new ids are not reused
+        self._reopen()
+        self.assertEqual("https://url_2", self._storage.get_by_id(NewsItemEntity, entity_id).url)
+        self.assertLess(entity_id, self._storage.put(self._create_news_item("https://url_3")))
+
+    def test_get_by_property(self):
+        base_date = arrow.get("2021-02-01T08:00:00Z")
+        self._storage.put_multi([
+            self._create_news_item("https://url_{}".format(i), i * 10, base_date.shift(hours=i).datetime)
+            for i in range(5)
+        ])
+        self._storage.put(self._create_news_item("https://url_none"))
+
+        def urls(operator, property_name, value):
+            return [entity.url for entity in self._storage.get_by_property(NewsItemEntity, property_name, operator, value)]
+
+        self.assertEqual(["https://url_2"], urls("=", "url", "https://url_2"))
+        self.assertEqual(["https://url_3", "https://url_4"], urls(">", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1", "https://url_2"], urls("<=", "check_interval", 20))
+        self.assertEqual(["https://url_1", "https://url_3"], urls("IN", "check_interval", [10, 30]))
+        self.assertEqual(["https://url_none"], urls("=", "check_interval", None))
+        # Dates are compared in UTC, whatever the timezone of the value
+        self.assertEqual(["https://url_3", "https://url_4"], urls(">", "last_check", arrow.get("2021-02-01T12:00:00+02:00").datetime))
+
+        with self.assertRaises(ValueError):
+            urls("LIKE", "url", "https://%")
+        with self.assertRaises(ValueError):
+            urls("IN", "url", "https://url_2")
+
+    def test_delete(self):
+        ids = self._storage.put_multi([self._create_news_item("https://url_{}".format(i)) for i in range(4)])
+        host_circuit = HostCircuitEntity()
+        host_circuit.host = "down.com"
+        self._storage.put(host_circuit)
+
+        self._storage.delete_by_id(NewsItemEntity, ids[0])
+        self.assertIsNone(self._storage.get_by_id(NewsItemEntity, ids[0]))
+        self._storage.delete_multi(NewsItemEntity, [ids[1], ids[2]])
+        self.assertEqual([None, None, None, ids[3]], [
+            entity.id if entity is not None else None
+            for entity in self._storage.get_multi(NewsItemEntity, ids)
+        ])
+
+        self._storage.delete_all(NewsItemEntity)
+        self.assertEqual(0, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual(1, len(self._storage.get_all(HostCircuitEntity)))
+
+        # Deletes are in the log too
+        self._reopen()
+        self.assertEqual(0, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual("down.com", self._storage.get_all(HostCircuitEntity)[0].host)
+
+    def test_compaction(self):
+        news_item = self._create_news_item("https://url_1")
+        for i in range(50):
+            news_item.check_interval = i
+            self._storage.put(news_item)
+        other_ids = self._storage.put_multi([self._create_news_item("https://other_{}".format(i)) for i in range(3)])
+        self._storage.delete_by_id(NewsItemEntity, other_ids[0])
+        log_size = os.path.getsize(self._log_file)
+
+        self._storage.compact()
+        self.assertLess(os.path.getsize(self._log_file), log_size / 10)
+        self.assertFalse(os.path.exists(self._log_file + ".compact"))
+        self.assertEqual(49, self._storage.get_by_id(NewsItemEntity, news_item.id).check_interval)
+        self.assertEqual(
+            ["https://url_1", "https://other_1", "https://other_2"],
+            [entity.url for entity in self._storage.get_all(NewsItemEntity)])
+
+        # Still writable, and readable after a restart
+        news_item.check_interval = 100
+        self._storage.put(news_item)
+        self._reopen()
+        self.assertEqual(100, self._storage.get_by_id(NewsItemEntity, news_item.id).check_interval)
+        self.assertEqual(3, len(self._storage.get_all(NewsItemEntity)))
+
+    def test_background_compaction(self):
+        self._reopen(min_garbage_size=1000, garbage_ratio=0.5)
+        news_item = self._create_news_item("https://url_1")
+
+        def save(i):
+            news_item.check_interval = i
+            self._storage.put(news_item)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(save, range(200)))
+        self._storage.close()
+        self.assertLess(os.path.getsize(self._log_file), 50 * 200)
+
+        self._reopen()
+        self.assertEqual(1, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual("https://url_1", self._storage.get_by_id(NewsItemEntity, news_item.id).url)
+
+    def test_partial_record(self):
+        entity_id = self._storage.put(self._create_news_item("https://url_1"))
+        self._storage.close()
+        log_size = os.path.getsize(self._log_file)
+        # A crash while writing a record
+        with open(self._log_file, "ab") as log:
+            log.write(b"P\tNewsItemEntity\t99\t{\"values\": {\"url\"")
+
+        self._storage = LogStorageService(self._log_file)
+        self.assertEqual(log_size, os.path.getsize(self._log_file))
+        self.assertEqual(["https://url_1"], [entity.url for entity in self._storage.get_all(NewsItemEntity)])
+        self.assertEqual(entity_id + 1, self._storage.put(self._create_news_item("https://url_2")))
+
+    def test_single_process(self):
+        # The log is locked while open
+        with self.assertRaises(OSError):
+            LogStorageService(self._log_file)
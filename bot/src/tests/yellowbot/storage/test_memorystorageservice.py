@@ -0,0 +1,150 @@
+"""Test in-memory storage service
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+from unittest import TestCase
+
+import arrow
+
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+from yellowbot.storage.memorystorageservice import MemoryStorageService
+from yellowbot.storage.newsitementity import NewsItemEntity
+from yellowbot.storage.storagevalues import StorageValues
+
+
+class TestMemoryStorageService(TestCase):
+    def setUp(self):
+        self._storage = MemoryStorageService()
+
+    def tearDown(self):
+        pass
+
+    def _create_news_item(self, url, check_interval=None, last_check=None):
+        news_item = NewsItemEntity()
+        news_item.url = url
+        news_item.check_interval = check_interval
+        news_item.last_check = last_check
+        news_item.seen_ids = ["a", "b"]
+        return news_item
+
+    def _urls(self, operator, property_name, value):
+        return [
+            entity.url
+            for entity in self._storage.get_by_property(NewsItemEntity, property_name, operator, value)
+        ]
+
+    def test_write_and_read(self):
+        last_check = arrow.get("2021-02-01T08:00:10.123456+01:00").datetime
+        news_item = self._create_news_item("https://url_1", 60, last_check)
+        entity_id = self._storage.put(news_item)
+        self.assertEqual(entity_id, news_item.id)
+        self.assertNotEqual(0, entity_id)
+
+        read_entity = self._storage.get_by_id(NewsItemEntity, entity_id)
+        self.assertEqual("https://url_1", read_entity.url)
+        self.assertEqual(60, read_entity.check_interval)
+        self.assertEqual(["a", "b"], read_entity.seen_ids)
+        # Returned in UTC, as Datastore does
+        self.assertEqual(last_check, read_entity.last_check)
+        self.assertEqual(datetime.timezone.utc, read_entity.last_check.tzinfo)
+
+        # Changing the entities doesn't change the storage
+        news_item.seen_ids.append("c")
+        read_entity.seen_ids.append("d")
+        self.assertEqual(["a", "b"], self._storage.get_by_id(NewsItemEntity, entity_id).seen_ids)
+
+        # Update
+        read_entity.url = "https://url_2"
+        self.assertEqual(entity_id, self._storage.put(read_entity))
+        self.assertEqual(["https://url_2"], [entity.url for entity in self._storage.get_all(NewsItemEntity)])
+        # Other kinds are separated
+        self.assertEqual(0, len(self._storage.get_all(HostCircuitEntity)))
+        self.assertIsNone(self._storage.get_by_id(HostCircuitEntity, entity_id))
+
+    def test_get_by_property(self):
+        base_date = arrow.get("2021-02-01T08:00:00Z")
+        self._storage.put_multi([
+            self._create_news_item("https://url_{}".format(i), i * 10, base_date.shift(hours=i).datetime)
+            for i in range(5)
+        ])
+        self._storage.put(self._create_news_item("https://url_none"))
+
+        self.assertEqual(["https://url_2"], self._urls("=", "url", "https://url_2"))
+        self.assertEqual(["https://url_3", "https://url_4"], self._urls(">", "check_interval", 20))
+        self.assertEqual(["https://url_2", "https://url_3", "https://url_4"], self._urls(">=", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1"], self._urls("<", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1", "https://url_2"], self._urls("<=", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1", "https://url_3", "https://url_4"], self._urls("!=", "check_interval", 20))
+        self.assertEqual(["https://url_1", "https://url_3"], self._urls("IN", "check_interval", [10, 30]))
+        self.assertEqual(["https://url_0", "https://url_2", "https://url_4"], self._urls("NOT_IN", "check_interval", [10, 30]))
+        self.assertEqual(["https://url_none"], self._urls("=", "check_interval", None))
+        self.assertEqual(5, len(self._urls("!=", "check_interval", None)))
+        # Dates are compared in UTC, whatever the timezone of the value
+        self.assertEqual(["https://url_3", "https://url_4"], self._urls(">", "last_check", arrow.get("2021-02-01T12:00:00+02:00").datetime))
+        # Values of a different type never match
+        self.assertEqual([], self._urls(">", "check_interval", "10"))
+        self.assertEqual(6, len(self._urls("=", "seen_ids", ["a", "b"])))
+
+        with self.assertRaises(ValueError):
+            self._urls("LIKE", "url", "https://%")
+        with self.assertRaises(ValueError):
+            self._urls("IN", "url", "https://url_2")
+
+    def test_indexes_follow_writes(self):
+        news_items = [self._create_news_item("https://url_{}".format(i), i) for i in range(10)]
+        self._storage.put_multi(news_items)
+        # Builds the indexes
+        self.assertEqual(["https://url_8", "https://url_9"], self._urls(">", "check_interval", 7))
+        self.assertEqual(["https://url_3"], self._urls("=", "check_interval", 3))
+
+        news_items[3].check_interval = 100
+        self._storage.put(news_items[3])
+        self._storage.delete_by_id(NewsItemEntity, news_items[9].id)
+        self._storage.put(self._create_news_item("https://url_new", 50))
+        self.assertEqual(["https://url_3", "https://url_8", "https://url_new"], self._urls(">", "check_interval", 7))
+        self.assertEqual([], self._urls("=", "check_interval", 3))
+        self.assertEqual(["https://url_3"], self._urls("=", "check_interval", 100))
+
+        # Same results of a full scan
+        for operator in ("=", "!=", "<", "<=", ">", ">="):
+            for value in (0, 5, 50, 100, 1000, None):
+                expected = [
+                    entity.url for entity in self._storage.get_all(NewsItemEntity)
+                    if StorageValues.matches(entity.check_interval, operator, value)
+                ]
+                self.assertEqual(expected, self._urls(operator, "check_interval", value), (operator, value))
+
+        self._storage.delete_all(NewsItemEntity)
+        self.assertEqual([], self._urls(">", "check_interval", 0))
+        self._storage.put(self._create_news_item("https://url_again", 1))
+        self.assertEqual(["https://url_again"], self._urls(">", "check_interval", 0))
+
+    def test_delete(self):
+        ids = self._storage.put_multi([self._create_news_item("https://url_{}".format(i)) for i in range(4)])
+        host_circuit = HostCircuitEntity()
+        host_circuit.host = "down.com"
+        self._storage.put(host_circuit)
+
+        self._storage.delete_by_id(NewsItemEntity, ids[0])
+        self.assertIsNone(self._storage.get_by_id(NewsItemEntity, ids[0]))
+        self._storage.delete_multi(NewsItemEntity, [ids[1], ids[2]])
+        self.assertEqual([None, None, None, ids[3]], [
+            entity.id if entity is not None else None
+            for entity in self._storage.get_multi(NewsItemEntity, ids)
+        ])
+
+        self._storage.delete_all(NewsItemEntity)
+        self.assertEqual(0, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual(1, len(self._storage.get_all(HostCircuitEntity)))
+
+    def test_threads(self):
+        def save_and_query(i):
+            entity_id = self._storage.put(self._create_news_item("https://url_{}".format(i), i))
+            self._storage.get_by_property(NewsItemEntity, "check_interval", ">=", i)
+            return entity_id
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = list(executor.map(save_and_query, range(50)))
+        self.assertEqual(50, len(set(ids)))
+        self.assertEqual(25, len(self._urls(">=", "check_interval", 25)))
@@ -0,0 +1,150 @@
+"""Test SQLite storage service
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import arrow
+
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+from yellowbot.storage.newsitementity import NewsItemEntity
+from yellowbot.storage.sqlitestorageservice import SqliteStorageService
+
+
+class TestSqliteStorageService(TestCase):
+    def setUp(self):
+        self._temp_folder = tempfile.TemporaryDirectory()
+        self._database_file = os.path.join(self._temp_folder.name, "test_db.sqlite3")
+        self._storage = SqliteStorageService(self._database_file)
+
+    def tearDown(self):
+        self._storage.close()
+        self._temp_folder.cleanup()
+
+    def _create_news_item(self, url, check_interval=None, last_check=None):
+        news_item = NewsItemEntity()
+        news_item.url = url
+        news_item.check_interval = check_interval
+        news_item.last_check = last_check
+        news_item.seen_ids = ["a", "b"]
+        return news_item
+
+    def test_write_and_read(self):
+        last_check = arrow.get("2021-02-01T08:00:10.123456+01:00").datetime
+        news_item = self._create_news_item("https://url_1", 60, last_check)
+        entity_id = self._storage.put(news_item)
+        self.assertEqual(entity_id, news_item.id)
+        self.assertNotEqual(0, entity_id)
+
+        read_entity = self._storage.get_by_id(NewsItemEntity, entity_id)
+        self.assertEqual("https://url_1", read_entity.url)
+        self.assertEqual(60, read_entity.check_interval)
+        self.assertEqual(["a", "b"], read_entity.seen_ids)
+        # Returned in UTC, as Datastore does
+        self.assertEqual(last_check, read_entity.last_check)
+        self.assertEqual(datetime.timezone.utc, read_entity.last_check.tzinfo)
+
+        # Update
+        read_entity.url = "https://url_2"
+        self.assertEqual(entity_id, self._storage.put(read_entity))
+        self.assertEqual(["https://url_2"], [entity.url for entity in self._storage.get_all(NewsItemEntity)])
+        # Other kinds are separated
+        self.assertEqual(0, len(self._storage.get_all(HostCircuitEntity)))
+        self.assertIsNone(self._storage.get_by_id(HostCircuitEntity, entity_id))
+
+        # Data survives a new connection
+        self._storage.close()
+        storage = SqliteStorageService(self._database_file)
+        self.assertEqual("https://url_2", storage.get_by_id(NewsItemEntity, entity_id).url)
+        storage.close()
+
+    def test_get_by_property(self):
+        base_date = arrow.get("2021-02-01T08:00:00Z")
+        self._storage.put_multi([
+            self._create_news_item("https://url_{}".format(i), i * 10, base_date.shift(hours=i).datetime)
+            for i in range(5)
+        ])
+        self._storage.put(self._create_news_item("https://url_none"))
+
+        def urls(operator, property_name, value):
+            return [entity.url for entity in self._storage.get_by_property(NewsItemEntity, property_name, operator, value)]
+
+        self.assertEqual(["https://url_2"], urls("=", "url", "https://url_2"))
+        self.assertEqual(["https://url_3", "https://url_4"], urls(">", "check_interval", 20))
+        self.assertEqual(["https://url_2", "https://url_3", "https://url_4"], urls(">=", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1"], urls("<", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1", "https://url_2"], urls("<=", "check_interval", 20))
+        self.assertEqual(["https://url_0", "https://url_1", "https://url_3", "https://url_4"], urls("!=", "check_interval", 20))
+        self.assertEqual(["https://url_1", "https://url_3"], urls("IN", "check_interval", [10, 30]))
+        self.assertEqual(["https://url_0", "https://url_2", "https://url_4"], urls("NOT_IN", "check_interval", [10, 30]))
+        self.assertEqual(["https://url_none"], urls("=", "check_interval", None))
+        self.assertEqual(5, len(urls("!=", "check_interval", None)))
+        # Dates are compared in UTC, whatever the timezone of the value
+        self.assertEqual(["https://url_3", "https://url_4"], urls(">", "last_check", arrow.get("2021-02-01T12:00:00+02:00").datetime))
+
+        with self.assertRaises(ValueError):
+            urls("LIKE", "url", "https://%")
+        with self.assertRaises(ValueError):
+            urls("=", "url') OR 1=1 --", "x")
+        with self.assertRaises(ValueError):
+            urls("IN", "url", "https://url_2")
+
+        # The queried properties got their index
+        index_names = [row[0] for row in self._storage._get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")]
+        self.assertIn("entities_property_url", index_names)
+        self.assertIn("entities_property_check_interval", index_names)
+        self.assertEqual("wal", self._storage._get_connection().execute("PRAGMA journal_mode").fetchone()[0])
+
+    def test_delete(self):
+        ids = self._storage.put_multi([self._create_news_item("https://url_{}".format(i)) for i in range(4)])
+        host_circuit = HostCircuitEntity()
+        host_circuit.host = "down.com"
+        self._storage.put(host_circuit)
+
+        self._storage.delete_by_id(NewsItemEntity, ids[0])
+        self.assertIsNone(self._storage.get_by_id(NewsItemEntity, ids[0]))
+        self._storage.delete_multi(NewsItemEntity, [ids[1], ids[2]])
+        self.assertEqual([None, None, None, ids[3]], [
+            entity.id if entity is not None else None
+            for entity in self._storage.get_multi(NewsItemEntity, ids)
+        ])
+
+        self._storage.delete_all(NewsItemEntity)
+        self.assertEqual(0, len(self._storage.get_all(NewsItemEntity)))
+        self.assertEqual(1, len(self._storage.get_all(HostCircuitEntity)))
+
+    def test_threads(self):
+        def save(i):
+            return self._storage.put(self._create_news_item("https://url_{}".format(i)))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            ids = list(executor.map(save, range(20)))
+        self.assertEqual(20, len(set(ids)))
+        self.assertEqual(20, len(self._storage.get_all(NewsItemEntity)))
+
+    @patch.object(SqliteStorageService, "PAGE_SIZE", 5)
+    def test_iter(self):
+        self._storage.put_multi([self._create_news_item("https://url_{}".format(i), i) for i in range(12)])
+
+        iterator = self._storage.iter_all(NewsItemEntity)
+        self.assertEqual("https://url_0", next(iterator).url)
+        # Written between two pages
+        self._storage.put(self._create_news_item("https://url_new", 100))
+        self.assertEqual(12, len(list(iterator)))
+
+        self.assertEqual(
+            ["https://url_9", "https://url_10", "https://url_11"],
+            [entity.url for entity in self._storage.iter_by_property(NewsItemEntity, "check_interval", ">=", 9, limit=3)])
+        read_entities = list(self._storage.iter_by_property(NewsItemEntity, "check_interval", "<", 7, projection=["check_interval"]))
+        self.assertEqual(list(range(7)), [entity.check_interval for entity in read_entities])
+        self.assertFalse(hasattr(read_entities[0], "url"))
+        self.assertEqual(10, len(list(self._storage.iter_all(NewsItemEntity, limit=10))))
+
+        # Checked before iterating
+        with self.assertRaises(ValueError):
+            self._storage.iter_by_property(NewsItemEntity, "url", "LIKE", "https://%")
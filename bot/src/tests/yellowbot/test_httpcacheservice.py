@@ -0,0 +1,102 @@
+"""
+Test the HTTP cache service
+"""
+from unittest import TestCase
+import os
+import tempfile
+import time
+
+import responses
+
+from yellowbot.httpcacheservice import HttpCacheService
+
+
+class TestHttpCacheService(TestCase):
+    def setUp(self):
+        self._cache_folder = tempfile.TemporaryDirectory()
+        self._cache = HttpCacheService(self._cache_folder.name)
+
+    def tearDown(self):
+        self._cache_folder.cleanup()
+
+    @responses.activate
+    def test_get_max_age(self):
+        responses.add(
+            responses.GET,
+            "http://ciao.me/feed",
+            body = "content 1",
+            status = 200,
+            headers = {"Cache-Control": "public, max-age=600", "ETag": '"etag-1"'}
+        )
+        response = self._cache.get("http://ciao.me/feed")
+        self.assertEqual("content 1", response.text)
+
+        # Second call served by the cache
+        response = self._cache.get("http://ciao.me/feed")
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("content 1", response.text)
+        self.assertEqual('"etag-1"', response.headers["etag"])
+
+    @responses.activate
+    def test_get_not_cacheable(self):
+        responses.add(responses.GET, "http://ciao.me/1", body = "1", headers = {"Cache-Control": "no-store"})
+        responses.add(responses.GET, "http://ciao.me/2", body = "2", headers = {"Cache-Control": "no-cache"})
+        responses.add(responses.GET, "http://ciao.me/3", body = "3")
+        responses.add(responses.GET, "http://ciao.me/4", body = "4", status = 500, headers = {"Cache-Control": "max-age=600"})
+        for _ in range(2):
+            for index in range(1, 5):
+                self._cache.get("http://ciao.me/{}".format(index))
+        self.assertEqual(8, len(responses.calls))
+
+    @responses.activate
+    def test_get_ttl(self):
+        # The ttl of the caller wins over the headers, but no-store
+        responses.add(responses.GET, "http://ciao.me/1", body = "1")
+        responses.add(responses.GET, "http://ciao.me/2", body = "2", headers = {"Cache-Control": "max-age=600"})
+        responses.add(responses.GET, "http://ciao.me/3", body = "3", headers = {"Cache-Control": "no-store"})
+        for _ in range(2):
+            self._cache.get("http://ciao.me/1", ttl=600)
+            self._cache.get("http://ciao.me/2", ttl=0)
+            self._cache.get("http://ciao.me/3", ttl=600)
+        self.assertEqual(5, len(responses.calls))
+
+    def test_expires(self):
+        self.assertTrue(self._cache.store(
+            "http://ciao.me/1",
+            200,
+            {"Date": "Sun, 18 Oct 2026 10:00:00 GMT", "Expires": "Sun, 18 Oct 2026 10:10:00 GMT"},
+            b"1"
+        ))
+        self.assertIsNotNone(self._cache.lookup("http://ciao.me/1"))
+        self.assertFalse(self._cache.store("http://ciao.me/2", 200, {"Expires": "0"}, b"2"))
+        self.assertFalse(self._cache.store("http://ciao.me/3", 200, {"Cache-Control": "max-age=600", "Age": "600"}, b"3"))
+
+    def test_lookup_expired(self):
+        self.assertTrue(self._cache.store("http://ciao.me/1", 200, {}, b"1", ttl=1))
+        self.assertIsNotNone(self._cache.lookup("http://ciao.me/1"))
+        time.sleep(1.1)
+        self.assertIsNone(self._cache.lookup("http://ciao.me/1"))
+
+    def test_shared_folder(self):
+        # Another process using the same folder
+        self.assertTrue(self._cache.store("http://ciao.me/1", 200, {}, "caffè".encode("utf-8"), "utf-8", 600))
+        other_cache = HttpCacheService(self._cache_folder.name)
+        cached_response = other_cache.lookup("http://ciao.me/1")
+        self.assertEqual("caffè", cached_response.text)
+        other_cache.clear()
+        self.assertIsNone(self._cache.lookup("http://ciao.me/1"))
+
+    def test_lru_eviction(self):
+        cache = HttpCacheService(self._cache_folder.name, 2500)
+        for index in range(1, 3):
+            cache.store("http://ciao.me/{}".format(index), 200, {}, b"x" * 1000, ttl=600)
+        # Make the first response older, then use it, so the second one
+        #  is the least recently used
+        for index in range(1, 3):
+            os.utime(cache._get_cache_file("http://ciao.me/{}".format(index)), (time.time() - 100, time.time() - 100))
+        self.assertIsNotNone(cache.lookup("http://ciao.me/1"))
+        cache.store("http://ciao.me/3", 200, {}, b"x" * 1000, ttl=600)
+        self.assertIsNotNone(cache.lookup("http://ciao.me/1"))
+        self.assertIsNone(cache.lookup("http://ciao.me/2"))
+        self.assertIsNotNone(cache.lookup("http://ciao.me/3"))
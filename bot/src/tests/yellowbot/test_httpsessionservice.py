@@ -0,0 +1,77 @@
+"""
+Test the HTTP session service
+"""
+import importlib.util
+from unittest import TestCase, skipUnless
+
+import requests
+import responses
+
+from yellowbot.httpsessionservice import Http2SessionService, HttpSessionService
+
+
+class TestHttpSessionService(TestCase):
+    def setUp(self):
+        self._http_session = HttpSessionService(pool_size=4, max_retries=2)
+
+    def tearDown(self):
+        self._http_session.close()
+
+    def test_get_session(self):
+        session = self._http_session._get_session("https://youtube.googleapis.com/youtube/v3/channels?id=1")
+        # Same host, same session
+        self.assertIs(session, self._http_session._get_session("https://YouTube.googleapis.com/youtube/v3/playlistItems"))
+        self.assertIsNot(session, self._http_session._get_session("https://api.darksky.net/forecast"))
+        self.assertIsNot(session, self._http_session._get_session("http://youtube.googleapis.com/youtube/v3/channels"))
+
+        adapter = session.get_adapter("https://youtube.googleapis.com/")
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual(2, adapter.max_retries.total)
+        self.assertFalse(adapter.max_retries.raise_on_status)
+
+    @responses.activate
+    def test_get_and_post(self):
+        responses.add(responses.GET, "http://ciao.me/feed", body = "feed content", status = 200)
+        responses.add(responses.POST, "http://ciao.me/music", body = "ok", status = 200)
+        self.assertEqual("feed content", self._http_session.get("http://ciao.me/feed", timeout=5).text)
+        self.assertEqual("ok", self._http_session.post("http://ciao.me/music", {"Author": "a"}, timeout=5).text)
+        self.assertEqual("Author=a", responses.calls[1].request.body)
+
+
+@skipUnless(importlib.util.find_spec("httpx") and importlib.util.find_spec("h2"), "httpx[http2] not installed")
+class TestHttp2SessionService(TestCase):
+    def setUp(self):
+        import httpx
+
+        def handler(request):
+            if "/timeout" == request.url.path:
+                raise httpx.ConnectTimeout("Timeout", request=request)
+            if "/error" == request.url.path:
+                raise httpx.ConnectError("Error", request=request)
+            return httpx.Response(
+                200,
+                headers = {"ETag": '"etag-1"', "Content-Type": "text/plain; charset=utf-8"},
+                text = "{} {}".format(request.method, request.content.decode("utf-8"))
+            )
+
+        self._http_session = Http2SessionService()
+        self._http_session._client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    def tearDown(self):
+        self._http_session.close()
+
+    def test_requests_response(self):
+        response = self._http_session.get("https://youtube.googleapis.com/youtube/v3/channels", timeout=(5, 20))
+        self.assertIsInstance(response, requests.Response)
+        self.assertTrue(response.ok)
+        self.assertEqual("GET ", response.text)
+        self.assertEqual('"etag-1"', response.headers["etag"])
+
+        response = self._http_session.post("https://ciao.me/music", {"Author": "a"}, timeout=5)
+        self.assertEqual("POST Author=a", response.text)
+
+    def test_requests_errors(self):
+        with self.assertRaises(requests.Timeout):
+            self._http_session.get("https://ciao.me/timeout")
+        with self.assertRaises(requests.ConnectionError):
+            self._http_session.get("https://ciao.me/error")
@@ -75,10 +75,16 @@ class TestNluEngine(TestCase):
         sentence = "/checkfornews"
         intent, params = self.nlu_engine.infer_intent_and_args(sentence)
         self.assertEqual(GlobalBag.CHECKFORNEWS_INTENT, intent)
-        self.assertEqual(1, len(params))
+        self.assertEqual(2, len(params))
         self.assertFalse(params.get(GlobalBag.CHECKFORNEWS_PARAM_SILENT))
+        self.assertTrue(params.get(GlobalBag.CHECKFORNEWS_PARAM_FORCE))
 
         sentence = "/newssources"
         intent, params = self.nlu_engine.infer_intent_and_args(sentence)
         self.assertEqual(GlobalBag.NEWSSOURCES_INTENT, intent)
         self.assertEqual(0, len(params))
+
+        sentence = "/youtubequota"
+        intent, params = self.nlu_engine.infer_intent_and_args(sentence)
+        self.assertEqual(GlobalBag.YOUTUBE_QUOTA_INTENT, intent)
+        self.assertEqual(0, len(params))
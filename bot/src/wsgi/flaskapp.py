@@ -79,6 +79,31 @@ def receive_message_thread(yellowbot: YellowBot, message):
         _logger.exception("For some reasons, an error bubbled up in the receive_message: {}".format(err))
 
 
+def websub_notification_thread(yellowbot: YellowBot, subscription_id: str, content: bytes, signature):
+    """
+    Thread function to send the content pushed by a WebSub hub to YellowBot
+
+    :param yellowbot:
+    :type yellowbot: YellowBot
+
+    :param subscription_id: the id of the subscription
+    :type subscription_id: str
+
+    :param content: the raw body of the request
+    :type content: bytes
+
+    :param signature: the X-Hub-Signature header
+    :type signature: str
+    """
+
+    # The expectaion is that error handling happen inside this method
+    #  so the try here is really for exceptional cases
+    try:
+        yellowbot.receive_websub_notification(subscription_id, content, signature)
+    except BaseException as err:
+        _logger.exception("For some reasons, an error bubbled up in the WebSub notification: {}".format(err))
+
+
 def tick_scheduler_thread(yellowbot: YellowBot):
     """
     Therad function to launch the scheduler service in YellowBot
@@ -278,6 +303,54 @@ def telegram_webhook_lurch():
         return make_response("OK", 200)
 
 
+@app.route('{}/websub/<subscription_id>'.format(FLASK_BASE_API_ADDRESS), methods=["GET"])
+def websub_verify(subscription_id: str):
+    """
+    Verification of a WebSub subscription, requested by the hub
+
+    :return: 200 with the challenge of the hub as body if the subscription
+    is known, otherwise 404
+    """
+    _logger.info("API call for WebSub verification arrived")
+
+    execution_result = yellowbot.process_intent(
+        GlobalBag.WEBSUB_VERIFY_INTENT,
+        {
+            GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID: subscription_id,
+            GlobalBag.WEBSUB_PARAM_MODE: request.args.get(GlobalBag.WEBSUB_PARAM_MODE),
+            GlobalBag.WEBSUB_PARAM_TOPIC: request.args.get(GlobalBag.WEBSUB_PARAM_TOPIC),
+            GlobalBag.WEBSUB_PARAM_CHALLENGE: request.args.get(GlobalBag.WEBSUB_PARAM_CHALLENGE),
+            GlobalBag.WEBSUB_PARAM_LEASE_SECONDS: request.args.get(GlobalBag.WEBSUB_PARAM_LEASE_SECONDS)
+        }
+    )
+    if not execution_result.went_well():
+        abort(404)
+    # The hub expects the challenge echoed back as it is
+    response = make_response(execution_result.get_plan_message(), 200)
+    response.mimetype = "text/plain"
+    return response
+
+
+@app.route('{}/websub/<subscription_id>'.format(FLASK_BASE_API_ADDRESS), methods=["POST"])
+def websub_notification(subscription_id: str):
+    """
+    New content pushed by a WebSub hub.
+    Once the request is received, is routed to the YellowBot in a separate
+     thread
+
+    :return: 200 as status code, regardless the result of the operation, as
+    required by WebSub also for content with an invalid signature
+    """
+    _logger.info("API call for WebSub notification arrived")
+
+    t = threading.Thread(
+        name="WebSub",
+        target=websub_notification_thread,
+        args=(yellowbot, subscription_id, request.get_data(), request.headers.get("X-Hub-Signature")))
+    t.start()
+    return make_response("OK", 200)
+
+
 @app.errorhandler(500)
 def server_error(err):
     """
@@ -0,0 +1,60 @@
+"""Parse RSS and Atom feeds with feedparser, returning compact entries
+
+feedparser is pure Python, and parsing a big feed holds the GIL for a long
+ time, slowing down all the other threads of the process, like the ones
+ serving the webhooks. For this reason the parsing can run in a separate
+ process: this is a module level function, so it can be sent to a process
+ pool, and it returns only plain tuples, cheap to send back to the caller,
+ instead of the whole feedparser result.
+
+Requirements
+- feedparser
+"""
+
+import calendar
+from typing import List, Optional, Tuple
+
+# id, title, link, date as Unix timestamp and full content of an entry.
+#  Each field is None if not available in the feed
+FeedEntry = Tuple[Optional[str], Optional[str], Optional[str], Optional[int], Optional[str]]
+
+
+def parse_feed_entries(feed_content: str, use_published: bool = False) -> Tuple[Optional[str], List[FeedEntry]]:
+    """Parse a feed, returning its entries in document order
+
+    :param feed_content: the content of the feed
+    :type feed_content: str
+
+    :param use_published: if True, the date of an entry is the published
+     one, otherwise updated is used when available, then published
+    :type use_published: bool
+
+    :returns: the description of the error found while parsing the feed,
+     None if the feed is well-formed, and the entries found
+    :rtype: tuple
+    """
+
+    import feedparser
+
+    d = feedparser.parse(feed_content)
+    parsing_error = str(d.get("bozo_exception")) if d.bozo else None
+
+    entries: List[FeedEntry] = []
+    for feed_entry in d.entries:
+        # There are two fields: updated and published. Some feeds
+        #  use updated, other published. Check one, and then the other
+        # Check also https://feedparser.readthedocs.io/en/latest/reference-entry-updated.html
+        #  because Feedparse, for now, links pubDate to updated, if
+        #  updated is not present
+        if use_published:
+            entry_date = feed_entry.get("published_parsed")
+        else:
+            entry_date = feed_entry.get("updated_parsed") or feed_entry.get("published_parsed")
+        entries.append((
+            feed_entry.get("id"),
+            feed_entry.get("title"),
+            feed_entry.get("link"),
+            calendar.timegm(entry_date) if entry_date else None,
+            feed_entry.content[0].value if "content" in feed_entry else None
+        ))
+    return parsing_error, entries
@@ -0,0 +1,230 @@
+"""Circuit breaker for the hosts contacted by the gears
+
+Each host has its own breaker:
+- closed: requests go through, and consecutive failures are counted
+- open: after too many consecutive failures, requests are not sent at all
+   until the cool-down period ends
+- half open: once the cool-down period ends, a single request is allowed
+   as a probe, while the others are still refused. If the probe succeeds,
+   the breaker is closed again, otherwise it's opened for another
+   cool-down period
+
+The state of the breakers is kept in HostCircuitEntity objects, so the
+ caller can read them from a storage and save them back, preserving the
+ state across different runs. The class doesn't use the storage directly.
+
+Methods are thread safe, so the same breaker can be shared by parallel
+ workers.
+"""
+
+import threading
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import arrow
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
+
+
+class HostCircuitOpenError(Exception):
+    """Raised when a request is sent to a host whose breaker is open
+    """
+
+
+class HostCircuitBreaker:
+    """Track failures of the contacted hosts, and pause the failing ones
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        cooldown_minutes: int,
+        host_circuits: Optional[List[HostCircuitEntity]] = None
+    ) -> None:
+        """Constructor
+
+        :param failure_threshold: how many consecutive failures open the
+         breaker of a host
+        :type failure_threshold: int
+
+        :param cooldown_minutes: how long, in minutes, requests to a failing
+         host are paused before probing it again
+        :type cooldown_minutes: int
+
+        :param host_circuits: the state of the breakers, as saved at the end
+         of a previous run
+        :type host_circuits: list[HostCircuitEntity]
+        """
+
+        self._logger = LoggingService.get_logger(__name__)
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown_minutes = max(1, cooldown_minutes)
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, HostCircuitEntity] = {}
+        for host_circuit in host_circuits or []:
+            if hasattr(host_circuit, "host"):
+                self._circuits[host_circuit.host] = host_circuit
+        self._changed_hosts: Set[str] = set()
+        self._messages: List[str] = []
+        # Hosts with a probe in progress, after the cool-down period
+        self._probing_hosts: Set[str] = set()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        """Returns the host of an url, the key used for the breakers
+        """
+        return urlparse(url).netloc.lower()
+
+    def allow_request(self, url: str) -> bool:
+        """Checks if a request to the host of the url can be sent
+
+        :param url: the url to request
+        :type url: str
+
+        :returns: False if the breaker of the host is open, or another
+         request is probing the host. When True after the cool-down period,
+         the request is the probe, and its result has to be recorded with
+         record_success or record_failure, or the request canceled with
+         cancel_request
+        :rtype: bool
+        """
+
+        host = HostCircuitBreaker.get_host(url)
+        with self._lock:
+            if not self._is_paused(host):
+                if self._is_open(host):
+                    self._probing_hosts.add(host)
+                return True
+            return False
+
+    def is_paused(self, url: str) -> bool:
+        """Checks if requests to the host of the url are refused, without
+         asking to send one, as allow_request does
+
+        :param url: the url to request
+        :type url: str
+
+        :returns: True during the cool-down period, or while another
+         request is probing the host
+        :rtype: bool
+        """
+
+        host = HostCircuitBreaker.get_host(url)
+        with self._lock:
+            return self._is_paused(host)
+
+    def cancel_request(self, url: str) -> None:
+        """A request allowed by allow_request was not sent, so, if it was
+         the probe, another request can probe the host
+        """
+
+        host = HostCircuitBreaker.get_host(url)
+        with self._lock:
+            self._probing_hosts.discard(host)
+
+    def _is_open(self, host: str) -> bool:
+        """Checks if the breaker of the host was opened, whether the
+         cool-down period has ended or not. Call it holding the lock
+        """
+
+        return getattr(self._circuits.get(host), "open_until", None) is not None
+
+    def _is_paused(self, host: str) -> bool:
+        """Checks if requests to the host are refused. Call it holding the
+         lock
+        """
+
+        open_until = getattr(self._circuits.get(host), "open_until", None)
+        if open_until is None:
+            return False
+        return arrow.get(open_until) > arrow.utcnow() or host in self._probing_hosts
+
+    def record_success(self, url: str) -> None:
+        """The host of the url answered, so its breaker is closed
+        """
+
+        host = HostCircuitBreaker.get_host(url)
+        with self._lock:
+            self._probing_hosts.discard(host)
+            host_circuit = self._circuits.get(host)
+            if host_circuit is None or not getattr(host_circuit, "failures", None):
+                return
+            if getattr(host_circuit, "open_until", None) is not None:
+                self._messages.append("Host {} is reachable again, its news sources are checked as usual".format(host))
+            host_circuit.failures = 0
+            host_circuit.open_until = None
+            host_circuit.last_error = None
+            self._changed_hosts.add(host)
+
+    def record_failure(self, url: str, error: str) -> None:
+        """The host of the url didn't answer, or answered with a server
+         error. After too many consecutive failures, its breaker is opened
+
+        :param url: the url requested
+        :type url: str
+
+        :param error: a description of the failure
+        :type error: str
+        """
+
+        host = HostCircuitBreaker.get_host(url)
+        with self._lock:
+            self._probing_hosts.discard(host)
+            host_circuit = self._circuits.get(host)
+            if host_circuit is None:
+                host_circuit = HostCircuitEntity()
+                host_circuit.host = host
+                self._circuits[host] = host_circuit
+            host_circuit.failures = (getattr(host_circuit, "failures", None) or 0) + 1
+            host_circuit.last_error = error
+            self._changed_hosts.add(host)
+            if host_circuit.failures < self._failure_threshold:
+                return
+            paused_until = getattr(host_circuit, "open_until", None)
+            if paused_until is not None and arrow.get(paused_until) > arrow.utcnow():
+                # Already paused, the request was sent at the same time of
+                #  the ones that opened the breaker
+                return
+
+            open_until = arrow.utcnow().shift(minutes=self._cooldown_minutes)
+            host_circuit.open_until = open_until.datetime
+            self._logger.warning("Host {} failed {} times in a row, paused until {}".format(
+                host,
+                host_circuit.failures,
+                open_until
+            ))
+            self._messages.append("Host {} failed {} times in a row ({}), its news sources are paused until {}".format(
+                host,
+                host_circuit.failures,
+                error,
+                open_until.format("YYYY-MM-DD HH:mm ZZ")
+            ))
+
+    def get_open_hosts(self) -> List[str]:
+        """Returns the hosts whose breaker is open, sorted by name
+        """
+
+        with self._lock:
+            return sorted(
+                host for host, host_circuit in self._circuits.items()
+                if getattr(host_circuit, "open_until", None) is not None
+            )
+
+    def get_changed_host_circuits(self) -> List[HostCircuitEntity]:
+        """Returns the state of the breakers changed since the creation of
+         the object, to save them
+        """
+
+        with self._lock:
+            return [self._circuits[host] for host in sorted(self._changed_hosts)]
+
+    def pop_messages(self) -> List[str]:
+        """Returns, and forget, the messages about the breakers opened or
+         closed since the last call
+        """
+
+        with self._lock:
+            messages = self._messages
+            self._messages = []
+            return messages
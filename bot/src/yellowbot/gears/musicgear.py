@@ -4,12 +4,13 @@ A YellowBot gear to add title and artist of a song to a Google Spreadsheet
 Requirements
 - requests
 """
-from typing import Any, ClassVar, Dict, List, Optional
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 import requests
 
 from yellowbot.gears.basegear import BaseGear
 from yellowbot.gears.gearexecutionresult import GearExecutionResult
 from yellowbot.globalbag import GlobalBag
+from yellowbot.httpsessionservice import HttpSessionService
 from yellowbot.loggingservice import LoggingService
 
 
@@ -20,11 +21,13 @@ class MusicGear(BaseGear):
     INTENTS: ClassVar[List[str]] = [GlobalBag.TRACE_MUSIC_INTENT]
     PARAM_TITLE: ClassVar[str] = GlobalBag.TRACE_MUSIC_PARAM_TITLE
     PARAM_AUTHOR: ClassVar[str]  = GlobalBag.TRACE_MUSIC_PARAM_AUTHOR
+    REQUEST_TIMEOUT: ClassVar[Tuple[float, float]] = (5, 20)  # Connect and read timeouts, in seconds
 
     def __init__(
         self,
         destination_url: str,
-        test_mode:bool = False
+        test_mode:bool = False,
+        http_session: Optional[HttpSessionService] = None
     ) -> None:
         """
 
@@ -34,11 +37,16 @@ class MusicGear(BaseGear):
         :param test_mode: class instance created for test purposes, some
         features are disabled
         :type test_mode: bool
+
+        :param http_session: pooled sessions used for the HTTP calls. None,
+         the default, opens a new connection for every call
+        :type http_session: HttpSessionService
         """
         super().__init__(self.__class__.__name__, self.INTENTS)
         self._logger = LoggingService.get_logger(__name__)
         self._destination_url = destination_url
         self._test_mode = test_mode
+        self._http_session = http_session
 
     def process_intent(
         self,
@@ -71,7 +79,8 @@ class MusicGear(BaseGear):
 
         try:
             self._logger.info("Sending music trace request to url {}".format(self._destination_url))
-            response = requests.post(self._destination_url, data)
+            http_client = self._http_session if self._http_session is not None else requests
+            response = http_client.post(self._destination_url, data, timeout=MusicGear.REQUEST_TIMEOUT)
             if response.ok:
                 # Sometimes 200 is returned even if there is an error of some sort
                 # Because this code is very generic, send a form data to an
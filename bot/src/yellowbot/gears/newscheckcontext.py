@@ -0,0 +1,126 @@
+"""State of a single check of the news sources
+
+Different checks can run at the same time on the same gear: the scheduled
+ one, the one requested by a user, and the processing of the content pushed
+ by the WebSub hubs. For this reason, the state of a check, like its
+ deadline, the sources it skipped, the circuit breaker with the state of
+ the hosts and the ledger of the YouTube API quota, isn't kept in the gear:
+ a context is created when the check starts, and passed down to all the
+ methods working for that check.
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+from yellowbot.gears.hostcircuitbreaker import HostCircuitBreaker
+from yellowbot.gears.youtubequotaledger import YouTubeQuotaLedger
+
+
+class NewsCheckContext:
+    """State of a single check of the news sources
+
+    The same context is shared by all the workers checking the sources, so
+     the lists of sources are guarded by a lock
+    """
+
+    def __init__(self, deadline: Optional[float] = None) -> None:
+        """Constructor
+
+        :param deadline: when the check has to end, as time.monotonic()
+         value. None if there is no deadline
+        :type deadline: float
+        """
+
+        self._deadline = deadline
+        self._lock = threading.Lock()
+        self._skipped_news_sources: List[str] = []
+        self._deferred_news_sources: List[str] = []
+        self._host_circuit_breaker: Optional[HostCircuitBreaker] = None
+        self._youtube_quota_ledger: Optional[YouTubeQuotaLedger] = None
+
+    @staticmethod
+    def with_deadline(deadline: int) -> 'NewsCheckContext':
+        """Creates the context of a check that has to end in the given time
+
+        :param deadline: max seconds for the whole check. 0 means no deadline
+        :type deadline: int
+
+        :returns: the context of the check
+        :rtype: NewsCheckContext
+        """
+
+        return NewsCheckContext(time.monotonic() + deadline if deadline and deadline > 0 else None)
+
+    def get_remaining_time(self) -> Optional[float]:
+        """Seconds left before the deadline of the check, None if there is
+         no deadline
+        """
+
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def add_skipped_news_source(self, newssource_url: str) -> None:
+        """Adds a source not checked because the deadline expired
+        """
+
+        with self._lock:
+            self._skipped_news_sources.append(newssource_url)
+
+    def get_skipped_news_sources(self) -> List[str]:
+        """Returns the sources skipped because the deadline expired, sorted,
+         because parallel workers skip them in random order
+        """
+
+        with self._lock:
+            return sorted(self._skipped_news_sources)
+
+    def add_deferred_news_source(self, newssource_url: str) -> None:
+        """Adds a source not checked because the YouTube API budget is used up
+        """
+
+        with self._lock:
+            self._deferred_news_sources.append(newssource_url)
+
+    def get_deferred_news_sources(self) -> List[str]:
+        """Returns the sources deferred because the YouTube API budget is
+         used up, sorted
+        """
+
+        with self._lock:
+            return sorted(self._deferred_news_sources)
+
+    def set_host_circuit_breaker(self, host_circuit_breaker: Optional[HostCircuitBreaker]) -> None:
+        """Sets the circuit breaker used by the check, loaded from the storage
+
+        :param host_circuit_breaker: the circuit breaker, None if it's not
+         enabled
+        :type host_circuit_breaker: HostCircuitBreaker
+        """
+
+        self._host_circuit_breaker = host_circuit_breaker
+
+    def get_host_circuit_breaker(self) -> Optional[HostCircuitBreaker]:
+        """Returns the circuit breaker used by the check, None if it's not
+         enabled
+        """
+
+        return self._host_circuit_breaker
+
+    def set_youtube_quota_ledger(self, youtube_quota_ledger: Optional[YouTubeQuotaLedger]) -> None:
+        """Sets the ledger charged by the YouTube API calls of the check
+
+        :param youtube_quota_ledger: the quota ledger, None if the check has
+         no YouTube channels
+        :type youtube_quota_ledger: YouTubeQuotaLedger
+        """
+
+        self._youtube_quota_ledger = youtube_quota_ledger
+
+    def get_youtube_quota_ledger(self) -> Optional[YouTubeQuotaLedger]:
+        """Returns the ledger charged by the YouTube API calls of the check,
+         None if the check has no YouTube channels
+        """
+
+        return self._youtube_quota_ledger
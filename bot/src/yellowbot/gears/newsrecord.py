@@ -0,0 +1,92 @@
+"""A single piece of news found by the NewsReportGear
+
+Records flow through the whole news pipeline, from the parsing of a source
+ to the end of a check, where they're turned into messages for the user.
+ Keeping them structured, instead of plain text, allows to merge, dedup
+ and sort records coming from different sources, and formatting is done
+ only once, for the records really sent.
+"""
+
+from typing import ClassVar, Optional
+
+
+class NewsRecord:
+    """A new content, or an error, found while checking a news source
+
+    Slots are used instead of a per-instance dict, because a check can
+     create many records
+    """
+
+    KIND_VIDEO: ClassVar[str] = "video"
+    KIND_ARTICLE: ClassVar[str] = "article"
+    KIND_COMMITSTRIP: ClassVar[str] = "commitstrip"
+    KIND_ERROR: ClassVar[str] = "error"  # Title has the error description
+
+    __slots__ = ("source", "title", "url", "published", "kind")
+
+    def __init__(
+        self,
+        source: Optional[str],
+        title: str,
+        url: Optional[str],
+        published: int = 0,
+        kind: str = KIND_ARTICLE
+    ) -> None:
+        """Constructor
+
+        :param source: the url of the news source the record comes from
+        :type source: str
+
+        :param title: the title of the content
+        :type title: str
+
+        :param url: the url of the content
+        :type url: str
+
+        :param published: when the content was published, as Unix timestamp.
+         0 if unknown
+        :type published: int
+
+        :param kind: one of the KIND_* values
+        :type kind: str
+        """
+
+        self.source = source
+        self.title = title
+        self.url = url
+        self.published = published
+        self.kind = kind
+
+    @staticmethod
+    def error(source: str, message: str) -> 'NewsRecord':
+        """Creates a record for an error happened while checking a source
+        """
+        return NewsRecord(source, message, None, 0, NewsRecord.KIND_ERROR)
+
+    def is_error(self) -> bool:
+        return NewsRecord.KIND_ERROR == self.kind
+
+    def to_message(self) -> str:
+        """Formats the record as a message for the user
+
+        :returns: the message
+        :rtype: str
+        """
+
+        if NewsRecord.KIND_VIDEO == self.kind:
+            return "New video published: {} - {}".format(self.title, self.url)
+        elif NewsRecord.KIND_COMMITSTRIP == self.kind:
+            return "New CommitStrip content: {} - {}".format(self.title, self.url)
+        elif NewsRecord.KIND_ERROR == self.kind:
+            return self.title
+        else:
+            return "New article published: {} - {}".format(self.title, self.url)
+
+    def __repr__(self) -> str:
+        return "NewsRecord(kind={}, source={}, title={}, url={}, published={})".format(
+            self.kind,
+            self.source,
+            self.title,
+            self.url,
+            self.published
+        )
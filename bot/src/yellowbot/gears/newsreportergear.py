@@ -5,25 +5,86 @@ This class controls various source of information, like RSS feeds, YouTube
  last check.
 Once updates are found, they're send over a surface to notify the user.
 
+Each source check produces NewsRecord objects, merged together and turned
+ into messages only at the end of the whole check. An entry is new if its
+ identifier is not in the SeenEntryIndex of the source, saved with the
+ entity of the source.
+
+Sources can be checked sequentially, with a pool of threads or, using the
+ asyncio fetch mode, all together on a single event loop. Optionally,
+ feedparser runs in a small pool of processes, so parsing big feeds doesn't
+ slow down the other threads of the process.
+
+With adaptive polling, each source has its own check interval, shortened
+ when the source publishes something and lengthened when it doesn't, and
+ sources not yet due are skipped, unless a full check is forced.
+
+With the circuit breaker enabled, hosts failing too many times in a row are
+ paused for a while, and their sources skipped, instead of being contacted,
+ and reporting the same error, at every check.
+
+Every HTTP call has connect and read timeouts and, when a deadline is given,
+ the whole check stops once it expires: requests are bounded by the time
+ left, sources not yet checked are skipped and listed in a note, and
+ checked again next time.
+
+With an HTTP cache, responses still fresh are read from disk, so checks
+ close to each other, like a manual one after the scheduled one, don't
+ contact the sources again.
+
+With WebSub enabled, each check also subscribes to the hubs of the sources
+ that advertise one, YouTube channels included. The hub pushes the new
+ content to the bot as soon as it's published, and sources with an active
+ subscription are not polled anymore, unless a full check is forced.
+
+The YouTube Data API units used by the checks are counted, day by day, by a
+ quota ledger. With a daily budget, once the units used get close to it
+ channels are checked with their feed, that doesn't use quota, and the API
+ is used only when the feed is not available, until the budget is used up.
+
 Requirements
 - requests
 - arrow
+- aiohttp, only for the asyncio fetch mode
 """
 
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
 from logging import Logger
+import multiprocessing
+import statistics
+import threading
 import requests
 from arrow import Arrow
 import arrow
+import json
 
 from types import SimpleNamespace
-from typing import Any, Dict, List, Optional, TypeVar, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+from xml.etree import ElementTree
 
 from yellowbot.gears.basegear import BaseGear
+from yellowbot.gears.feedparsing import FeedEntry, parse_feed_entries
 from yellowbot.gears.gearexecutionresult import GearExecutionResult
+from yellowbot.gears.hostcircuitbreaker import HostCircuitBreaker, HostCircuitOpenError
+from yellowbot.gears.newscheckcontext import NewsCheckContext
+from yellowbot.gears.newsrecord import NewsRecord
+from yellowbot.gears.seenentryindex import SeenEntryIndex
+from yellowbot.gears.streamingfeedparser import StreamingFeedParser
+from yellowbot.gears.websubsubscriber import WebSubSubscriber
+from yellowbot.gears.youtubequotaledger import YouTubeQuotaExceededError, YouTubeQuotaLedger
 from yellowbot.globalbag import GlobalBag
+from yellowbot.httpcacheservice import HttpCacheService
+from yellowbot.httpsessionservice import HttpSessionService
 from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.baseentity import BaseEntity
 from yellowbot.storage.basestorageservice import BaseStorageService
+from yellowbot.storage.hostcircuitentity import HostCircuitEntity
 from yellowbot.storage.newsitementity import NewsItemEntity
+from yellowbot.storage.websubsubscriptionentity import WebSubSubscriptionEntity
+from yellowbot.storage.youtubequotaentity import YouTubeQuotaEntity
 
 BSS = TypeVar('BSS', bound=BaseStorageService)
 # See here for explanation: https://www.python.org/dev/peps/pep-0484/#the-type-of-class-objects
@@ -32,14 +93,50 @@ class NewsReportGear(BaseGear):
     """Check updates from different sources and send them to a specific surface
     """
 
-    INTENTS = [GlobalBag.CHECKFORNEWS_INTENT, GlobalBag.NEWSSOURCES_INTENT]
+    INTENTS = [
+        GlobalBag.CHECKFORNEWS_INTENT,
+        GlobalBag.NEWSSOURCES_INTENT,
+        GlobalBag.WEBSUB_VERIFY_INTENT,
+        GlobalBag.WEBSUB_NOTIFICATION_INTENT,
+        GlobalBag.YOUTUBE_QUOTA_INTENT
+    ]
     PARAM_SILENT = GlobalBag.CHECKFORNEWS_PARAM_SILENT  # No notification if there is nothing new 
+    PARAM_FORCE = GlobalBag.CHECKFORNEWS_PARAM_FORCE  # Check all the sources, even the ones not yet due
+    PARAM_DEADLINE = GlobalBag.CHECKFORNEWS_PARAM_DEADLINE  # Max seconds for the whole check
+
+    FETCH_MODE_THREADS = "threads"  # Sequential, or a pool of threads if max_workers > 1
+    FETCH_MODE_ASYNCIO = "asyncio"  # All the sources on a single event loop
+
+    SOURCE_TYPE_YOUTUBE = "youtube"
+    SOURCE_TYPE_RSS = "rss"
+
+    YOUTUBE_MAX_IDS_PER_CALL = 50  # Max ids accepted by a channels.list call
+    YOUTUBE_API_URL = "https://youtube.googleapis.com/youtube/v3/"
 
     def __init__(
         self,
         youtube_api_key: str,
         newssources_urls: List[str],
-        storage_service: BSS
+        storage_service: BSS,
+        max_workers: int = 1,
+        fetch_mode: str = FETCH_MODE_THREADS,
+        max_connections_per_host: int = 4,
+        youtube_use_feed: bool = False,
+        feed_stop_after_old_entries: int = 0,
+        min_check_interval: int = 0,
+        max_check_interval: int = 0,
+        breaker_failure_threshold: int = 0,
+        breaker_cooldown: int = 60,
+        connect_timeout: float = 5,
+        read_timeout: float = 20,
+        check_deadline: int = 0,
+        parse_processes: int = 0,
+        http_cache: Optional[HttpCacheService] = None,
+        http_cache_ttl: Optional[int] = None,
+        http_session: Optional[HttpSessionService] = None,
+        websub_callback_url: Optional[str] = None,
+        websub_lease_seconds: int = 864000,
+        youtube_daily_budget: int = 0
     ) -> None:
         """Constructor
 
@@ -48,6 +145,93 @@ class NewsReportGear(BaseGear):
 
         :param storage_service: the storage service to use. Caller object will decide the specific implementation
         :type storaga_service: BaseStorageService subclass
+
+        :param max_workers: how many news sources are checked in parallel.
+         1, the default, checks them one after the other
+        :type max_workers: int
+
+        :param fetch_mode: how the sources are fetched, FETCH_MODE_THREADS or
+         FETCH_MODE_ASYNCIO
+        :type fetch_mode: str
+
+        :param max_connections_per_host: in asyncio fetch mode, how many
+         connections can be opened at the same time to the same host
+        :type max_connections_per_host: int
+
+        :param youtube_use_feed: if True, YouTube channels are checked using
+         their Atom feed, with no API quota used. YouTube API is used only
+         when the feed is not available
+        :type youtube_use_feed: bool
+
+        :param feed_stop_after_old_entries: if greater than 0, RSS and Atom
+         feeds are parsed incrementally, and parsing stops once this number
+         of consecutive entries already seen, or older than the last check
+         for sources without seen entries, has been found.
+         0, the default, parses the whole feed with feedparser
+        :type feed_stop_after_old_entries: int
+
+        :param min_check_interval: if greater than 0, enables adaptive
+         polling, and it's the shortest interval, in minutes, between two
+         checks of the same source. 0, the default, checks all the sources
+         every time
+        :type min_check_interval: int
+
+        :param max_check_interval: the longest interval, in minutes, between
+         two checks of the same source, when adaptive polling is enabled
+        :type max_check_interval: int
+
+        :param breaker_failure_threshold: if greater than 0, enables the
+         circuit breaker, and it's the number of consecutive failures that
+         pause all the requests to a host. 0, the default, never pauses
+        :type breaker_failure_threshold: int
+
+        :param breaker_cooldown: how long, in minutes, a failing host is
+         paused before trying it again
+        :type breaker_cooldown: int
+
+        :param connect_timeout: max seconds to wait for the connection to a
+         host, for every HTTP call
+        :type connect_timeout: float
+
+        :param read_timeout: max seconds to wait for data from a host, for
+         every HTTP call
+        :type read_timeout: float
+
+        :param check_deadline: default max seconds for a whole check, when
+         the intent doesn't specify one. 0, the default, means no deadline
+        :type check_deadline: int
+
+        :param parse_processes: if greater than 0, feeds are parsed by a
+         pool with this number of processes, while the download stays in
+         the calling thread. 0, the default, parses them in the calling
+         thread
+        :type parse_processes: int
+
+        :param http_cache: cache for the responses of the news sources.
+         None, the default, disables the cache
+        :type http_cache: HttpCacheService
+
+        :param http_cache_ttl: seconds a response is cached, regardless of
+         its headers. None uses the headers
+        :type http_cache_ttl: int
+
+        :param http_session: pooled sessions used for the HTTP calls of the
+         sequential and threads fetch modes. None, the default, opens a new
+         connection for every call
+        :type http_session: HttpSessionService
+
+        :param websub_callback_url: public url of the WebSub endpoint of the
+         bot. None, the default, disables WebSub
+        :type websub_callback_url: str
+
+        :param websub_lease_seconds: the lease requested to the hubs for the
+         WebSub subscriptions, default 10 days
+        :type websub_lease_seconds: int
+
+        :param youtube_daily_budget: YouTube Data API units the checks can
+         use each day. Close to the budget, channels are checked with their
+         feed. 0, the default, means no budget, units are only counted
+        :type youtube_daily_budget: int
         """
 
         super().__init__(self.__class__.__name__, self.INTENTS)
@@ -55,6 +239,34 @@ class NewsReportGear(BaseGear):
         self._youtube_api_key = youtube_api_key
         self._newssources_urls = newssources_urls
         self._storage = storage_service
+        self._max_workers = max(1, max_workers or 1)
+        self._fetch_mode = fetch_mode or NewsReportGear.FETCH_MODE_THREADS
+        self._max_connections_per_host = max(1, max_connections_per_host or 1)
+        self._youtube_use_feed = youtube_use_feed
+        self._feed_stop_after_old_entries = max(0, feed_stop_after_old_entries or 0)
+        self._min_check_interval = max(0, min_check_interval or 0)
+        self._max_check_interval = max(self._min_check_interval, max_check_interval or 0)
+        self._breaker_failure_threshold = max(0, breaker_failure_threshold or 0)
+        self._breaker_cooldown = max(1, breaker_cooldown or 1)
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._check_deadline = max(0, check_deadline or 0)
+        self._parse_processes = max(0, parse_processes or 0)
+        # Created on first use, and reused by all the checks
+        self._parse_executor: Optional[ProcessPoolExecutor] = None
+        self._parse_executor_lock = threading.Lock()
+        self._http_cache = http_cache
+        self._http_cache_ttl = http_cache_ttl
+        self._http_session = http_session
+        self._websub_callback_url = websub_callback_url
+        self._websub_lease_seconds = websub_lease_seconds
+        self._youtube_daily_budget = max(0, youtube_daily_budget or 0)
+        # Read, update and save of the YouTube API usage of the day are
+        #  serialized, as different checks can run at the same time
+        self._youtube_quota_lock = threading.Lock()
+        # The news entities are saved by the checks and by the processing
+        #  of the content pushed by WebSub hubs, that can run at the same time
+        self._news_items_lock = threading.RLock()
 
     def process_intent(
         self,
@@ -62,7 +274,7 @@ class NewsReportGear(BaseGear):
         params: Dict[str, Any]
     ) -> GearExecutionResult:
 
-        if NewsReportGear.INTENTS[0] != intent and NewsReportGear.INTENTS[1] != intent:
+        if intent not in NewsReportGear.INTENTS:
             err_message = "Call to {} using wrong intent {}".format(__name__, intent)
             self._logger.info(err_message)
             return GearExecutionResult.ERROR(err_message )
@@ -72,9 +284,15 @@ class NewsReportGear(BaseGear):
             silent = False
             if NewsReportGear.PARAM_SILENT in params:
                 silent = params[NewsReportGear.PARAM_SILENT]
+            force = False
+            if NewsReportGear.PARAM_FORCE in params:
+                force = params[NewsReportGear.PARAM_FORCE]
+            deadline = self._check_deadline
+            if NewsReportGear.PARAM_DEADLINE in params:
+                deadline = params[NewsReportGear.PARAM_DEADLINE]
 
             self._logger.info("Start processing new news to report")
-            news_list = self._find_latest_news(silent)
+            news_list = self._find_latest_news(silent, force, deadline)
             self._logger.info("Finished processing new news to report")
             return GearExecutionResult(GearExecutionResult.RESULT_OK, news_list)
 
@@ -82,90 +300,1186 @@ class NewsReportGear(BaseGear):
             news_source = "Here the list of the sources I parse for news:\n{}".format(
                 "\n".join(self._newssources_urls)
             )
+            host_circuit_breaker = self._load_host_circuit_breaker()
+            if host_circuit_breaker is not None and host_circuit_breaker.get_open_hosts():
+                news_source += "\nHosts currently paused because of errors: {}".format(
+                    ", ".join(host_circuit_breaker.get_open_hosts())
+                )
             return GearExecutionResult.OK(news_source)
 
-    def _find_latest_news(self, silent: bool) -> Optional[List[str]]:
+        elif GlobalBag.WEBSUB_VERIFY_INTENT == intent:
+            return self._websub_verify(params)
+
+        elif GlobalBag.WEBSUB_NOTIFICATION_INTENT == intent:
+            return self._websub_receive(params)
+
+        elif GlobalBag.YOUTUBE_QUOTA_INTENT == intent:
+            return GearExecutionResult.OK(self._load_youtube_quota_ledger().get_summary())
+
+    def _find_latest_news(self, silent: bool, force: bool = False, deadline: int = 0) -> Optional[List[str]]:
         """Analyze all the different news sources, notifying in case new contents are found
 
         :param silent: if True, doesn't produce any message when new content is not found
         :type silent: bool
 
+        :param force: if True, all the sources are checked, even the ones
+         not yet due when adaptive polling is enabled
+        :type force: bool
+
+        :param deadline: max seconds for the whole check. Sources not
+         checked in time are skipped. 0 means no deadline
+        :type deadline: int
+
         :returns: a list of messages with the result of the processing
         :rtype: list[str]
         """
 
+        # State of this check only, other checks could run at the same time
+        check_context = NewsCheckContext.with_deadline(deadline)
+        # State of all the news sources, read with one storage call and
+        #  then shared, read only, by all the sources checks
+        news_items_by_url = self._load_all_news_items()
+        check_context.set_host_circuit_breaker(self._load_host_circuit_breaker())
+        newssources_urls = self._select_due_news_sources(news_items_by_url, force)
+        websub_subscriber = self._load_websub_subscriber()
+        if websub_subscriber is not None and not force:
+            newssources_urls = [
+                newssource_url for newssource_url in newssources_urls
+                if not websub_subscriber.is_pushed(newssource_url)
+            ]
+        if any(NewsReportGear.SOURCE_TYPE_YOUTUBE == self._get_news_source_type(newssource_url)
+               for newssource_url in newssources_urls):
+            check_context.set_youtube_quota_ledger(self._load_youtube_quota_ledger())
+        if news_items_by_url is not None and not self._youtube_use_feed \
+                and not self._is_youtube_budget_near(check_context):
+            self._youtube_prepare_channels(news_items_by_url, newssources_urls, check_context)
+
+        # For each source, the records and the entity to save
+        results: List[Tuple[List[NewsRecord], Optional[NewsItemEntity]]] = []
+        if 0 == len(newssources_urls):
+            self._logger.info("No news sources due for a check")
+        elif NewsReportGear.FETCH_MODE_ASYNCIO == self._fetch_mode:
+            self._logger.info("Checking {} news sources on the event loop".format(
+                len(newssources_urls)
+            ))
+            results = asyncio.run(self._check_news_sources_async(newssources_urls, news_items_by_url, check_context))
+        elif self._max_workers > 1 and len(newssources_urls) > 1:
+            # Each source is checked by a separate worker. map() returns the
+            #  results in the same order of the sources, regardless of which
+            #  one completes first
+            self._logger.info("Checking {} news sources using {} workers".format(
+                len(newssources_urls),
+                self._max_workers
+            ))
+            with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="NewsReport") as executor:
+                results = list(executor.map(
+                    lambda newssource_url: self._check_news_source(newssource_url, news_items_by_url, check_context),
+                    newssources_urls
+                ))
+        else:
+            for newssource_url in newssources_urls:
+                results.append(self._check_news_source(newssource_url, news_items_by_url, check_context))
+
+        news_records = []
+        news_items_to_save = []
+        for new_news_records, news_item in results:
+            news_records.extend(new_news_records)
+            if news_item is not None:
+                news_items_to_save.append(news_item)
+        self._save_news_items(news_items_to_save)
+
         # Contains only the newer news that will be returned
-        final_news_messages = []
-        for newssource_url in self._newssources_urls:
-            self._logger.info("Checking for news on {}".format(newssource_url))
+        final_news_messages = [news_record.to_message() for news_record in self._merge_news_records(news_records)]
+
+        host_circuit_breaker = check_context.get_host_circuit_breaker()
+        if host_circuit_breaker is not None:
+            # Hosts paused, or back to normal, during this check
+            final_news_messages.extend(host_circuit_breaker.pop_messages())
+            self._save_entities(host_circuit_breaker.get_changed_host_circuits())
+
+        youtube_quota_ledger = check_context.get_youtube_quota_ledger()
+        if youtube_quota_ledger is not None:
+            self._save_youtube_quota(youtube_quota_ledger)
+
+        if websub_subscriber is not None:
+            # After the check, so it doesn't take time from the sources
+            self._websub_subscribe_news_sources(websub_subscriber, check_context)
+
+        skipped_news_sources = check_context.get_skipped_news_sources()
+        if skipped_news_sources:
+            self._logger.warning("Deadline expired, skipped {} news sources".format(len(skipped_news_sources)))
+            final_news_messages.append("Time is up, these news sources will be checked next time: {}".format(
+                ", ".join(skipped_news_sources)
+            ))
 
-            # Search in the storage if it has already information for the given
-            #  channel, included the playlist id 
-            news_items = None
+        deferred_news_sources = check_context.get_deferred_news_sources()
+        if deferred_news_sources:
+            final_news_messages.append("YouTube API daily budget used up, these channels will be checked next time: {}".format(
+                ", ".join(deferred_news_sources)
+            ))
+
+        if 0 == len(final_news_messages) and not silent:
+            final_news_messages.append("No recent news available")
+
+        return final_news_messages
+
+    def _check_news_source(
+        self,
+        newssource_url: str,
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Tuple[List[NewsRecord], Optional[NewsItemEntity]]:
+        """Analyze a single news source, updating its entity
+
+        It works only on the entity of the given source, so it's safe to
+         call it in parallel for different sources. The entity isn't saved,
+         it's up to the caller to save it
+
+        :param newssource_url: the url of the news source to analyze
+        :type newssource_url: str
+
+        :param news_items_by_url: the entities already read from the storage,
+         indexed by url. If None, the entity is read from the storage
+        :type news_items_by_url: dict
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a list of records with the new contents found for the
+         source, or with the errors happened during the analysis, and the
+         entity of the source to save, None if there is nothing to save
+        :rtype: list[NewsRecord], NewsItemEntity
+        """
+
+        self._logger.info("Checking for news on {}".format(newssource_url))
+
+        source_type = self._get_news_source_type(newssource_url)
+        if source_type is None:
+            return self._unsupported_news_source_records(newssource_url), None
+        if self._is_news_source_paused(newssource_url, source_type, check_context):
+            return [], None
+        if self._is_deadline_expired(newssource_url, check_context):
+            return [], None
+
+        news_item, last_check_date = self._load_news_item(newssource_url, news_items_by_url)
+
+        # Examines the news url to understand the analyzing process required
+        new_news_records: List[NewsRecord]
+        if NewsReportGear.SOURCE_TYPE_YOUTUBE == source_type:
+            # A YouTube channel news source
+            try:
+                new_news_records = self._youtube_analize_channel(news_item, last_check_date, check_context)
+            except YouTubeQuotaExceededError:
+                return self._defer_youtube_channel(newssource_url, check_context)
+        else:
+            new_news_records = self._rss_analize_feed(news_item.url, last_check_date, news_item, check_context)
+
+        # Convert Arrow object back to datetime
+        news_item.last_check = arrow.utcnow().datetime
+        self._schedule_next_check(news_item, new_news_records)
+        return new_news_records, news_item
+
+    def _get_news_source_type(self, newssource_url: str) -> Optional[str]:
+        """Examines the news url to understand the analyzing process required
+
+        :param newssource_url: the url of the news source
+        :type newssource_url: str
+
+        :returns: one of the SOURCE_TYPE_* values, or None if the source
+         is not supported
+        :rtype: str
+        """
+
+        if newssource_url.lower().startswith("https://www.youtube.com/channel/"):
+            return NewsReportGear.SOURCE_TYPE_YOUTUBE
+        elif "/feed/" in newssource_url.lower() or "/rss/" in newssource_url.lower() or "/atom.xml" in newssource_url.lower():
+            return NewsReportGear.SOURCE_TYPE_RSS
+        else:
+            return None
+
+    def _unsupported_news_source_records(self, newssource_url: str) -> List[NewsRecord]:
+        """Records for a news source the gear doesn't know how to process.
+         Nothing is saved to the storage for these sources
+        """
+
+        self._logger.warning("Unsupported news source {}".format(newssource_url))
+        self._logger.debug("Skipping saving news item {} to storage".format(newssource_url))
+        return [NewsRecord.error(newssource_url, "I don't know how to process the source {}".format(newssource_url))]
+
+    def _merge_news_records(self, news_records: List[NewsRecord]) -> List[NewsRecord]:
+        """Merges the records of all the sources, removing the contents
+         found by more than one source, like the same video in different
+         channels or the same article in different feeds
+
+        The order of the records is preserved. Errors and records without an
+         url, as entries of feeds without links, are always kept
+
+        :param news_records: the records of all the sources
+        :type news_records: list[NewsRecord]
+
+        :returns: the records without duplicates
+        :rtype: list[NewsRecord]
+        """
+
+        merged_records = []
+        seen_urls = set()
+        for news_record in news_records:
+            if not news_record.is_error() and news_record.url:
+                if news_record.url in seen_urls:
+                    self._logger.debug("Skipping duplicated news {}".format(news_record.url))
+                    continue
+                seen_urls.add(news_record.url)
+            merged_records.append(news_record)
+        return merged_records
+
+    def _load_host_circuit_breaker(self) -> Optional[HostCircuitBreaker]:
+        """Creates the circuit breaker, with the state of the hosts saved at
+         the end of the previous checks
+
+        :returns: the circuit breaker, or None if it's not enabled
+        :rtype: HostCircuitBreaker
+        """
+
+        if 0 == self._breaker_failure_threshold:
+            return None
+
+        try:
+            host_circuits = self._storage.get_all(HostCircuitEntity)
+        except BaseException as err:
+            self._logger.exception("Error while reading the state of the hosts from the storage: {}".format(err))
+            host_circuits = []
+        return HostCircuitBreaker(self._breaker_failure_threshold, self._breaker_cooldown, host_circuits)
+
+    def _get_host_circuit_breaker(self, check_context: Optional[NewsCheckContext]) -> Optional[HostCircuitBreaker]:
+        """The circuit breaker of the current check, None if it's not
+         enabled or if there is no check
+        """
+
+        if check_context is None:
+            return None
+        return check_context.get_host_circuit_breaker()
+
+    def _load_youtube_quota_ledger(self) -> YouTubeQuotaLedger:
+        """Creates the quota ledger, with the YouTube API units already
+         used today, as saved by the previous checks
+
+        :returns: the quota ledger
+        :rtype: YouTubeQuotaLedger
+        """
+
+        with self._youtube_quota_lock:
+            quota_entity = self._read_youtube_quota_entity(YouTubeQuotaLedger.get_quota_day())
+        return YouTubeQuotaLedger(self._youtube_daily_budget, quota_entity)
+
+    def _read_youtube_quota_entity(self, day: str) -> Optional[YouTubeQuotaEntity]:
+        """Reads from the storage the YouTube API usage of the given day
+
+        :param day: the quota day, as YYYY-MM-DD
+        :type day: str
+
+        :returns: the usage of the day, None if it isn't in the storage or
+         it cannot be read
+        :rtype: YouTubeQuotaEntity
+        """
+
+        try:
+            quota_entities = self._storage.get_by_property(YouTubeQuotaEntity, "day", "=", day)
+        except BaseException as err:
+            self._logger.exception("Error while reading the YouTube API quota from the storage: {}".format(err))
+            return None
+        return quota_entities[0] if quota_entities else None
+
+    def _save_youtube_quota(self, youtube_quota_ledger: YouTubeQuotaLedger) -> None:
+        """Adds the YouTube API units charged by a check to the usage of
+         the day saved in the storage
+
+        The usage is read again and saved while holding the lock, so the
+         units charged by checks running at the same time are all counted
+
+        :param youtube_quota_ledger: the ledger of the check
+        :type youtube_quota_ledger: YouTubeQuotaLedger
+        """
+
+        if 0 == youtube_quota_ledger.get_charged_units():
+            return
+        with self._youtube_quota_lock:
+            quota_entity = youtube_quota_ledger.merge_charges(
+                self._read_youtube_quota_entity(youtube_quota_ledger.get_day()))
+            self._save_entities([quota_entity])
+        self._logger.info("YouTube API units used by this check: {}, today: {}".format(
+            youtube_quota_ledger.get_charged_units(),
+            quota_entity.units
+        ))
+
+    def _get_youtube_quota_ledger(self, check_context: Optional[NewsCheckContext]) -> Optional[YouTubeQuotaLedger]:
+        """The YouTube API quota ledger of the current check, None if there
+         is no check or it has no YouTube channels
+        """
+
+        if check_context is None:
+            return None
+        return check_context.get_youtube_quota_ledger()
+
+    def _is_youtube_budget_near(self, check_context: Optional[NewsCheckContext] = None) -> bool:
+        """Checks if the YouTube API units used today are close to the
+         daily budget, so the API has to be used as little as possible
+        """
+
+        youtube_quota_ledger = self._get_youtube_quota_ledger(check_context)
+        return youtube_quota_ledger is not None and youtube_quota_ledger.is_budget_near()
+
+    def _check_youtube_budget(self, check_context: Optional[NewsCheckContext] = None) -> None:
+        """Checks that YouTube API calls can still be sent today
+
+        :raises: YouTubeQuotaExceededError if the daily budget is used up
+        """
+
+        youtube_quota_ledger = self._get_youtube_quota_ledger(check_context)
+        if youtube_quota_ledger is not None and youtube_quota_ledger.is_budget_used_up():
+            raise YouTubeQuotaExceededError("YouTube API daily budget of {} units used up".format(
+                youtube_quota_ledger.get_daily_budget()
+            ))
+
+    def _charge_youtube_quota(self, url: str, check_context: Optional[NewsCheckContext] = None) -> None:
+        """Charges a call to the quota ledger of the check, if the url is a
+         YouTube API one
+
+        :raises: YouTubeQuotaExceededError if the daily budget is used up,
+         and the call must not be sent
+        """
+
+        youtube_quota_ledger = self._get_youtube_quota_ledger(check_context)
+        if youtube_quota_ledger is None or not url.startswith(NewsReportGear.YOUTUBE_API_URL):
+            return
+        self._check_youtube_budget(check_context)
+        youtube_quota_ledger.charge(url)
+
+    def _defer_youtube_channel(
+        self,
+        newssource_url: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Tuple[List[NewsRecord], Optional[NewsItemEntity]]:
+        """The YouTube API budget is used up, so the channel is added to the
+         deferred sources, and its entity is not updated, so the channel is
+         checked again, from the same date, next time
+        """
+
+        self._logger.info("YouTube API daily budget used up, deferring {}".format(newssource_url))
+        if check_context is not None:
+            check_context.add_deferred_news_source(newssource_url)
+        return [], None
+
+    def _is_news_source_paused(
+        self,
+        newssource_url: str,
+        source_type: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> bool:
+        """Checks if the host contacted first to analyze the source is paused
+         by the circuit breaker. In this case, the source is skipped, with no
+         error message, and checked again once the host is back
+
+        :param newssource_url: the url of the news source
+        :type newssource_url: str
+
+        :param source_type: one of the SOURCE_TYPE_* values
+        :type source_type: str
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: True if the source has to be skipped
+        :rtype: bool
+        """
+
+        host_circuit_breaker = self._get_host_circuit_breaker(check_context)
+        if host_circuit_breaker is None:
+            return False
+
+        request_url = newssource_url
+        if NewsReportGear.SOURCE_TYPE_YOUTUBE == source_type:
+            use_feed = self._youtube_use_feed or self._is_youtube_budget_near(check_context)
+            request_url = self._youtube_feed_url("") if use_feed else NewsReportGear.YOUTUBE_API_URL
+        if not host_circuit_breaker.is_paused(request_url):
+            return False
+        self._logger.info("Skipping {}, host {} is paused because of errors".format(
+            newssource_url,
+            HostCircuitBreaker.get_host(request_url)
+        ))
+        return True
+
+    def _remaining_time(self, check_context: Optional[NewsCheckContext] = None) -> Optional[float]:
+        """Seconds left before the deadline of the current check, None if
+         there is no deadline
+        """
+
+        if check_context is None:
+            return None
+        return check_context.get_remaining_time()
+
+    def _is_deadline_expired(self, newssource_url: str, check_context: Optional[NewsCheckContext] = None) -> bool:
+        """Checks if the deadline of the current check is expired. In this
+         case, the source is added to the skipped ones
+
+        :param newssource_url: the url of the news source about to be checked
+        :type newssource_url: str
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: True if the source has to be skipped
+        :rtype: bool
+        """
+
+        if check_context is None:
+            return False
+        remaining_time = check_context.get_remaining_time()
+        if remaining_time is None or remaining_time > 0:
+            return False
+        self._logger.info("Deadline expired, skipping {}".format(newssource_url))
+        check_context.add_skipped_news_source(newssource_url)
+        return True
+
+    def _request_timeout(self, check_context: Optional[NewsCheckContext] = None) -> Tuple[float, float]:
+        """Connect and read timeouts for an HTTP call, never longer than the
+         time left before the deadline
+
+        :raises: TimeoutError if the deadline is already expired
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: connect and read timeouts, in seconds
+        :rtype: tuple
+        """
+
+        remaining_time = self._remaining_time(check_context)
+        if remaining_time is None:
+            return self._connect_timeout, self._read_timeout
+        if 0 == remaining_time:
+            raise TimeoutError("Deadline expired, request not sent")
+        return min(self._connect_timeout, remaining_time), min(self._read_timeout, remaining_time)
+
+    def _http_get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> requests.Response:
+        """Read an url, updating the circuit breaker of its host with the
+         result
+
+        Connection errors and server errors are failures of the host, while
+         client errors, like 404, are not. Responses found in the HTTP cache
+         don't contact the host at all, and don't use YouTube API quota
+
+        :raises: HostCircuitOpenError if the host is paused by the circuit
+         breaker, YouTubeQuotaExceededError if the YouTube API budget is
+         used up, BaseException if the request fails
+
+        :param url: the url to read
+        :type url: str
+
+        :param headers: additional request headers
+        :type headers: dict
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: the response, whatever its status code
+        :rtype: requests.Response
+        """
+
+        if self._http_cache is not None:
+            cached_response = self._http_cache.lookup(url)
+            if cached_response is not None:
+                return cached_response.to_response()
+
+        host_circuit_breaker = self._get_host_circuit_breaker(check_context)
+        if host_circuit_breaker is not None and not host_circuit_breaker.allow_request(url):
+            raise HostCircuitOpenError("Host {} is paused because of errors".format(HostCircuitBreaker.get_host(url)))
+        try:
+            self._charge_youtube_quota(url, check_context)
+        except YouTubeQuotaExceededError:
+            if host_circuit_breaker is not None:
+                host_circuit_breaker.cancel_request(url)
+            raise
+
+        http_client = self._http_session if self._http_session is not None else requests
+        if host_circuit_breaker is None:
+            req = http_client.get(url, headers=headers, timeout=self._request_timeout(check_context))
+        else:
+            try:
+                req = http_client.get(url, headers=headers, timeout=self._request_timeout(check_context))
+            except requests.RequestException as err:
+                host_circuit_breaker.record_failure(url, type(err).__name__)
+                raise err
+            if req.status_code >= 500 or 429 == req.status_code:
+                host_circuit_breaker.record_failure(url, "HTTP {}".format(req.status_code))
+            else:
+                host_circuit_breaker.record_success(url)
+
+        if self._http_cache is not None:
+            self._http_cache.store_response(url, req, self._http_cache_ttl)
+        return req
+
+    def _load_all_news_items(self) -> Optional[Dict[str, NewsItemEntity]]:
+        """Read all the news entities from the storage, with a single call
+
+        :returns: the entities indexed by url, or None if the storage
+         wasn't able to return them
+        :rtype: dict
+        """
+
+        try:
+            all_news_items = self._storage.get_all(NewsItemEntity)
+        except BaseException as err:
+            self._logger.exception("Error while reading all the entities from the storage: {}".format(err))
+            return None
+
+        news_items_by_url: Dict[str, NewsItemEntity] = {}
+        for news_item in all_news_items:
+            if hasattr(news_item, "url") and news_item.url not in news_items_by_url:
+                news_items_by_url[news_item.url] = news_item
+        self._logger.debug("Read {} news entities from the storage".format(len(news_items_by_url)))
+        return news_items_by_url
+
+    def _load_news_item(
+        self,
+        newssource_url: str,
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]] = None
+    ) -> Tuple[NewsItemEntity, Arrow]:
+        """Search if there is already information for the given source,
+         included the playlist id, or create a new one
+
+        :param newssource_url: the url of the news source
+        :type newssource_url: str
+
+        :param news_items_by_url: the entities already read from the storage,
+         indexed by url. If None, the storage is queried for the source
+        :type news_items_by_url: dict
+
+        :returns: the entity of the source, and the date of its last check
+        :rtype: NewsItemEntity, Arrow
+        """
+
+        news_items = None
+        if news_items_by_url is not None:
+            if newssource_url in news_items_by_url:
+                news_items = [news_items_by_url[newssource_url]]
+        else:
             try:
                 news_items = self._storage.get_by_property(NewsItemEntity, "url", "=", newssource_url)
             except BaseException as err:
                 self._logger.exception("Error while reading the entity from the storage: {}".format(err))
 
-            if news_items is None or 0 == len(news_items):
-                # Creates the item
-                self._logger.info("This is the first time the source {} is processed for updates".format(newssource_url))
-                news_item = NewsItemEntity()
-                news_item.url = newssource_url
-            else:
-                news_item = news_items[0]
+        if news_items is None or 0 == len(news_items):
+            news_item = self._create_news_item(newssource_url)
+        else:
+            news_item = news_items[0]
 
-            # Find last check date
-            if hasattr(news_item, "last_check"):
-                self._logger.debug("Found last_check in the stored entity: {}".format(news_item.last_check))
-                last_check_date: Arrow = arrow.get(news_item.last_check)
-            else:
-                self._logger.debug("Stored entity has no last_check property")
-                # use when last check date is not available for a news source
-                #  Default is 6 days in the past
-                last_check_date = Arrow = arrow.utcnow().shift(days=-6) 
-
-            # Examines the news url to understand the analyzing process required
-            add_to_storage = True
-            new_news_messages: List[str] = None
-            if newssource_url.lower().startswith("https://www.youtube.com/channel/"):
-                # A YouTube channel news source
-                new_news_messages = self._youtube_analize_channel(news_item, last_check_date)
-            
-            elif "/feed/" in newssource_url.lower() or "/rss/" in newssource_url.lower() or "/atom.xml" in newssource_url.lower():
-                new_news_messages = self._rss_analize_feed(news_item.url, last_check_date)
+        # Find last check date
+        if hasattr(news_item, "last_check"):
+            self._logger.debug("Found last_check in the stored entity: {}".format(news_item.last_check))
+            last_check_date: Arrow = arrow.get(news_item.last_check)
+        else:
+            self._logger.debug("Stored entity has no last_check property")
+            # use when last check date is not available for a news source
+            #  Default is 6 days in the past
+            last_check_date = arrow.utcnow().shift(days=-6)
+
+        return news_item, last_check_date
+
+    def _create_news_item(self, newssource_url: str) -> NewsItemEntity:
+        """Creates the entity for a news source never processed before
+        """
+
+        self._logger.info("This is the first time the source {} is processed for updates".format(newssource_url))
+        news_item = NewsItemEntity()
+        news_item.url = newssource_url
+        return news_item
+
+    def _select_due_news_sources(
+        self,
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]],
+        force: bool
+    ) -> List[str]:
+        """Selects the news sources to check, skipping the ones whose next
+         check is still in the future
+
+        All the sources are selected when adaptive polling is disabled, the
+         check is forced, or the entities are not available
+
+        :param news_items_by_url: the entities already read from the storage,
+         indexed by url
+        :type news_items_by_url: dict
 
+        :param force: if True, all the sources are selected
+        :type force: bool
+
+        :returns: the urls of the sources to check
+        :rtype: list[str]
+        """
+
+        if 0 == self._min_check_interval or force or news_items_by_url is None:
+            return self._newssources_urls
+
+        now = arrow.utcnow()
+        due_urls = []
+        for newssource_url in self._newssources_urls:
+            news_item = news_items_by_url.get(newssource_url)
+            next_check = getattr(news_item, "next_check", None)
+            if next_check is None or arrow.get(next_check) <= now:
+                due_urls.append(newssource_url)
             else:
-                self._logger.warning("Unsupported news source {}".format(newssource_url))
-                new_news_messages = []
-                new_news_messages.append("I don't know how to process the source {}".format(newssource_url))
-                add_to_storage = False
+                self._logger.debug("Skipping {}, next check at {}".format(newssource_url, next_check))
+        self._logger.info("{} news sources of {} are due for a check".format(
+            len(due_urls),
+            len(self._newssources_urls)
+        ))
+        return due_urls
+
+    def _schedule_next_check(self, news_item: NewsItemEntity, new_news_records: List[NewsRecord]) -> None:
+        """Updates the check interval of a source, and the date of its next
+         check, when adaptive polling is enabled
+
+        The interval follows the cadence of the source: it moves halfway
+         towards the median gap between the dates of the entries found, the
+         newest entry found in the previous checks included. When nothing
+         new is found, the time passed since the newest entry is a lower
+         bound of the current gap, and the interval grows towards it. Errors
+         are not entries, so they're ignored. The interval always stays
+         within the configured bounds
+
+        :param news_item: the entity of the source just checked
+        :type news_item: NewsItemEntity
+
+        :param new_news_records: the records produced by the check
+        :type new_news_records: list[NewsRecord]
+        """
+
+        if 0 == self._min_check_interval:
+            return
+
+        last_check = arrow.get(news_item.last_check)
+        last_entry_date = getattr(news_item, "last_entry_date", None)
+        entry_timestamps = [
+            news_record.published
+            for news_record in new_news_records
+            if not news_record.is_error() and news_record.published > 0
+        ]
+        if last_entry_date is not None:
+            entry_timestamps.append(arrow.get(last_entry_date).int_timestamp)
+        entry_timestamps = sorted(set(entry_timestamps))
+        gaps = [
+            (entry_timestamps[i] - entry_timestamps[i - 1]) // 60
+            for i in range(1, len(entry_timestamps))
+        ]
+
+        check_interval = getattr(news_item, "check_interval", None) or self._min_check_interval
+        if gaps:
+            check_interval = (check_interval + int(statistics.median(gaps))) // 2
+        elif entry_timestamps:
+            silence = (last_check.int_timestamp - entry_timestamps[-1]) // 60
+            if silence > check_interval:
+                check_interval = (check_interval + silence) // 2
+        check_interval = min(self._max_check_interval, max(self._min_check_interval, check_interval))
+
+        news_item.check_interval = check_interval
+        # Without any entry, the silence is counted from the first check
+        news_item.last_entry_date = arrow.get(entry_timestamps[-1]).datetime if entry_timestamps else last_check.datetime
+        news_item.next_check = last_check.shift(minutes=check_interval).datetime
+        self._logger.debug("Next check of {} in {} minutes".format(news_item.url, check_interval))
+
+    def _youtube_prepare_channels(
+        self,
+        news_items_by_url: Dict[str, NewsItemEntity],
+        newssources_urls: Optional[List[str]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> None:
+        """Finds the upload playlist of all the YouTube channels without it,
+         before the channels are checked one by one
+
+        Entities for new channels are created and added to the index
+
+        :param news_items_by_url: the entities already read from the storage,
+         indexed by url
+        :type news_items_by_url: dict
+
+        :param newssources_urls: the urls of the sources about to be checked.
+         If None, all the sources are used
+        :type newssources_urls: list[str]
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+        """
+
+        if newssources_urls is None:
+            newssources_urls = self._newssources_urls
+        channel_items = []
+        for newssource_url in newssources_urls:
+            if NewsReportGear.SOURCE_TYPE_YOUTUBE != self._get_news_source_type(newssource_url):
+                continue
+            if newssource_url not in news_items_by_url:
+                news_items_by_url[newssource_url] = self._create_news_item(newssource_url)
+            channel_items.append(news_items_by_url[newssource_url])
+        try:
+            self._youtube_resolve_upload_playlists(channel_items, check_context)
+        except YouTubeQuotaExceededError as err:
+            # Each channel still without its playlist is deferred by its check
+            self._logger.warning("YouTube channels not resolved in advance: {}".format(err))
+
+    def _save_news_items(self, news_items: List[NewsItemEntity]) -> None:
+        """Save the news entities updated by a check
+
+        The entities were read at the start of the check, and in the meantime
+         the content pushed by a WebSub hub could have been processed for the
+         same sources. So, with WebSub enabled, the entities are read again,
+         and the entries seen in the meantime are merged with the ones found
+         by the check, while holding the same lock used for the pushed content
+
+        :param news_items: the entities to save
+        :type news_items: list[NewsItemEntity]
+        """
 
-            # Adds newest news messages to the ones from other sources
-            final_news_messages.extend(new_news_messages)
+        if 0 == len(news_items):
+            return
+        if not self._websub_callback_url:
+            self._save_entities(news_items)
+            return
+
+        with self._news_items_lock:
+            stored_news_items_by_url = self._load_all_news_items() or {}
+            for news_item in news_items:
+                stored_news_item = stored_news_items_by_url.get(news_item.url)
+                if stored_news_item is None or stored_news_item is news_item:
+                    continue
+                if BaseEntity.NO_ID == news_item.id:
+                    # Created by the pushed content after the check started
+                    news_item.id = stored_news_item.id
+                news_item.seen_ids = SeenEntryIndex.merge(
+                    getattr(news_item, "seen_ids", None),
+                    getattr(stored_news_item, "seen_ids", None)
+                )
+            self._save_entities(news_items)
+
+    def _save_entities(self, entities: Sequence[BaseEntity]) -> None:
+        """Save to the storage all the given entities, with a single batch call
+
+        If the batch call fails, each entity is saved on its own, so an error
+         on one entity doesn't affect the others
+
+        :param entities: the entities to save
+        :type entities: list[BaseEntity]
+        """
+
+        if 0 == len(entities):
+            return
+
+        try:
+            self._logger.debug("Saving {} entities in a single batch".format(len(entities)))
+            self._storage.put_multi(list(entities))
+            return
+        except BaseException as err:
+            self._logger.exception("Error while saving the entities in batch, saving them one by one: {}".format(err))
+
+        for entity in entities:
+            try:
+                self._logger.debug("Updating the entity {}".format(entity.to_dict()))
+                self._storage.put(entity)
+            except BaseException as err:
+                self._logger.exception("Error while saving the entity to the storage: {}".format(err))
 
-            if add_to_storage:
-                # Save to the storage the item
+    async def _check_news_sources_async(
+        self,
+        newssources_urls: List[str],
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[Tuple[List[NewsRecord], Optional[NewsItemEntity]]]:
+        """Analyze all the given news sources on the same event loop
+
+        All the HTTP calls share one aiohttp session, with a limited number
+         of connections per host. If an entity has to be read from the
+         storage, the blocking call runs in the default executor of the loop
+
+        :param newssources_urls: the urls of the news sources to analyze
+        :type newssources_urls: list[str]
+
+        :param news_items_by_url: the entities already read from the storage,
+         indexed by url
+        :type news_items_by_url: dict
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: for each source, in the same order, the list of records
+         found for the source and the entity to save
+        :rtype: list
+        """
+
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit_per_host=self._max_connections_per_host)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            # gather() returns the results in the same order of the awaitables
+            return await asyncio.gather(*[
+                self._check_news_source_before_deadline_async(session, newssource_url, news_items_by_url, check_context)
+                for newssource_url in newssources_urls
+            ])
+
+    async def _check_news_source_before_deadline_async(
+        self,
+        session: Any,
+        newssource_url: str,
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Tuple[List[NewsRecord], Optional[NewsItemEntity]]:
+        """Same as _check_news_source_async but, if there is a deadline, the
+         check of the source is cancelled when the deadline expires, and the
+         source is added to the skipped ones
+
+        :param session: the aiohttp session to use for the HTTP calls
+        :type session: aiohttp.ClientSession
+        """
+
+        remaining_time = self._remaining_time(check_context)
+        if remaining_time is None:
+            return await self._check_news_source_async(session, newssource_url, news_items_by_url, check_context)
+
+        try:
+            return await asyncio.wait_for(
+                self._check_news_source_async(session, newssource_url, news_items_by_url, check_context),
+                remaining_time
+            )
+        except asyncio.TimeoutError:
+            self._logger.info("Deadline expired while checking {}".format(newssource_url))
+            if check_context is not None:
+                check_context.add_skipped_news_source(newssource_url)
+            return [], None
+
+    async def _check_news_source_async(
+        self,
+        session: Any,
+        newssource_url: str,
+        news_items_by_url: Optional[Dict[str, NewsItemEntity]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Tuple[List[NewsRecord], Optional[NewsItemEntity]]:
+        """Same as _check_news_source, but with non-blocking HTTP calls
+
+        :param session: the aiohttp session to use for the HTTP calls
+        :type session: aiohttp.ClientSession
+        """
+
+        self._logger.info("Checking for news on {}".format(newssource_url))
+
+        source_type = self._get_news_source_type(newssource_url)
+        if source_type is None:
+            return self._unsupported_news_source_records(newssource_url), None
+        if self._is_news_source_paused(newssource_url, source_type, check_context):
+            return [], None
+        if self._is_deadline_expired(newssource_url, check_context):
+            return [], None
+
+        if news_items_by_url is not None:
+            news_item, last_check_date = self._load_news_item(newssource_url, news_items_by_url)
+        else:
+            loop = asyncio.get_running_loop()
+            news_item, last_check_date = await loop.run_in_executor(None, self._load_news_item, newssource_url)
+
+        new_news_records: List[NewsRecord]
+        if NewsReportGear.SOURCE_TYPE_YOUTUBE == source_type:
+            try:
+                new_news_records = await self._youtube_analize_channel_async(
+                    session, news_item, last_check_date, check_context)
+            except YouTubeQuotaExceededError:
+                return self._defer_youtube_channel(newssource_url, check_context)
+        else:
+            new_news_records = await self._rss_analize_feed_async(
+                session, news_item.url, last_check_date, news_item, check_context)
+
+        news_item.last_check = arrow.utcnow().datetime
+        self._schedule_next_check(news_item, new_news_records)
+        return new_news_records, news_item
+
+    async def _http_get_async(
+        self,
+        session: Any,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> SimpleNamespace:
+        """Read an url using the aiohttp session
+
+        :raises: BaseException if the request fails or the server returns an
+         error status code
+
+        :param session: the aiohttp session to use for the HTTP call
+        :type session: aiohttp.ClientSession
+
+        :param url: the url to read
+        :type url: str
+
+        :param headers: additional request headers
+        :type headers: dict
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: an object with status, headers and text of the response
+        :rtype: SimpleNamespace
+        """
+
+        if self._http_cache is not None:
+            cached_response = self._http_cache.lookup(url)
+            if cached_response is not None:
+                return SimpleNamespace(
+                    status = cached_response.status,
+                    headers = cached_response.headers,
+                    text = cached_response.text
+                )
+
+        host_circuit_breaker = self._get_host_circuit_breaker(check_context)
+        if host_circuit_breaker is not None and not host_circuit_breaker.allow_request(url):
+            raise HostCircuitOpenError("Host {} is paused because of errors".format(HostCircuitBreaker.get_host(url)))
+        try:
+            self._charge_youtube_quota(url, check_context)
+        except YouTubeQuotaExceededError:
+            if host_circuit_breaker is not None:
+                host_circuit_breaker.cancel_request(url)
+            raise
+
+        import aiohttp
+
+        connect_timeout, read_timeout = self._request_timeout(check_context)
+        timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        try:
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                if host_circuit_breaker is not None:
+                    if response.status >= 500 or 429 == response.status:
+                        host_circuit_breaker.record_failure(url, "HTTP {}".format(response.status))
+                    else:
+                        host_circuit_breaker.record_success(url)
+                response.raise_for_status()
+                text = await response.text()
+                if self._http_cache is not None:
+                    self._http_cache.store(
+                        url,
+                        response.status,
+                        dict(response.headers),
+                        text.encode("utf-8"),
+                        "utf-8",
+                        self._http_cache_ttl
+                    )
+                return SimpleNamespace(
+                    status = response.status,
+                    headers = response.headers,
+                    text = text
+                )
+        except (OSError, asyncio.TimeoutError) as err:
+            # aiohttp connection errors are OSError too
+            if host_circuit_breaker is not None:
+                host_circuit_breaker.record_failure(url, type(err).__name__)
+            raise err
+
+    def _load_websub_subscriber(self) -> Optional[WebSubSubscriber]:
+        """Creates the WebSub subscriber, with the subscriptions saved in
+         the storage
+
+        :returns: the subscriber, or None if WebSub is not enabled
+        :rtype: WebSubSubscriber
+        """
+
+        if not self._websub_callback_url:
+            return None
+
+        try:
+            subscriptions = self._storage.get_all(WebSubSubscriptionEntity)
+        except BaseException as err:
+            self._logger.exception("Error while reading the WebSub subscriptions from the storage: {}".format(err))
+            subscriptions = []
+        return WebSubSubscriber(self._websub_callback_url, self._websub_lease_seconds, subscriptions)
+
+    def _websub_subscribe_news_sources(
+        self,
+        websub_subscriber: WebSubSubscriber,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> None:
+        """Requests, or renews, the WebSub subscriptions of the news sources
+         that need it. Hubs then verify the requests calling the bot
+
+        Each subscription is saved before contacting its hub, as the hub
+         can verify the request even before answering
+
+        :param websub_subscriber: the subscriber, updated with the requests
+        :type websub_subscriber: WebSubSubscriber
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+        """
+
+        http_client = self._http_session if self._http_session is not None else requests
+        unsupported_subscriptions = []
+        for newssource_url in self._newssources_urls:
+            if not websub_subscriber.needs_subscription(newssource_url):
+                continue
+            if 0 == self._remaining_time(check_context):
+                self._logger.info("Deadline expired, WebSub subscriptions requested next time")
+                break
+
+            try:
+                hub_and_topic = self._websub_discover_hub(newssource_url, check_context)
+                if hub_and_topic is None:
+                    self._logger.info("No WebSub hub for {}".format(newssource_url))
+                    unsupported_subscriptions.append(websub_subscriber.mark_unsupported(newssource_url))
+                    continue
+                hub, topic = hub_and_topic
+                self._logger.info("Subscribing to {} on WebSub hub {}".format(topic, hub))
+                subscription, form = websub_subscriber.request_subscription(newssource_url, hub, topic)
+                self._save_entities([subscription])
+                req = http_client.post(hub, form, timeout=self._request_timeout(check_context))
+                if not req.ok:
+                    self._logger.warning("WebSub hub {} refused the subscription to {}: status {}".format(
+                        hub,
+                        topic,
+                        req.status_code
+                    ))
+            except BaseException as err:
+                self._logger.exception("Error while subscribing to WebSub for {}: {}".format(newssource_url, err))
+        self._save_entities(unsupported_subscriptions)
+
+    def _websub_discover_hub(
+        self,
+        newssource_url: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Finds the WebSub hub and topic of a news source
+
+        YouTube channels use always the same hub, while feeds advertise
+         their own one, if any
+
+        :raises: BaseException if the feed cannot be read
+
+        :param newssource_url: the url of the news source
+        :type newssource_url: str
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: hub and topic, or None if the source has no hub
+        :rtype: tuple
+        """
+
+        source_type = self._get_news_source_type(newssource_url)
+        if NewsReportGear.SOURCE_TYPE_YOUTUBE == source_type:
+            channel_id = self._youtube_extract_channel_id_from_url(newssource_url)
+            return WebSubSubscriber.YOUTUBE_HUB, self._youtube_feed_url(channel_id)
+        elif NewsReportGear.SOURCE_TYPE_RSS == source_type:
+            req = self._http_get(newssource_url, check_context=check_context)
+            if not req.ok:
+                req.raise_for_status()
+            return WebSubSubscriber.discover_hub(newssource_url, req.text, req.links)
+        return None
+
+    def _websub_verify(self, params: Dict[str, Any]) -> GearExecutionResult:
+        """Answers to the verification request of a WebSub hub
+
+        :param params: the subscription id and the hub.* parameters of the
+         request
+        :type params: dict
+
+        :returns: OK with the challenge to echo back, if the request is
+         valid, otherwise ERROR
+        :rtype: GearExecutionResult
+        """
+
+        websub_subscriber = self._load_websub_subscriber()
+        if websub_subscriber is None:
+            return GearExecutionResult.ERROR("WebSub is not enabled")
+
+        subscription = websub_subscriber.verify_intent(
+            params.get(GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID),
+            params.get(GlobalBag.WEBSUB_PARAM_MODE),
+            params.get(GlobalBag.WEBSUB_PARAM_TOPIC),
+            params.get(GlobalBag.WEBSUB_PARAM_LEASE_SECONDS)
+        )
+        if subscription is None:
+            return GearExecutionResult.ERROR("Unknown WebSub subscription")
+        self._save_entities(websub_subscriber.get_changed_subscriptions())
+        self._logger.info("WebSub subscription to {} is {}".format(subscription.topic, subscription.state))
+        return GearExecutionResult.OK(params.get(GlobalBag.WEBSUB_PARAM_CHALLENGE) or "")
+
+    def _websub_receive(self, params: Dict[str, Any]) -> GearExecutionResult:
+        """Processes the content pushed by a WebSub hub, as a check of the
+         news source would do with the same content
+
+        :param params: the subscription id, the raw content and its signature
+        :type params: dict
+
+        :returns: the messages of the new contents found
+        :rtype: GearExecutionResult
+        """
+
+        websub_subscriber = self._load_websub_subscriber()
+        if websub_subscriber is None:
+            return GearExecutionResult.ERROR("WebSub is not enabled")
+        subscription = websub_subscriber.get_subscription_by_id(params.get(GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID))
+        if subscription is None or not hasattr(subscription, "secret"):
+            self._logger.warning("Content received for unknown WebSub subscription")
+            return GearExecutionResult.ERROR("Unknown WebSub subscription")
+        content = params.get(GlobalBag.WEBSUB_PARAM_CONTENT) or b""
+        if not WebSubSubscriber.is_signature_valid(subscription.secret, content, params.get(GlobalBag.WEBSUB_PARAM_SIGNATURE)):
+            self._logger.warning("Invalid signature for the content pushed for {}".format(subscription.news_source))
+            return GearExecutionResult.ERROR("Invalid WebSub signature")
+
+        newssource_url = subscription.news_source
+        self._logger.info("Processing content pushed for {}".format(newssource_url))
+        # The hubs send the content as it is, XML feeds are UTF-8 in practice
+        feed_content = content.decode("utf-8", errors="replace")
+        # The pushed content is processed as a check of its own
+        check_context = NewsCheckContext()
+        # Nothing is downloaded, so the lock is held only for the time to
+        #  parse the content. Checks merge their entries with the ones saved
+        #  here, see _save_news_items
+        with self._news_items_lock:
+            news_item, last_check_date = self._load_news_item(newssource_url)
+            if NewsReportGear.SOURCE_TYPE_YOUTUBE == self._get_news_source_type(newssource_url):
                 try:
-                    # Convert Arrow object back to datetime
-                    news_item.last_check = arrow.utcnow().datetime
-                    self._logger.debug("Updating the news entity with new date {}".format(news_item.last_check))
-                    self._storage.put(news_item)
+                    all_videos = self._youtube_parse_feed_videos(feed_content, check_context)
                 except BaseException as err:
-                    self._logger.exception("Error while saving the entity to the storage: {}".format(err))
+                    self._logger.exception("Error while parsing the content pushed for {}: {}".format(newssource_url, err))
+                    return GearExecutionResult.ERROR("Invalid content for {}".format(newssource_url))
+                news_records = self._youtube_filter_new_videos(newssource_url, all_videos, last_check_date, news_item)
             else:
-                self._logger.debug("Skipping saving news item {} to storage".format(newssource_url))
-
-        if 0 == len(final_news_messages) and not silent:
-            final_news_messages.append("No recent news available")
-        
-        return final_news_messages
+                news_records = self._rss_analize_feed_content(
+                    newssource_url, feed_content, last_check_date, news_item, check_context)
+            self._save_entities([news_item])
+
+        messages = []
+        for news_record in self._merge_news_records(news_records):
+            if news_record.is_error():
+                # Not worth a message, the source is polled again if the
+                #  subscription stops working
+                self._logger.warning("Error in the content pushed for {}: {}".format(newssource_url, news_record.title))
+            else:
+                messages.append(news_record.to_message())
+        return GearExecutionResult(GearExecutionResult.RESULT_OK, messages)
 
     def _youtube_analize_channel(
         self,
         news_item: NewsItemEntity,
-        last_check_date: Arrow
-    ) -> List[str]:
+        last_check_date: Arrow,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
         """Analyze a news source of YouTube channel type, searching for
          videos published after a certain date
 
@@ -178,10 +1492,14 @@ class NewsReportGear(BaseGear):
         :param last_check_date: date to use for checking
         :type last_check_date: Arrow
 
-        :returns: a list of str, each one containing a new content (video)
-         found on the channel. It could also potentially contains an error
-         message
-        :rtype: list[str]
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a list of records, each one containing a new content
+         (video) found on the channel. It could also potentially contains
+         an error
+        :rtype: list[NewsRecord]
         """
 
         # Every channel as a special playlist called upload, with all the 
@@ -192,9 +1510,17 @@ class NewsReportGear(BaseGear):
         # So, it's wortwhile to first check for the upload playlist id for
         #  the channel, cache it, and then search for new videos inside
         #  this playlist
+        # Even better, the channel Atom feed doesn't use quota at all
+
+        if self._youtube_use_feed or self._is_youtube_budget_near(check_context):
+            feed_video_records = self._youtube_analize_channel_feed(news_item, last_check_date, check_context)
+            if feed_video_records is not None:
+                return feed_video_records
+            self._logger.info("Feed not available for channel {}, using YouTube API".format(news_item.url))
+        self._check_youtube_budget(check_context)
 
         channel_url = news_item.url
-        new_video_messages: List[str] = []  # Initialize the return var
+        new_video_records: List[NewsRecord] = []  # Initialize the return var
 
         # param1 may have the special upload playlist id. otherwise obtain it from a YouTube API call
         upload_playlist_id = None
@@ -202,49 +1528,272 @@ class NewsReportGear(BaseGear):
             upload_playlist_id = news_item.param1
             self._logger.debug("Using stored playlist ID {}".format(upload_playlist_id))
         else:
-            channel_id = self._youtube_extract_channel_id_from_url(channel_url)
             # Find the upload playlist id for the given channel
-            try:
-                upload_playlist_id = self._youtube_find_upload_playlist_from_channel(self._youtube_api_key, channel_id)
-            except BaseException as err:
+            self._youtube_resolve_upload_playlists([news_item], check_context)
+            if not getattr(news_item, "param1", None):
                 # Forge specific messagge to return to the caller
-                new_video_messages.append("Error getting information on YouTube channel {}".format(channel_id))
-                return new_video_messages
-            news_item.param1 = upload_playlist_id
+                channel_id = self._youtube_extract_channel_id_from_url(channel_url)
+                new_video_records.append(NewsRecord.error(
+                    channel_url,
+                    "Error getting information on YouTube channel {}".format(channel_id)
+                ))
+                return new_video_records
+            upload_playlist_id = news_item.param1
         
         # Search latest videos in the upload playlist
         try:
-            all_videos = self._youtube_find_new_videos_in_a_playlist(self._youtube_api_key, upload_playlist_id)
+            all_videos = self._youtube_find_new_videos_in_a_playlist(
+                self._youtube_api_key, upload_playlist_id, check_context)
+        except YouTubeQuotaExceededError:
+            # Used up by another worker, the caller defers the channel
+            raise
         except BaseException as err:
                 # Forge specific messagge to return to the caller
-                new_video_messages.append("Error getting information on playlist {} for channel {}".format(
+                new_video_records.append(NewsRecord.error(
+                    channel_url,
+                    "Error getting information on playlist {} for channel {}".format(
+                        upload_playlist_id,
+                        channel_url)
+                ))
+                return new_video_records
+
+        return self._youtube_filter_new_videos(channel_url, all_videos, last_check_date, news_item)
+
+    async def _youtube_analize_channel_async(
+        self,
+        session: Any,
+        news_item: NewsItemEntity,
+        last_check_date: Arrow,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
+        """Same as _youtube_analize_channel, but with non-blocking HTTP calls
+
+        :param session: the aiohttp session to use for the HTTP calls
+        :type session: aiohttp.ClientSession
+        """
+
+        if self._youtube_use_feed or self._is_youtube_budget_near(check_context):
+            feed_video_records = await self._youtube_analize_channel_feed_async(
+                session, news_item, last_check_date, check_context)
+            if feed_video_records is not None:
+                return feed_video_records
+            self._logger.info("Feed not available for channel {}, using YouTube API".format(news_item.url))
+        self._check_youtube_budget(check_context)
+
+        channel_url = news_item.url
+        new_video_records: List[NewsRecord] = []  # Initialize the return var
+
+        upload_playlist_id = None
+        if hasattr(news_item, "param1") and news_item.param1:
+            upload_playlist_id = news_item.param1
+            self._logger.debug("Using stored playlist ID {}".format(upload_playlist_id))
+        else:
+            channel_id = self._youtube_extract_channel_id_from_url(channel_url)
+            try:
+                upload_playlist_id = self._youtube_derive_upload_playlist(channel_id)
+                if upload_playlist_id is None:
+                    upload_playlist_id = await self._youtube_find_upload_playlist_from_channel_async(
+                        session, self._youtube_api_key, channel_id, check_context)
+            except (asyncio.CancelledError, YouTubeQuotaExceededError):
+                # Deadline expired or budget used up, the caller has to know
+                raise
+            except BaseException as err:
+                new_video_records.append(NewsRecord.error(
+                    channel_url,
+                    "Error getting information on YouTube channel {}".format(channel_id)
+                ))
+                return new_video_records
+            news_item.param1 = upload_playlist_id
+
+        try:
+            all_videos = await self._youtube_find_new_videos_in_a_playlist_async(
+                session, self._youtube_api_key, upload_playlist_id, check_context)
+        except (asyncio.CancelledError, YouTubeQuotaExceededError):
+            raise
+        except BaseException as err:
+            new_video_records.append(NewsRecord.error(
+                channel_url,
+                "Error getting information on playlist {} for channel {}".format(
                     upload_playlist_id,
                     channel_url)
-                )
-                return new_video_messages
+            ))
+            return new_video_records
+
+        return self._youtube_filter_new_videos(channel_url, all_videos, last_check_date, news_item)
+
+    def _youtube_analize_channel_feed(
+        self,
+        news_item: NewsItemEntity,
+        last_check_date: Arrow,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Optional[List[NewsRecord]]:
+        """Analyze a YouTube channel using its Atom feed, searching for
+         videos published after a certain date
+
+        The feed is read like any other RSS feed, conditional GET included
+
+        :param news_item: the item containing information on the news source
+         to analyze
+        :type news_item: NewsItemEntity
+
+        :param last_check_date: date to use for checking
+        :type last_check_date: Arrow
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
 
-        self._logger.debug("Comparing published date of {} videos agains {}".format(
+        :returns: a list of records, each one containing a new video found
+         on the channel, or None if the feed is not available
+        :rtype: list[NewsRecord]
+        """
+
+        feed_url = self._youtube_feed_url(self._youtube_extract_channel_id_from_url(news_item.url))
+        try:
+            fetched_feed = self._rss_fetch_feed(feed_url, news_item, check_context)
+            if fetched_feed is None:
+                # Not modified since last check
+                return []
+            feed_content, response_headers = fetched_feed
+            all_videos = self._youtube_parse_feed_videos(feed_content, check_context)
+            self._rss_store_validators(news_item, response_headers, feed_content)
+        except BaseException as err:
+            self._logger.exception("Error while reading the YouTube feed {}: {}".format(feed_url, err))
+            return None
+
+        return self._youtube_filter_new_videos(news_item.url, all_videos, last_check_date, news_item)
+
+    async def _youtube_analize_channel_feed_async(
+        self,
+        session: Any,
+        news_item: NewsItemEntity,
+        last_check_date: Arrow,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Optional[List[NewsRecord]]:
+        """Same as _youtube_analize_channel_feed, but with a non-blocking HTTP call
+
+        :param session: the aiohttp session to use for the HTTP call
+        :type session: aiohttp.ClientSession
+        """
+
+        feed_url = self._youtube_feed_url(self._youtube_extract_channel_id_from_url(news_item.url))
+        try:
+            fetched_feed = await self._rss_fetch_feed_async(session, feed_url, news_item, check_context)
+            if fetched_feed is None:
+                return []
+            feed_content, response_headers = fetched_feed
+            all_videos = self._youtube_parse_feed_videos(feed_content, check_context)
+            self._rss_store_validators(news_item, response_headers, feed_content)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as err:
+            self._logger.exception("Error while reading the YouTube feed {}: {}".format(feed_url, err))
+            return None
+
+        return self._youtube_filter_new_videos(news_item.url, all_videos, last_check_date, news_item)
+
+    def _youtube_feed_url(self, channel_id: str) -> str:
+        """Url of the Atom feed with the latest videos of a channel
+        """
+
+        return 'https://www.youtube.com/feeds/videos.xml?channel_id={}'.format(channel_id)
+
+    def _youtube_parse_feed_videos(
+        self,
+        feed_content: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
+        """Extract the videos from the Atom feed of a channel
+
+        :raises: ValueError if the feed cannot be parsed
+
+        :param feed_content: the content of the feed
+        :type feed_content: str
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a collection of records, representing videos. Their source
+         is not set
+        :rtype: list[NewsRecord]
+        """
+
+        # Published, not updated: updated changes every time the video
+        #  information are edited
+        parsing_error, feed_entries = self._parse_feed_entries(feed_content, True, check_context)
+        if parsing_error is not None and 0 == len(feed_entries):
+            raise ValueError("Invalid YouTube feed: {}".format(parsing_error))
+
+        latest_videos = []
+        for _, title, link, published, _ in feed_entries:
+            if published is None:
+                raise ValueError("Video without a published date in YouTube feed: {}".format(link))
+            latest_videos.append(NewsRecord(None, title or "", link, published, NewsRecord.KIND_VIDEO))
+        return latest_videos
+
+    def _youtube_filter_new_videos(
+        self,
+        channel_url: str,
+        all_videos: List[NewsRecord],
+        last_check_date: Arrow,
+        news_item: Optional[NewsItemEntity] = None
+    ) -> List[NewsRecord]:
+        """Discard all the videos already seen on the channel or, if the
+         channel has no seen videos yet, older that a certain date
+
+        :param channel_url: the url of the channel, set as source of the
+         new videos
+        :type channel_url: str
+
+        :param all_videos: the videos read from the upload playlist
+        :type all_videos: list[NewsRecord]
+
+        :param last_check_date: date to use for checking, only if the
+         channel has no seen videos
+        :type last_check_date: Arrow
+
+        :param news_item: the entity of the channel, with the seen videos.
+         Updated with the videos found. If None, only dates are used
+        :type news_item: NewsItemEntity
+
+        :returns: the new videos
+        :rtype: list[NewsRecord]
+        """
+
+        new_video_records: List[NewsRecord] = []
+        seen_entry_index = self._load_seen_entry_index(news_item)
+        self._logger.debug("Checking {} videos against {}".format(
             len(all_videos),
-            last_check_date
+            "the date {}".format(last_check_date) if seen_entry_index.is_bootstrap() else "the seen ones"
         ))
 
-        # Discard all the videos older that a certain date
         for video in all_videos:
-            # Get date from the video
-            published_date = arrow.get(video.published)
-            if published_date >= last_check_date:
-                new_video_messages.append("New video published: {} - {}". format(
-                    video.title,
-                    video.url
-                ))
-
-        self._logger.info("Found {} videos, out of {}, newer than {}".format(
-            len(new_video_messages),
-            len(all_videos),
-            last_check_date
+            if video.url is not None and seen_entry_index.is_new(video.url, arrow.get(video.published), last_check_date):
+                video.source = channel_url
+                new_video_records.append(video)
+        self._store_seen_entry_index(news_item, seen_entry_index)
+
+        self._logger.info("Found {} new videos, out of {}".format(
+            len(new_video_records),
+            len(all_videos)
         ))
 
-        return new_video_messages
+        return new_video_records
+
+    def _load_seen_entry_index(self, news_item: Optional[NewsItemEntity]) -> SeenEntryIndex:
+        """Creates the index of the entries already seen on a news source,
+         from the ones stored in its entity
+        """
+
+        return SeenEntryIndex(getattr(news_item, "seen_ids", None))
+
+    def _store_seen_entry_index(self, news_item: Optional[NewsItemEntity], seen_entry_index: SeenEntryIndex) -> None:
+        """Stores the entries seen on a news source into its entity
+        """
+
+        if news_item is not None:
+            news_item.seen_ids = seen_entry_index.to_list()
 
     def _youtube_extract_channel_id_from_url(self, channel_url: str) -> str:
         """Extract the channel id from the channel URL
@@ -261,10 +1810,140 @@ class NewsReportGear(BaseGear):
         # More elegant regex solution: https://stackoverflow.com/questions/51166723/extract-youtube-channel-id-from-channel-url-android
         return channel_url[len('https://www.youtube.com/channel/'):]
 
+    def _youtube_resolve_upload_playlists(
+        self,
+        news_items: List[NewsItemEntity],
+        check_context: Optional[NewsCheckContext] = None
+    ) -> None:
+        """Finds the upload playlist id of all the given channels without it,
+         and stores it in param1 of their entity
+
+        When possible, the playlist id is derived from the channel id,
+         otherwise the channels are resolved with as few YouTube API calls
+         as possible, up to YOUTUBE_MAX_IDS_PER_CALL channels for each call.
+         Channels that cannot be resolved are left without param1
+
+        :param news_items: entities of YouTube channels
+        :type news_items: list[NewsItemEntity]
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+        """
+
+        # The same channel could be in different entities
+        pending_items: Dict[str, List[NewsItemEntity]] = {}
+        for news_item in news_items:
+            if getattr(news_item, "param1", None):
+                continue
+            channel_id = self._youtube_extract_channel_id_from_url(news_item.url)
+            upload_playlist_id = self._youtube_derive_upload_playlist(channel_id)
+            if upload_playlist_id is not None:
+                self._logger.debug("Derived playlist ID {} for channel {}".format(upload_playlist_id, channel_id))
+                news_item.param1 = upload_playlist_id
+            else:
+                pending_items.setdefault(channel_id, []).append(news_item)
+
+        channel_ids = list(pending_items.keys())
+        for start in range(0, len(channel_ids), NewsReportGear.YOUTUBE_MAX_IDS_PER_CALL):
+            channel_ids_chunk = channel_ids[start:start + NewsReportGear.YOUTUBE_MAX_IDS_PER_CALL]
+            try:
+                upload_playlist_ids = self._youtube_find_upload_playlists_from_channels(
+                    self._youtube_api_key,
+                    channel_ids_chunk,
+                    check_context
+                )
+            except YouTubeQuotaExceededError:
+                # The caller defers the channels
+                raise
+            except HostCircuitOpenError as err:
+                # The next calls would be refused too
+                self._logger.info("Stopped resolving the YouTube channels: {}".format(err))
+                break
+            except BaseException as err:
+                # Channels will be reported as errors by the caller
+                self._logger.exception("Error while resolving the YouTube channels {}: {}".format(
+                    ", ".join(channel_ids_chunk),
+                    err
+                ))
+                continue
+            for channel_id, upload_playlist_id in upload_playlist_ids.items():
+                for news_item in pending_items.get(channel_id, []):
+                    news_item.param1 = upload_playlist_id
+
+    def _youtube_derive_upload_playlist(self, channel_id: str) -> Optional[str]:
+        """Derive the upload playlist id from the channel id, without any call
+
+        The upload playlist of a channel UCxxxx is UUxxxx
+
+        :param channel_id: the id of the channel
+        :type channel_id: str
+
+        :returns: the id of the special "upload" playlist, or None if it
+         cannot be derived from the channel id
+        :rtype: str
+        """
+
+        if channel_id and channel_id.startswith("UC") and len(channel_id) > 2:
+            return "UU" + channel_id[2:]
+        return None
+
+    def _youtube_find_upload_playlists_from_channels(
+        self,
+        api_key: str,
+        channel_ids: List[str],
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Dict[str, str]:
+        """Find upload playlist ids for several channels, with a single call
+
+        :raises: BaseException if there are some errors in using the Youtube API
+
+        :param api_key: the API key to use for YouTube API v3 calls
+        :type api_key: str
+
+        :param channel_ids: the ids of the channels, at most YOUTUBE_MAX_IDS_PER_CALL
+        :type channel_ids: list[str]
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: the id of the special "upload" playlist, for each channel
+         found. Channels not found are not in the result
+        :rtype: dict
+        """
+
+        self._logger.info("Retrieving YouTube channel information for {} channels".format(len(channel_ids)))
+        url = self._youtube_channel_info_url(api_key, ",".join(channel_ids))
+
+        try:
+            req = self._http_get(url, check_context=check_context)
+            if not req.ok:
+                req.raise_for_status()
+            results = req.json()
+            self._logger.debug("Data read from channels: {}".format(results))
+        except BaseException as err:
+            self._logger.exception("Error while getting information for channels {}: {}".format(
+                channel_ids,
+                err
+            ))
+            raise err
+
+        upload_playlist_ids: Dict[str, str] = {}
+        try:
+            for channel_item in results.get('items', []):
+                upload_playlist_ids[channel_item['id']] = str(channel_item['contentDetails']['relatedPlaylists']['uploads'])
+        except BaseException as err:
+            self._logger.exception("Exception happened while parsing YouTube data {}".format(err))
+            raise err
+
+        return upload_playlist_ids
+
     def _youtube_find_upload_playlist_from_channel(
         self,
         api_key: str,
-        channel_id: str
+        channel_id: str,
+        check_context: Optional[NewsCheckContext] = None
     ) -> str:
         """Find upload playlist id for a given channel
 
@@ -276,19 +1955,20 @@ class NewsReportGear(BaseGear):
         :param channel_id: the id of the channel where the search is performed
         :type channel_id: str
 
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
         :returns: the id of the special "upload" playlist
         :rtype: str
 
         """
 
         self._logger.info("Retrieving YouTube channel information for {}".format(channel_id))
-        url = 'https://youtube.googleapis.com/youtube/v3/channels?part=contentDetails&id={}&key={}'.format(
-            channel_id,
-            api_key
-        )
+        url = self._youtube_channel_info_url(api_key, channel_id)
 
         try:
-            req = requests.get(url)
+            req = self._http_get(url, check_context=check_context)
             if not req.ok:
                 req.raise_for_status()
             results = req.json()
@@ -300,6 +1980,59 @@ class NewsReportGear(BaseGear):
             ))
             raise err
 
+        return self._youtube_parse_upload_playlist(results)
+
+    async def _youtube_find_upload_playlist_from_channel_async(
+        self,
+        session: Any,
+        api_key: str,
+        channel_id: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> str:
+        """Same as _youtube_find_upload_playlist_from_channel, but with a
+         non-blocking HTTP call
+
+        :raises: BaseException if there are some errors in using the Youtube API
+        """
+
+        self._logger.info("Retrieving YouTube channel information for {}".format(channel_id))
+        url = self._youtube_channel_info_url(api_key, channel_id)
+
+        try:
+            response = await self._http_get_async(session, url, check_context=check_context)
+            results = json.loads(response.text)
+            self._logger.debug("Data read from channel: {}".format(results))
+        except BaseException as err:
+            self._logger.exception("Error while getting information for channel {}: {}".format(
+                channel_id,
+                err
+            ))
+            raise err
+
+        return self._youtube_parse_upload_playlist(results)
+
+    def _youtube_channel_info_url(self, api_key: str, channel_id: str) -> str:
+        """Url of the YouTube API call with the information of a channel
+        """
+
+        return '{}channels?part=contentDetails&id={}&key={}'.format(
+            NewsReportGear.YOUTUBE_API_URL,
+            channel_id,
+            api_key
+        )
+
+    def _youtube_parse_upload_playlist(self, results: Dict[str, Any]) -> str:
+        """Extract the upload playlist id from the YouTube API channel information
+
+        :raises: BaseException if the data has not the expected format
+
+        :param results: the json returned by the YouTube API
+        :type results: dict
+
+        :returns: the id of the special "upload" playlist
+        :rtype: str
+        """
+
         try:
             channel_items = results['items']
             upload_id = str(channel_items[0]['contentDetails']['relatedPlaylists']['uploads'])
@@ -312,8 +2045,9 @@ class NewsReportGear(BaseGear):
     def _youtube_find_new_videos_in_a_playlist(
         self,
         api_key: str,
-        playlist_id: str
-    ) -> List[SimpleNamespace]:
+        playlist_id: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
         """Given a playlist, it searched for its latest videos
 
         :raises: BaseException if there are some errors in using the Youtube API
@@ -324,18 +2058,19 @@ class NewsReportGear(BaseGear):
         :param playlist_id: the id of the playlist
         :type playlist_id: str
 
-        :returns: a collection of objects, representing videos
-        :rtype: list
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a collection of records, representing videos
+        :rtype: list[NewsRecord]
         """
 
         self._logger.debug("Retrieving playlist information for {}".format(playlist_id))
-        url = 'https://youtube.googleapis.com/youtube/v3/playlistItems?part=snippet&maxResults=5&playlistId={}&key={}'.format(
-            playlist_id,
-            api_key
-        )
+        url = self._youtube_playlist_items_url(api_key, playlist_id)
 
         try:
-            req = requests.get(url)
+            req = self._http_get(url, check_context=check_context)
             if not req.ok:
                 req.raise_for_status()
             results = req.json()
@@ -347,6 +2082,67 @@ class NewsReportGear(BaseGear):
             ))
             raise err
 
+        return self._youtube_parse_playlist_videos(playlist_id, results)
+
+    async def _youtube_find_new_videos_in_a_playlist_async(
+        self,
+        session: Any,
+        api_key: str,
+        playlist_id: str,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
+        """Same as _youtube_find_new_videos_in_a_playlist, but with a
+         non-blocking HTTP call
+
+        :raises: BaseException if there are some errors in using the Youtube API
+        """
+
+        self._logger.debug("Retrieving playlist information for {}".format(playlist_id))
+        url = self._youtube_playlist_items_url(api_key, playlist_id)
+
+        try:
+            response = await self._http_get_async(session, url, check_context=check_context)
+            results = json.loads(response.text)
+            self._logger.debug("Data read from playlist: {}".format(results))
+        except BaseException as err:
+            self._logger.exception("Error while getting playlist information for playlist {}: {}".format(
+                playlist_id,
+                err
+            ))
+            raise err
+
+        return self._youtube_parse_playlist_videos(playlist_id, results)
+
+    def _youtube_playlist_items_url(self, api_key: str, playlist_id: str) -> str:
+        """Url of the YouTube API call with the latest items of a playlist
+        """
+
+        return '{}playlistItems?part=snippet&maxResults=5&playlistId={}&key={}'.format(
+            NewsReportGear.YOUTUBE_API_URL,
+            playlist_id,
+            api_key
+        )
+
+    def _youtube_parse_playlist_videos(
+        self,
+        playlist_id: str,
+        results: Dict[str, Any]
+    ) -> List[NewsRecord]:
+        """Extract the videos from the YouTube API playlist items
+
+        :raises: BaseException if the data has not the expected format
+
+        :param playlist_id: the id of the playlist
+        :type playlist_id: str
+
+        :param results: the json returned by the YouTube API
+        :type results: dict
+
+        :returns: a collection of records, representing videos. Their
+         source is not set
+        :rtype: list[NewsRecord]
+        """
+
         latest_videos = []
         try:
             for item in results['items']:
@@ -354,13 +2150,14 @@ class NewsReportGear(BaseGear):
                 video_url = 'https://www.youtube.com/watch?v={}'.format(
                     snippet['resourceId']['videoId'])
                 video_title = snippet['title']
-                video_published = snippet['publishedAt']
-
-                # Power of SimpleNamespace class
-                video = SimpleNamespace(
-                    url = video_url,
-                    title = video_title,
-                    published = video_published
+                video_published = arrow.get(snippet['publishedAt']).int_timestamp
+
+                video = NewsRecord(
+                    None,
+                    video_title,
+                    video_url,
+                    video_published,
+                    NewsRecord.KIND_VIDEO
                 )
                 latest_videos.append(video)
         except BaseException as err:
@@ -379,12 +2176,21 @@ class NewsReportGear(BaseGear):
     def _rss_analize_feed(
         self,
         feed_url: str,
-        last_check_date: Arrow
-    ) -> List[str]:
+        last_check_date: Arrow,
+        news_item: Optional[NewsItemEntity] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
         """Analyze a RSS feed, searching for articles published after a certain date
 
         Example of a channel is https://developer.oculus.com/blog/rss/
 
+        If the entity of the source is given, the HTTP validators (ETag and
+         Last-Modified) stored inside it are used for a conditional request,
+         and the feed isn't parsed at all if the server says it hasn't
+         changed. The entity is then updated with the new validators, but
+         only if the feed was parsed without errors: otherwise, the next
+         check would get a 304 and the entries of the feed would be lost
+
         :param feed_url: the RSS feed URL to analyze
         :type feed_url: str
 
@@ -392,96 +2198,486 @@ class NewsReportGear(BaseGear):
          previous check was performed on the news source
         :type last_check_date: Arrow
 
-        :returns: a list of str, each one containing a new content (article)
-         found on the channel. It could also potentially contains an error
-         message
-        :rtype: list[str]
+        :param news_item: the entity of the news source, optional
+        :type news_item: NewsItemEntity
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a list of records, each one containing a new content
+         (article) found on the channel. It could also potentially contains
+         an error
+        :rtype: list[NewsRecord]
         """
         
-        import feedparser
-        import re
-
         # Initialize the return variable
-        new_feeds_messages: List[str] = []  # Initialize the return var
+        new_feeds_records: List[NewsRecord] = []  # Initialize the return var
 
-        rss_content = None
+        fetched_feed = None
         try:
-            req = requests.get(feed_url)
-            if not req.ok:
-                req.raise_for_status()
-            rss_content = req.text
+            fetched_feed = self._rss_fetch_feed(feed_url, news_item, check_context)
         except BaseException as err:
             self._logger.exception("Error while getting RSS feed information from {}: {}".format(
                 feed_url,
                 err
             ))
             # Forge specific messagge to return to the caller
-            new_feeds_messages.append("Error while getting RSS feed information from {}".format(feed_url))
-            return new_feeds_messages
+            new_feeds_records.append(NewsRecord.error(
+                feed_url,
+                "Error while getting RSS feed information from {}".format(feed_url)
+            ))
+            return new_feeds_records
+
+        if fetched_feed is None:
+            # Not modified since last check
+            return new_feeds_records
+
+        rss_content, response_headers = fetched_feed
+        new_feeds_records = self._rss_analize_feed_content(
+            feed_url, rss_content, last_check_date, news_item, check_context)
+        self._rss_store_validators_if_parsed(news_item, response_headers, rss_content, new_feeds_records)
+        return new_feeds_records
+
+    async def _rss_analize_feed_async(
+        self,
+        session: Any,
+        feed_url: str,
+        last_check_date: Arrow,
+        news_item: Optional[NewsItemEntity] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
+        """Same as _rss_analize_feed, but with a non-blocking HTTP call
+
+        :param session: the aiohttp session to use for the HTTP call
+        :type session: aiohttp.ClientSession
+        """
+
+        fetched_feed = None
+        try:
+            fetched_feed = await self._rss_fetch_feed_async(session, feed_url, news_item, check_context)
+        except asyncio.CancelledError:
+            # Deadline expired, the cancellation has to reach the caller
+            raise
+        except BaseException as err:
+            self._logger.exception("Error while getting RSS feed information from {}: {}".format(
+                feed_url,
+                err
+            ))
+            return [NewsRecord.error(feed_url, "Error while getting RSS feed information from {}".format(feed_url))]
+
+        if fetched_feed is None:
+            return []
+
+        rss_content, response_headers = fetched_feed
+        new_feeds_records = self._rss_analize_feed_content(
+            feed_url, rss_content, last_check_date, news_item, check_context)
+        self._rss_store_validators_if_parsed(news_item, response_headers, rss_content, new_feeds_records)
+        return new_feeds_records
+
+    def _rss_fetch_feed(
+        self,
+        feed_url: str,
+        news_item: Optional[NewsItemEntity] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Optional[Tuple[str, Any]]:
+        """Download a feed, with a conditional request if the entity of the
+         source has the HTTP validators of the previous download
+
+        The entity isn't updated with the new validators: it's up to the
+         caller, once the content has been successfully parsed
+
+        :raises: BaseException if the request fails or the server returns an
+         error status code
+
+        :param feed_url: the feed URL
+        :type feed_url: str
+
+        :param news_item: the entity of the news source, optional
+        :type news_item: NewsItemEntity
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: the content of the feed and the response headers, or None
+         if it wasn't modified since the previous download, because the
+         server says so or because the content is exactly the same
+        :rtype: tuple
+        """
+
+        req = self._http_get(feed_url, self._rss_conditional_headers(news_item), check_context)
+        if 304 == req.status_code:
+            self._logger.info("Feed at {} not modified since last check".format(feed_url))
+            return None
+        if not req.ok:
+            req.raise_for_status()
+        if self._rss_same_content(news_item, req.text):
+            self._logger.info("Feed at {} has the same content of last check".format(feed_url))
+            return None
+        return req.text, req.headers
+
+    async def _rss_fetch_feed_async(
+        self,
+        session: Any,
+        feed_url: str,
+        news_item: Optional[NewsItemEntity] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Optional[Tuple[str, Any]]:
+        """Same as _rss_fetch_feed, but with a non-blocking HTTP call
+
+        :param session: the aiohttp session to use for the HTTP call
+        :type session: aiohttp.ClientSession
+        """
+
+        response = await self._http_get_async(
+            session, feed_url, self._rss_conditional_headers(news_item), check_context)
+        if 304 == response.status:
+            self._logger.info("Feed at {} not modified since last check".format(feed_url))
+            return None
+        if self._rss_same_content(news_item, response.text):
+            self._logger.info("Feed at {} has the same content of last check".format(feed_url))
+            return None
+        return response.text, response.headers
+
+    def _rss_conditional_headers(self, news_item: Optional[NewsItemEntity]) -> Dict[str, str]:
+        """Creates the headers for a conditional request, using the HTTP
+         validators stored in the entity
+
+        :param news_item: the entity of the news source
+        :type news_item: NewsItemEntity
+
+        :returns: the request headers, empty if there are no validators
+        :rtype: dict
+        """
+
+        headers: Dict[str, str] = {}
+        if news_item is None:
+            return headers
+        if getattr(news_item, "etag", None):
+            headers["If-None-Match"] = news_item.etag
+        if getattr(news_item, "last_modified", None):
+            headers["If-Modified-Since"] = news_item.last_modified
+        return headers
+
+    def _rss_store_validators(
+        self,
+        news_item: Optional[NewsItemEntity],
+        response_headers: Any,
+        content: str
+    ) -> None:
+        """Saves in the entity the HTTP validators returned by the server,
+         and the digest of the content, used by _rss_same_content
+
+        :param news_item: the entity of the news source
+        :type news_item: NewsItemEntity
+
+        :param response_headers: the headers of the response, case insensitive
+        :type response_headers: dict
+
+        :param content: the content just downloaded
+        :type content: str
+        """
+
+        if news_item is None:
+            return
+        news_item.etag = response_headers.get("ETag")
+        news_item.last_modified = response_headers.get("Last-Modified")
+        news_item.content_hash = self._rss_content_hash(content)
+
+    def _rss_store_validators_if_parsed(
+        self,
+        news_item: Optional[NewsItemEntity],
+        response_headers: Any,
+        content: str,
+        news_records: List[NewsRecord]
+    ) -> None:
+        """Saves in the entity the HTTP validators returned by the server,
+         and the digest of the content, unless the analysis of the content
+         found an error
+
+        :param news_item: the entity of the news source
+        :type news_item: NewsItemEntity
+
+        :param response_headers: the headers of the response, case insensitive
+        :type response_headers: dict
+
+        :param content: the content just downloaded
+        :type content: str
+
+        :param news_records: the records found analyzing the content
+        :type news_records: list[NewsRecord]
+        """
+
+        if any(news_record.is_error() for news_record in news_records):
+            return
+        self._rss_store_validators(news_item, response_headers, content)
+
+    def _rss_same_content(self, news_item: Optional[NewsItemEntity], content: Optional[str]) -> bool:
+        """Checks if the content is the same one downloaded at last check,
+         comparing its digest with the one stored in the entity
+
+        Useful for the servers that don't support conditional requests, but
+         return the same content until something changes
+
+        :param news_item: the entity of the news source
+        :type news_item: NewsItemEntity
+
+        :param content: the content just downloaded
+        :type content: str
+
+        :returns: True if the content is the same of the previous download
+        :rtype: bool
+        """
+
+        if news_item is None or not content:
+            return False
+        return self._rss_content_hash(content) == getattr(news_item, "content_hash", None)
+
+    def _rss_content_hash(self, content: str) -> str:
+        """Digest of the content of a feed, to check if it has changed
+
+        :param content: the content of the feed
+        :type content: str
+
+        :returns: the digest, as hex string
+        :rtype: str
+        """
+
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _rss_analize_feed_content(
+        self,
+        feed_url: str,
+        rss_content: Optional[str],
+        last_check_date: Arrow,
+        news_item: Optional[NewsItemEntity] = None,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> List[NewsRecord]:
+        """Parse the content of a RSS feed, searching for articles not seen
+         before or, if the feed has no seen articles yet, published after a
+         certain date
+
+        :param feed_url: the RSS feed URL, used for records and special cases
+        :type feed_url: str
+
+        :param rss_content: the content of the feed
+        :type rss_content: str
+
+        :param last_check_date: date to use for checking, only if the feed
+         has no seen articles
+        :type last_check_date: Arrow
+
+        :param news_item: the entity of the feed, with the seen articles.
+         Updated with the articles found. If None, only dates are used
+        :type news_item: NewsItemEntity
+
+        :param check_context: the state of the current check, None when
+         called outside of a check
+        :type check_context: NewsCheckContext
+
+        :returns: a list of records, each one containing a new content
+         (article) found on the channel. It could also potentially contains
+         an error
+        :rtype: list[NewsRecord]
+        """
+
+        new_feeds_records: List[NewsRecord] = []  # Initialize the return var
 
         if not rss_content:
             # Forge specific messagge to return to the caller
             self._logger.info("Empty RSS feed at {}".format(feed_url))
-            new_feeds_messages.append("It seems the RSS feed at {} is empty".format(feed_url))
-            return new_feeds_messages
+            new_feeds_records.append(NewsRecord.error(feed_url, "It seems the RSS feed at {} is empty".format(feed_url)))
+            return new_feeds_records
+
+        if self._feed_stop_after_old_entries > 0:
+            try:
+                return self._rss_analize_feed_content_streaming(feed_url, rss_content, last_check_date, news_item)
+            except (ValueError, TypeError, ElementTree.ParseError) as err:
+                self._logger.info("Incremental parsing of the RSS feed at {} failed, using feedparser: {}".format(
+                    feed_url,
+                    err
+                ))
 
         try:
-            d = feedparser.parse(rss_content)
+            _, feed_entries = self._parse_feed_entries(rss_content, check_context=check_context)
         except BaseException as err:
             self._logger.exception("Error while parsing RSS feed information from {}: {}".format(
                 feed_url,
                 err
             ))
-            new_feeds_messages.append("Error while parsing the RSS feed at {}".format(feed_url))
-            return new_feeds_messages
+            new_feeds_records.append(NewsRecord.error(feed_url, "Error while parsing the RSS feed at {}".format(feed_url)))
+            return new_feeds_records
 
-        self._logger.debug("Comparing published date of {} RSS entities agains {}".format(
-            len(d.entries),
-            last_check_date
-        ))
+        self._logger.debug("Checking {} RSS entities".format(len(feed_entries)))
 
+        seen_entry_index = self._load_seen_entry_index(news_item)
         try:
-            # Discard all the videos older that a certain date
-            for rss_entry in d.entries:
-                # There are two fields: updated and published. Some feeds
-                #  use updated, other published. Check one, and then the other
-                # Check also https://feedparser.readthedocs.io/en/latest/reference-entry-updated.html
-                #  because Feedparse, for now, links pubDate to updated, if
-                #  updated is not present
-                try:
-                    entry_date = arrow.get(rss_entry.updated_parsed)
-                except AttributeError as err:
-                    entry_date = arrow.get(rss_entry.published_parsed)
-
-                if entry_date >= last_check_date:
-                    if "http://www.commitstrip.com/en/feed/" == feed_url:
-                        # Workaround for a special threatment of CommitStrip rss
-                        img_tag = rss_entry.content[0].value
-                        # <img src="https://www.commitstrip.com/wp-content/uploads/2020/01/Strip-Paywall-650-finalenglish.jpg" alt="" width="650" height="607" class="alignnone size-full wp-image-20822" />
-                        img_matches = re.search('src="([^"]+)"', img_tag)
-                        new_feeds_messages.append("New CommitStrip content: {} - {}".format(
-                            rss_entry.title,
-                            img_matches[1]
-                        ))
-                    else:
-                        new_feeds_messages.append("New article published: {} - {}". format(
-                            rss_entry.title,
-                            rss_entry.link
-                        ))
-
-            self._logger.info("Found {} articles, out of {}, newer than {}".format(
-                len(new_feeds_messages),
-                len(d.entries),
-                last_check_date
+            # Discard all the articles already seen
+            for entry_id, title, link, timestamp, content in feed_entries:
+                entry_key = entry_id or link
+                if entry_key is None:
+                    self._logger.debug("Skipping entry without id and link: {}".format(title))
+                    continue
+                # Entries without a date are matched by id only
+                entry_date = arrow.get(timestamp) if timestamp is not None else None
+                if seen_entry_index.is_new(entry_key, entry_date, last_check_date):
+                    new_feeds_records.append(self._rss_entry_record(
+                        feed_url,
+                        title,
+                        link,
+                        entry_date,
+                        content
+                    ))
+
+            self._logger.info("Found {} new articles, out of {}".format(
+                len(new_feeds_records),
+                len(feed_entries)
             ))
         except BaseException as err:
             self._logger.exception("Error while reading parsed RSS item from {}: {}".format(
                 feed_url,
                 err
             ))
-            new_feeds_messages.append("Error while reading parsed RSS item at {}".format(feed_url))
-            return new_feeds_messages
+            new_feeds_records.append(NewsRecord.error(feed_url, "Error while reading parsed RSS item at {}".format(feed_url)))
+            return new_feeds_records
+
+        self._store_seen_entry_index(news_item, seen_entry_index)
+        return new_feeds_records
+
+    def _parse_feed_entries(
+        self,
+        feed_content: str,
+        use_published: bool = False,
+        check_context: Optional[NewsCheckContext] = None
+    ) -> Tuple[Optional[str], List[FeedEntry]]:
+        """Parse a feed with feedparser, in the calling thread or in the
+         pool of processes, if enabled. See parse_feed_entries
+
+        If the pool stops working, before or while parsing the feed, the
+         feed is parsed in the calling thread, and a new pool is created for
+         the next feeds
+
+        :raises: TimeoutError if the deadline of the check expires while
+         waiting for the pool
+        """
+
+        if 0 == self._parse_processes:
+            return parse_feed_entries(feed_content, use_published)
+
+        try:
+            future = self._get_parse_executor().submit(parse_feed_entries, feed_content, use_published)
+            # Only the time left before the deadline is waited
+            return future.result(self._remaining_time(check_context))
+        except BrokenProcessPool as err:
+            self._logger.exception("Process pool not available, parsing in the calling thread: {}".format(err))
+            with self._parse_executor_lock:
+                self._parse_executor = None
+            return parse_feed_entries(feed_content, use_published)
+
+    def _get_parse_executor(self) -> ProcessPoolExecutor:
+        """Returns the pool of processes used to parse the feeds, created
+         the first time
+        """
+
+        with self._parse_executor_lock:
+            if self._parse_executor is None:
+                self._logger.info("Starting {} processes to parse the feeds".format(self._parse_processes))
+                # Spawn instead of fork: forking a process with many threads,
+                #  like the Flask one, can leave locks held in the children
+                self._parse_executor = ProcessPoolExecutor(
+                    max_workers=self._parse_processes,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._parse_executor
+
+    def _rss_analize_feed_content_streaming(
+        self,
+        feed_url: str,
+        rss_content: str,
+        last_check_date: Arrow,
+        news_item: Optional[NewsItemEntity] = None
+    ) -> List[NewsRecord]:
+        """Same as _rss_analize_feed_content, but the feed is parsed one entry
+         at a time, and parsing stops after feed_stop_after_old_entries
+         consecutive entries already seen
+
+        If the feed has no seen entries yet, the whole feed is parsed, so
+         all its entries are added to the seen ones
+
+        :raises: ValueError, TypeError or ElementTree.ParseError if the feed
+         cannot be parsed. In this case, the caller should fall back to
+         feedparser
+
+        :returns: a list of records, each one containing a new content
+         (article)
+        :rtype: list[NewsRecord]
+        """
+
+        new_feeds_records: List[NewsRecord] = []
+        seen_entry_index = self._load_seen_entry_index(news_item)
+        parsed_entries = 0
+        consecutive_old_entries = 0
+        for rss_entry in StreamingFeedParser().iter_entries(rss_content):
+            parsed_entries += 1
+            if seen_entry_index.is_new(rss_entry.id or rss_entry.link, rss_entry.date, last_check_date):
+                consecutive_old_entries = 0
+                new_feeds_records.append(self._rss_entry_record(
+                    feed_url,
+                    rss_entry.title,
+                    rss_entry.link,
+                    rss_entry.date,
+                    rss_entry.content
+                ))
+            else:
+                consecutive_old_entries += 1
+                if consecutive_old_entries >= self._feed_stop_after_old_entries and not seen_entry_index.is_bootstrap():
+                    break
+        self._store_seen_entry_index(news_item, seen_entry_index)
+
+        self._logger.info("Found {} new articles, out of {} parsed".format(
+            len(new_feeds_records),
+            parsed_entries
+        ))
+        return new_feeds_records
+
+    def _rss_entry_record(
+        self,
+        feed_url: str,
+        title: Optional[str],
+        link: Optional[str],
+        published: Optional[Arrow],
+        content: Optional[str]
+    ) -> NewsRecord:
+        """Creates the record for a new entry of a feed
+
+        :param feed_url: the RSS feed URL, used for special cases
+        :type feed_url: str
+
+        :param title: title of the entry
+        :type title: str
+
+        :param link: url of the entry
+        :type link: str
 
-        return new_feeds_messages
+        :param published: date of the entry, None if the entry has no date
+        :type published: Arrow
 
+        :param content: full content of the entry, if available
+        :type content: str
+
+        :returns: the record of the entry
+        :rtype: NewsRecord
+        """
+
+        import re
 
+        published_timestamp = published.int_timestamp if published is not None else 0
+        if "http://www.commitstrip.com/en/feed/" == feed_url and content:
+            # Workaround for a special threatment of CommitStrip rss
+            # <img src="https://www.commitstrip.com/wp-content/uploads/2020/01/Strip-Paywall-650-finalenglish.jpg" alt="" width="650" height="607" class="alignnone size-full wp-image-20822" />
+            img_matches = re.search('src="([^"]+)"', content)
+            if img_matches is not None:
+                return NewsRecord(feed_url, title or "", img_matches[1], published_timestamp, NewsRecord.KIND_COMMITSTRIP)
+        # Without the image, the strip is reported as an article
+        return NewsRecord(feed_url, title or "", link, published_timestamp, NewsRecord.KIND_ARTICLE)
@@ -0,0 +1,127 @@
+"""Index of the entries already seen on a news source
+
+Instead of comparing the date of each entry with the date of the last
+ check, a news source keeps the identifiers of the latest entries found on
+ it (GUID for feed entries, url for videos). An entry is new if its
+ identifier was never seen before, so entries edited after publication are
+ not reported again, and entries published with a date in the past are not
+ missed.
+
+Identifiers are stored as short digests, in a ring capped to a max number
+ of items, most recent first, so the index stays small whatever the size of
+ the source.
+
+When a source has no index yet, the date of the entries is used, as
+ before, and the index is filled for the next checks. Entries without a
+ date are not reported in this case, as there is no way to tell if they
+ are new, but they are remembered, and matched by identifier from then on.
+"""
+
+import hashlib
+from typing import ClassVar, List, Optional, Set
+
+from arrow import Arrow
+
+
+class SeenEntryIndex:
+    """Identifiers of the entries already seen on a news source
+    """
+
+    CAPACITY: ClassVar[int] = 100  # Max identifiers kept for each source
+
+    def __init__(self, seen_ids: Optional[List[str]], capacity: int = CAPACITY) -> None:
+        """Constructor
+
+        :param seen_ids: the digests saved after the previous check of the
+         source, most recent first. None or empty if the source has no index
+        :type seen_ids: list[str]
+
+        :param capacity: max number of identifiers to keep
+        :type capacity: int
+        """
+
+        self._capacity = capacity
+        self._previous_ids = list(seen_ids or [])
+        self._seen_ids = set(self._previous_ids)
+        # Entries found during this check, in the same order of the source,
+        #  and the same ones as a set, for fast lookups
+        self._current_ids: List[str] = []
+        self._current_ids_set: Set[str] = set()
+
+    @staticmethod
+    def digest(entry_id: str) -> str:
+        """Returns the compact form of an entry identifier
+        """
+        return hashlib.blake2b(entry_id.encode("utf-8"), digest_size=8).hexdigest()
+
+    def is_bootstrap(self) -> bool:
+        """True if the source had no index, so dates are used instead
+        """
+        return 0 == len(self._previous_ids)
+
+    def is_new(self, entry_id: str, entry_date: Optional[Arrow], last_check_date: Arrow) -> bool:
+        """Checks if an entry is new, and remembers it for the next checks
+
+        :param entry_id: the identifier of the entry, like the GUID
+        :type entry_id: str
+
+        :param entry_date: the date of the entry, used only when the source
+         has no index yet. None if the entry has no date
+        :type entry_date: Arrow
+
+        :param last_check_date: the date of the last check of the source,
+         used only when the source has no index yet
+        :type last_check_date: Arrow
+
+        :returns: True if the entry has never been seen before
+        :rtype: bool
+        """
+
+        entry_digest = SeenEntryIndex.digest(entry_id)
+        already_found = entry_digest in self._current_ids_set
+        if not already_found:
+            self._current_ids.append(entry_digest)
+            self._current_ids_set.add(entry_digest)
+        if self.is_bootstrap():
+            return entry_date is not None and entry_date >= last_check_date and not already_found
+        return entry_digest not in self._seen_ids and not already_found
+
+    @staticmethod
+    def merge(seen_ids: Optional[List[str]], other_seen_ids: Optional[List[str]], capacity: int = CAPACITY) -> List[str]:
+        """Merges the identifiers saved by two checks of the same source
+         that ran at the same time, like a poll and the processing of the
+         content pushed by a WebSub hub, so the entries found by one of them
+         are not forgotten when the other one saves
+
+        :param seen_ids: the digests about to be saved, most recent first
+        :type seen_ids: list[str]
+
+        :param other_seen_ids: the digests saved in the meantime
+        :type other_seen_ids: list[str]
+
+        :param capacity: max number of identifiers to keep
+        :type capacity: int
+
+        :returns: the digests of both lists, the ones about to be saved first
+        :rtype: list[str]
+        """
+
+        merged_ids = list(seen_ids or [])
+        known_ids = set(merged_ids)
+        merged_ids.extend(seen_id for seen_id in (other_seen_ids or []) if seen_id not in known_ids)
+        return merged_ids[:max(capacity, len(seen_ids or []))]
+
+    def to_list(self) -> List[str]:
+        """Returns the identifiers to save for the next check: the entries
+         found during this check, then the previous ones, up to the capacity.
+         All the entries found during this check are kept anyway, otherwise
+         the ones over the capacity would be reported again
+
+        :returns: the digests, most recent first
+        :rtype: list[str]
+        """
+
+        seen_ids = self._current_ids + [
+            seen_id for seen_id in self._previous_ids if seen_id not in self._current_ids_set
+        ]
+        return seen_ids[:max(self._capacity, len(self._current_ids))]
@@ -0,0 +1,178 @@
+"""Incremental parser for RSS and Atom feeds
+
+Instead of building the whole document and all its entries, like feedparser
+ does, the feed is fed to an XML pull parser chunk by chunk, and each entry
+ is returned as soon as its closing tag is found. Each entry element is
+ cleared once processed, so memory stays flat regardless of the feed size.
+
+The caller can stop reading entries at any time, for example once it found
+ enough entries older than a given date, and the rest of the feed is never
+ parsed.
+
+Only well-formed XML feeds in RSS 0.9x/2.0, RSS 1.0 (RDF) and Atom formats
+ are supported: in case of errors, a xml.etree.ElementTree.ParseError is
+ raised, and if no entry is found a ValueError is raised, so the caller can
+ fall back to a more tolerant parser, like feedparser.
+"""
+
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import ClassVar, Iterator, Optional
+from xml.etree import ElementTree
+
+import arrow
+from arrow import Arrow
+
+
+class StreamingFeedParser:
+    """Parse RSS and Atom feeds one entry at a time
+    """
+
+    CHUNK_SIZE: ClassVar[int] = 16 * 1024  # Characters fed to the parser at every step
+
+    ATOM_NS: ClassVar[str] = "{http://www.w3.org/2005/Atom}"
+    RSS1_NS: ClassVar[str] = "{http://purl.org/rss/1.0/}"
+    RDF_NS: ClassVar[str] = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+    CONTENT_NS: ClassVar[str] = "{http://purl.org/rss/1.0/modules/content/}"
+    DC_NS: ClassVar[str] = "{http://purl.org/dc/elements/1.1/}"
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE) -> None:
+        """Constructor
+
+        :param chunk_size: how many characters are fed to the XML parser at
+         every step
+        :type chunk_size: int
+        """
+
+        self._chunk_size = chunk_size
+
+    def iter_entries(self, feed_content: str) -> Iterator[SimpleNamespace]:
+        """Returns the entries of the feed, in document order, one at a time
+
+        Each entry has these fields:
+        - id: the unique identifier of the entry (RSS guid, RDF about or
+           Atom id), None if not available
+        - title: the title of the entry
+        - link: the url of the entry
+        - date: the date of the entry, as Arrow. updated is used when
+           available, otherwise published, as feedparser does. None if the
+           entry has no date
+        - content: the value of the full content (content:encoded or Atom
+           content), None if not available
+
+        :raises: ElementTree.ParseError if the feed is not well-formed XML
+        :raises: ValueError if the date of an entry cannot be parsed, or if
+         the feed has no entries at all, because an empty feed and a feed in
+         an unsupported format cannot be told apart
+
+        :param feed_content: the content of the feed
+        :type feed_content: str
+
+        :returns: an iterator over the entries of the feed
+        :rtype: iterator
+        """
+
+        parser: ElementTree.XMLPullParser = ElementTree.XMLPullParser(events=("end",))
+        entries_found = False
+        for start in range(0, len(feed_content), self._chunk_size):
+            parser.feed(feed_content[start:start + self._chunk_size])
+            for entry in self._read_entries(parser):
+                entries_found = True
+                yield entry
+        parser.close()
+        for entry in self._read_entries(parser):
+            entries_found = True
+            yield entry
+        if not entries_found:
+            raise ValueError("No RSS or Atom entries found in the feed")
+
+    def _read_entries(self, parser: ElementTree.XMLPullParser) -> Iterator[SimpleNamespace]:
+        """Returns the entries completed by the last chunk fed to the parser
+        """
+
+        for event in parser.read_events():
+            element = event[-1]
+            if not isinstance(element, ElementTree.Element):
+                # Only "end" events are requested, always with an element
+                continue
+            if "item" == element.tag:
+                entry = self._from_rss_item(element)
+            elif StreamingFeedParser.RSS1_NS + "item" == element.tag:
+                entry = self._from_rdf_item(element)
+            elif StreamingFeedParser.ATOM_NS + "entry" == element.tag:
+                entry = self._from_atom_entry(element)
+            else:
+                continue
+            # Entry has been processed, free the memory used by its children
+            element.clear()
+            yield entry
+
+    def _from_rss_item(self, element: ElementTree.Element) -> SimpleNamespace:
+        """Creates an entry from a RSS <item>
+        """
+
+        date_text = self._text(element, "pubDate") or self._text(element, StreamingFeedParser.DC_NS + "date")
+        return SimpleNamespace(
+            id = self._text(element, "guid"),
+            title = self._text(element, "title"),
+            link = self._text(element, "link"),
+            date = self._parse_date(date_text),
+            content = self._text(element, StreamingFeedParser.CONTENT_NS + "encoded")
+        )
+
+    def _from_rdf_item(self, element: ElementTree.Element) -> SimpleNamespace:
+        """Creates an entry from a RSS 1.0 <item>, where the id is in the
+         rdf:about attribute and the date comes from Dublin Core
+        """
+
+        return SimpleNamespace(
+            id = element.get(StreamingFeedParser.RDF_NS + "about"),
+            title = self._text(element, StreamingFeedParser.RSS1_NS + "title"),
+            link = self._text(element, StreamingFeedParser.RSS1_NS + "link"),
+            date = self._parse_date(self._text(element, StreamingFeedParser.DC_NS + "date")),
+            content = self._text(element, StreamingFeedParser.CONTENT_NS + "encoded")
+        )
+
+    def _from_atom_entry(self, element: ElementTree.Element) -> SimpleNamespace:
+        """Creates an entry from an Atom <entry>
+        """
+
+        link = None
+        for link_element in element.findall(StreamingFeedParser.ATOM_NS + "link"):
+            if "alternate" == link_element.get("rel", "alternate"):
+                link = link_element.get("href")
+                break
+
+        date_text = self._text(element, StreamingFeedParser.ATOM_NS + "updated") \
+            or self._text(element, StreamingFeedParser.ATOM_NS + "published")
+        return SimpleNamespace(
+            id = self._text(element, StreamingFeedParser.ATOM_NS + "id"),
+            title = self._text(element, StreamingFeedParser.ATOM_NS + "title"),
+            link = link,
+            date = self._parse_date(date_text),
+            content = self._text(element, StreamingFeedParser.ATOM_NS + "content")
+        )
+
+    def _text(self, element: ElementTree.Element, tag: str) -> Optional[str]:
+        """Text of a child element, stripped, or None if the child doesn't exist
+        """
+
+        child = element.find(tag)
+        if child is None or child.text is None:
+            return None
+        return child.text.strip()
+
+    def _parse_date(self, date_text: Optional[str]) -> Optional[Arrow]:
+        """Parse RSS (RFC 822) and Atom (ISO 8601) dates
+
+        :returns: the date, None if the entry has no date
+        :raises: ValueError if the date cannot be parsed
+        """
+
+        if not date_text:
+            return None
+        try:
+            return arrow.get(date_text)
+        except (ValueError, TypeError):
+            # Not ISO 8601, so it should be a RFC 822 date
+            return arrow.get(parsedate_to_datetime(date_text))
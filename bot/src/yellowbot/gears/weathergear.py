@@ -6,13 +6,15 @@ Requirements
 -requests
 """
 
-from typing import Any, ClassVar, Dict, List, Optional, Union
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 import requests
 import arrow
 
 from yellowbot.gears.basegear import BaseGear
 from yellowbot.gears.gearexecutionresult import GearExecutionResult
 from yellowbot.globalbag import GlobalBag
+from yellowbot.httpcacheservice import HttpCacheService
+from yellowbot.httpsessionservice import HttpSessionService
 from yellowbot.loggingservice import LoggingService
 
 
@@ -23,14 +25,39 @@ class WeatherGear(BaseGear):
     INTENTS: ClassVar[List[str]]= [GlobalBag.WEATHER_FORECAST_INTENT]
     PARAM_LOCATION: ClassVar[str] = GlobalBag.WEATHER_FORECAST_PARAM_LOCATION  # The latitude and longitude of the city
     PARAM_CITY_NAME: ClassVar[str] = GlobalBag.WEATHER_FORECAST_PARAM_CITY_NAME  # The city name
+    REQUEST_TIMEOUT: ClassVar[Tuple[float, float]] = (5, 20)  # Connect and read timeouts, in seconds
 
     def __init__(
         self,
-        api_key: str
+        api_key: str,
+        http_cache: Optional[HttpCacheService] = None,
+        http_cache_ttl: Optional[int] = None,
+        http_session: Optional[HttpSessionService] = None
     ) -> None:
+        """Constructor
+
+        :param api_key: the DarkSky API key
+        :type api_key: str
+
+        :param http_cache: cache for the responses of the weather service.
+         None, the default, disables the cache
+        :type http_cache: HttpCacheService
+
+        :param http_cache_ttl: seconds a forecast is cached, regardless of
+         the headers of the response. None uses the headers
+        :type http_cache_ttl: int
+
+        :param http_session: pooled sessions used for the HTTP calls. None,
+         the default, opens a new connection for every call
+        :type http_session: HttpSessionService
+        """
+
         super().__init__(self.__class__.__name__, self.INTENTS)
         self._logger = LoggingService.get_logger(__name__)
         self._api_key = api_key
+        self._http_cache = http_cache
+        self._http_cache_ttl = http_cache_ttl
+        self._http_session = http_session
 
     def process_intent(
         self,
@@ -93,7 +120,16 @@ class WeatherGear(BaseGear):
             "exclude=minutely,hourly,alerts,flags&units=si&lang=it"
         )
         try:
-            req = requests.get(url)
+            if self._http_cache is not None:
+                req = self._http_cache.get(
+                    url,
+                    timeout=WeatherGear.REQUEST_TIMEOUT,
+                    ttl=self._http_cache_ttl,
+                    http_session=self._http_session
+                )
+            else:
+                http_client = self._http_session if self._http_session is not None else requests
+                req = http_client.get(url, timeout=WeatherGear.REQUEST_TIMEOUT)
             if not req.ok:
                 req.raise_for_status()
             results = req.json()
@@ -0,0 +1,334 @@
+"""WebSub subscriptions of the news sources
+
+WebSub (https://www.w3.org/TR/websub/) lets a source push its new content,
+ through a hub, instead of waiting for the next poll:
+- the subscriber asks the hub to send the updates of a topic, the url of
+   a feed, to a callback url
+- the hub verifies the request with a GET to the callback url, that has
+   to echo back the challenge of the hub
+- every time the topic changes, the hub POSTs the new content to the
+   callback url, signed with the secret given by the subscriber
+- subscriptions have a lease, and have to be renewed before it expires
+
+Each subscription has a random id, the last part of its callback url, and
+ its own secret. The state of the subscriptions is kept in
+ WebSubSubscriptionEntity objects, so the caller can read them from a
+ storage and save them back. As for HostCircuitBreaker, the class doesn't
+ use the storage directly.
+"""
+
+import hmac
+import secrets
+from typing import ClassVar, Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+import arrow
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.websubsubscriptionentity import WebSubSubscriptionEntity
+
+
+class WebSubSubscriber:
+    """Track the WebSub subscriptions of the news sources
+    """
+
+    STATE_PENDING: ClassVar[str] = "pending"  # Requested, waiting for the verification of the hub
+    STATE_ACTIVE: ClassVar[str] = "active"  # Verified, the hub pushes the new content
+    STATE_DENIED: ClassVar[str] = "denied"  # Refused by the hub
+    STATE_UNSUPPORTED: ClassVar[str] = "unsupported"  # The source doesn't advertise a hub
+
+    YOUTUBE_HUB: ClassVar[str] = "https://pubsubhubbub.appspot.com/subscribe"
+    RETRY_HOURS: ClassVar[int] = 24  # Wait before asking again a subscription not verified
+    UNSUPPORTED_RETRY_DAYS: ClassVar[int] = 7  # Wait before checking again a source without hub
+    RENEW_BEFORE_HOURS: ClassVar[int] = 24  # Subscriptions are renewed this time before their lease ends
+    SIGNATURE_METHODS: ClassVar[Set[str]] = {"sha1", "sha256", "sha384", "sha512"}  # Allowed by the specs
+
+    def __init__(
+        self,
+        callback_url: str,
+        lease_seconds: int,
+        subscriptions: Optional[List[WebSubSubscriptionEntity]] = None
+    ) -> None:
+        """Constructor
+
+        :param callback_url: public url of the WebSub endpoint of the bot.
+         The id of each subscription is appended to it
+        :type callback_url: str
+
+        :param lease_seconds: the lease requested for the subscriptions
+        :type lease_seconds: int
+
+        :param subscriptions: the subscriptions, as saved at the end of a
+         previous run
+        :type subscriptions: list[WebSubSubscriptionEntity]
+        """
+
+        self._logger = LoggingService.get_logger(__name__)
+        self._callback_url = callback_url.rstrip("/")
+        self._lease_seconds = lease_seconds
+        self._subscriptions: Dict[str, WebSubSubscriptionEntity] = {}
+        for subscription in subscriptions or []:
+            if hasattr(subscription, "news_source"):
+                self._subscriptions[subscription.news_source] = subscription
+        self._changed_news_sources: Set[str] = set()
+
+    def get_subscription(self, news_source: str) -> Optional[WebSubSubscriptionEntity]:
+        """Returns the subscription of a news source, if any
+        """
+
+        return self._subscriptions.get(news_source)
+
+    def get_subscription_by_id(self, subscription_id: Optional[str]) -> Optional[WebSubSubscriptionEntity]:
+        """Returns the subscription with the given id, if any
+        """
+
+        if not subscription_id:
+            return None
+        for subscription in self._subscriptions.values():
+            if subscription_id == getattr(subscription, "subscription_id", None):
+                return subscription
+        return None
+
+    def get_callback_url(self, subscription: WebSubSubscriptionEntity) -> str:
+        """Returns the url where the hub sends verifications and content
+        """
+
+        return "{}/{}".format(self._callback_url, subscription.subscription_id)
+
+    def is_pushed(self, news_source: str) -> bool:
+        """Checks if the hub is pushing the new content of a news source, so
+         the source doesn't need to be polled
+
+        :param news_source: the url of the news source
+        :type news_source: str
+
+        :returns: True if the subscription is active, and its lease not expired
+        :rtype: bool
+        """
+
+        subscription = self._subscriptions.get(news_source)
+        if subscription is None or WebSubSubscriber.STATE_ACTIVE != getattr(subscription, "state", None):
+            return False
+        lease_until = getattr(subscription, "lease_until", None)
+        return lease_until is not None and arrow.get(lease_until) > arrow.utcnow()
+
+    def needs_subscription(self, news_source: str) -> bool:
+        """Checks if a subscription has to be requested, or renewed, for a
+         news source
+
+        :param news_source: the url of the news source
+        :type news_source: str
+
+        :returns: True if it's time to contact the hub
+        :rtype: bool
+        """
+
+        subscription = self._subscriptions.get(news_source)
+        if subscription is None:
+            return True
+        next_attempt = getattr(subscription, "next_attempt", None)
+        return next_attempt is None or arrow.get(next_attempt) <= arrow.utcnow()
+
+    def request_subscription(
+        self,
+        news_source: str,
+        hub: str,
+        topic: str
+    ) -> Tuple[WebSubSubscriptionEntity, Dict[str, str]]:
+        """Prepares the request to subscribe, or renew the subscription, to
+         the topic of a news source
+
+        Id and secret of an existing subscription are kept, so content sent
+         by the hub before the renewal is still accepted
+
+        :param news_source: the url of the news source
+        :type news_source: str
+
+        :param hub: the url of the hub
+        :type hub: str
+
+        :param topic: the url of the topic
+        :type topic: str
+
+        :returns: the subscription, and the form to POST to the hub
+        :rtype: WebSubSubscriptionEntity, dict
+        """
+
+        subscription = self._subscriptions.get(news_source)
+        if subscription is None or getattr(subscription, "topic", None) != topic:
+            subscription = subscription or WebSubSubscriptionEntity()
+            subscription.news_source = news_source
+            subscription.subscription_id = secrets.token_urlsafe(16)
+            subscription.secret = secrets.token_hex(20)
+            subscription.state = WebSubSubscriber.STATE_PENDING
+            self._subscriptions[news_source] = subscription
+        elif WebSubSubscriber.STATE_ACTIVE != getattr(subscription, "state", None):
+            subscription.state = WebSubSubscriber.STATE_PENDING
+        subscription.hub = hub
+        subscription.topic = topic
+        # Updated again once the hub verifies the request
+        subscription.next_attempt = arrow.utcnow().shift(hours=WebSubSubscriber.RETRY_HOURS).datetime
+        self._changed_news_sources.add(news_source)
+
+        return subscription, {
+            "hub.callback": self.get_callback_url(subscription),
+            "hub.mode": "subscribe",
+            "hub.topic": topic,
+            "hub.lease_seconds": str(self._lease_seconds),
+            "hub.secret": subscription.secret
+        }
+
+    def mark_unsupported(self, news_source: str) -> WebSubSubscriptionEntity:
+        """Records that a news source doesn't advertise a hub, so it's not
+         checked again for a while
+
+        :returns: the updated subscription
+        :rtype: WebSubSubscriptionEntity
+        """
+
+        subscription = self._subscriptions.get(news_source)
+        if subscription is None:
+            subscription = WebSubSubscriptionEntity()
+            subscription.news_source = news_source
+            self._subscriptions[news_source] = subscription
+        subscription.state = WebSubSubscriber.STATE_UNSUPPORTED
+        subscription.next_attempt = arrow.utcnow().shift(days=WebSubSubscriber.UNSUPPORTED_RETRY_DAYS).datetime
+        self._changed_news_sources.add(news_source)
+        return subscription
+
+    def verify_intent(
+        self,
+        subscription_id: Optional[str],
+        mode: Optional[str],
+        topic: Optional[str],
+        lease_seconds: Optional[str] = None
+    ) -> Optional[WebSubSubscriptionEntity]:
+        """Checks a verification request of a hub, updating the subscription
+
+        :param subscription_id: the id of the subscription, from the
+         callback url
+        :type subscription_id: str
+
+        :param mode: hub.mode, subscribe or denied. unsubscribe is never
+         requested, so it's refused
+        :type mode: str
+
+        :param topic: hub.topic, has to be the topic of the subscription
+        :type topic: str
+
+        :param lease_seconds: hub.lease_seconds, the lease granted by the hub
+        :type lease_seconds: str
+
+        :returns: the subscription, if the request is valid, otherwise None
+        :rtype: WebSubSubscriptionEntity
+        """
+
+        subscription = self.get_subscription_by_id(subscription_id)
+        if subscription is None or topic != getattr(subscription, "topic", None):
+            self._logger.warning("Verification request for unknown subscription {} on topic {}".format(subscription_id, topic))
+            return None
+
+        now = arrow.utcnow()
+        if "subscribe" == mode:
+            try:
+                lease = int(lease_seconds) if lease_seconds else self._lease_seconds
+            except ValueError:
+                lease = self._lease_seconds
+            subscription.state = WebSubSubscriber.STATE_ACTIVE
+            subscription.lease_until = now.shift(seconds=lease).datetime
+            subscription.next_attempt = max(
+                now.shift(seconds=lease, hours=-WebSubSubscriber.RENEW_BEFORE_HOURS),
+                now.shift(hours=1)
+            ).datetime
+        elif "denied" == mode:
+            self._logger.warning("Hub {} denied the subscription to {}".format(subscription.hub, topic))
+            subscription.state = WebSubSubscriber.STATE_DENIED
+            subscription.next_attempt = now.shift(days=WebSubSubscriber.UNSUPPORTED_RETRY_DAYS).datetime
+        else:
+            self._logger.warning("Unexpected {} request for subscription {}".format(mode, subscription_id))
+            return None
+
+        self._changed_news_sources.add(subscription.news_source)
+        return subscription
+
+    def get_changed_subscriptions(self) -> List[WebSubSubscriptionEntity]:
+        """Returns the subscriptions changed since the creation of the object,
+         to save in the storage
+        """
+
+        return [self._subscriptions[news_source] for news_source in sorted(self._changed_news_sources)]
+
+    @staticmethod
+    def discover_hub(
+        feed_url: str,
+        feed_content: str,
+        links: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Finds the hub and the topic advertised by a feed, first in the
+         Link headers of the response, then in the feed itself
+
+        :param feed_url: the url the feed was read from, the topic if the
+         feed doesn't declare its own
+        :type feed_url: str
+
+        :param feed_content: the content of the feed
+        :type feed_content: str
+
+        :param links: the Link headers of the response, parsed as
+         requests.Response.links does
+        :type links: dict
+
+        :returns: hub and topic, or None if the feed doesn't advertise a hub
+        :rtype: tuple
+        """
+
+        hub = None
+        topic = None
+        if links:
+            hub = links.get("hub", {}).get("url")
+            topic = links.get("self", {}).get("url")
+
+        if hub is None:
+            try:
+                root = ElementTree.fromstring(feed_content)
+            except ElementTree.ParseError:
+                return None
+            # <atom:link> in RSS feeds, <link> in Atom ones
+            for element in root.iter():
+                if not isinstance(element.tag, str) or "link" != element.tag.rsplit("}", 1)[-1]:
+                    continue
+                rel = element.get("rel")
+                if "hub" == rel and hub is None:
+                    hub = element.get("href")
+                elif "self" == rel and topic is None:
+                    topic = element.get("href")
+
+        if not hub:
+            return None
+        return hub, topic or feed_url
+
+    @staticmethod
+    def is_signature_valid(secret: str, content: bytes, signature: Optional[str]) -> bool:
+        """Checks the X-Hub-Signature of a content pushed by the hub
+
+        :param secret: the secret of the subscription
+        :type secret: str
+
+        :param content: the raw body of the request
+        :type content: bytes
+
+        :param signature: the X-Hub-Signature header, as method=signature
+        :type signature: str
+
+        :returns: True if the content was signed with the secret
+        :rtype: bool
+        """
+
+        if not signature or "=" not in signature:
+            return False
+        method, signature_value = signature.split("=", 1)
+        method = method.strip().lower()
+        if method not in WebSubSubscriber.SIGNATURE_METHODS:
+            return False
+        expected = hmac.new(secret.encode("utf-8"), content, method).hexdigest()
+        return hmac.compare_digest(expected, signature_value.strip().lower())
@@ -0,0 +1,228 @@
+"""Ledger of the YouTube Data API quota used by the gears
+
+Every call to the YouTube Data API costs some quota units, depending on the
+ method, and the units available each day are limited. The quota resets at
+ midnight Pacific time, so the ledger keeps the units used in the current
+ Pacific day, together with the number of calls.
+
+With a daily budget, the ledger tells when the units used are close to the
+ budget, so the caller can switch to cheaper ways to read the channels, and
+ when the budget is used up.
+
+The usage of the day is kept in a YouTubeQuotaEntity, so the caller can read
+ it from a storage and save it back. As for HostCircuitBreaker, the class
+ doesn't use the storage directly. Different runs can charge units at the
+ same time, so, instead of saving the usage read at the start, the caller
+ reads the usage again and adds the units charged by the run, with
+ merge_charges.
+
+Methods are thread safe, so the same ledger can be shared by parallel
+ workers.
+"""
+
+import threading
+from typing import ClassVar, Dict, Optional
+from urllib.parse import urlparse
+
+import arrow
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.youtubequotaentity import YouTubeQuotaEntity
+
+
+class YouTubeQuotaExceededError(Exception):
+    """Raised when a YouTube API call is about to be sent, but the daily
+     budget of units is used up
+    """
+
+
+class YouTubeQuotaLedger:
+    """Count the YouTube Data API units used each day
+    """
+
+    # Cost in units of the methods of the API, by resource in the url
+    #  https://developers.google.com/youtube/v3/determine_quota_cost
+    UNIT_COSTS: ClassVar[Dict[str, int]] = {
+        "channels": 1,  # channels.list
+        "playlistItems": 1,  # playlistItems.list
+        "videos": 1,  # videos.list
+        "search": 100  # search.list
+    }
+    DEFAULT_UNIT_COST: ClassVar[int] = 1
+    QUOTA_TIMEZONE: ClassVar[str] = "US/Pacific"  # The quota resets at midnight of this timezone
+    NEAR_BUDGET_RATIO: ClassVar[float] = 0.9  # Used units, compared to the budget, considered near the budget
+
+    def __init__(
+        self,
+        daily_budget: int = 0,
+        quota_entity: Optional[YouTubeQuotaEntity] = None
+    ) -> None:
+        """Constructor
+
+        :param daily_budget: units that can be used each day. 0 means no
+         budget, units are only counted
+        :type daily_budget: int
+
+        :param quota_entity: the usage of the current day, as saved by a
+         previous run. Ignored if it refers to another day
+        :type quota_entity: YouTubeQuotaEntity
+        """
+
+        self._logger = LoggingService.get_logger(__name__)
+        self._daily_budget = max(0, daily_budget or 0)
+        self._lock = threading.Lock()
+        day = YouTubeQuotaLedger.get_quota_day()
+        # A copy, so the charges of this run are kept apart from the usage
+        #  read from the storage, and can be added to a newer one
+        self._quota_entity = YouTubeQuotaEntity()
+        self._quota_entity.day = day
+        self._quota_entity.units = 0
+        self._quota_entity.calls = 0
+        if quota_entity is not None and day == getattr(quota_entity, "day", None):
+            self._quota_entity.units = getattr(quota_entity, "units", None) or 0
+            self._quota_entity.calls = getattr(quota_entity, "calls", None) or 0
+        self._charged_units = 0
+        self._charged_calls = 0
+
+    @staticmethod
+    def get_quota_day() -> str:
+        """Returns the current quota day, as YYYY-MM-DD
+        """
+        return arrow.utcnow().to(YouTubeQuotaLedger.QUOTA_TIMEZONE).format("YYYY-MM-DD")
+
+    @staticmethod
+    def get_unit_cost(url: str) -> int:
+        """Returns the units charged for a call to the API
+
+        :param url: the url of the call, like
+         https://youtube.googleapis.com/youtube/v3/channels?part=...
+        :type url: str
+
+        :returns: the cost of the call, in quota units
+        :rtype: int
+        """
+
+        resource = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+        return YouTubeQuotaLedger.UNIT_COSTS.get(resource, YouTubeQuotaLedger.DEFAULT_UNIT_COST)
+
+    def charge(self, url: str) -> int:
+        """Records a call to the API
+
+        :param url: the url of the call
+        :type url: str
+
+        :returns: the units charged for the call
+        :rtype: int
+        """
+
+        units = YouTubeQuotaLedger.get_unit_cost(url)
+        with self._lock:
+            used_units = getattr(self._quota_entity, "units", None) or 0
+            self._quota_entity.units = used_units + units
+            self._quota_entity.calls = (getattr(self._quota_entity, "calls", None) or 0) + 1
+            self._charged_units += units
+            self._charged_calls += 1
+        near_units = self._daily_budget * YouTubeQuotaLedger.NEAR_BUDGET_RATIO
+        if self._daily_budget > 0 and used_units < near_units <= used_units + units:
+            self._logger.warning("YouTube API quota almost used up: {} units of {}".format(
+                used_units + units,
+                self._daily_budget
+            ))
+        return units
+
+    def get_daily_budget(self) -> int:
+        """Returns the units that can be used each day, 0 if there is no budget
+        """
+
+        return self._daily_budget
+
+    def get_used_units(self) -> int:
+        """Returns the units used in the current day
+        """
+
+        with self._lock:
+            return getattr(self._quota_entity, "units", None) or 0
+
+    def get_calls(self) -> int:
+        """Returns the API calls sent in the current day
+        """
+
+        with self._lock:
+            return getattr(self._quota_entity, "calls", None) or 0
+
+    def get_day(self) -> str:
+        """Returns the quota day the usage refers to, as YYYY-MM-DD
+        """
+
+        return self._quota_entity.day
+
+    def get_charged_calls(self) -> int:
+        """Returns the calls charged since the creation of the object
+        """
+
+        with self._lock:
+            return self._charged_calls
+
+    def get_charged_units(self) -> int:
+        """Returns the units charged since the creation of the object
+        """
+
+        with self._lock:
+            return self._charged_units
+
+    def is_budget_near(self) -> bool:
+        """Checks if the units used are close to the daily budget, always
+         False without a budget
+        """
+
+        if 0 == self._daily_budget:
+            return False
+        return self.get_used_units() >= self._daily_budget * YouTubeQuotaLedger.NEAR_BUDGET_RATIO
+
+    def is_budget_used_up(self) -> bool:
+        """Checks if all the units of the daily budget are used, always
+         False without a budget
+        """
+
+        if 0 == self._daily_budget:
+            return False
+        return self.get_used_units() >= self._daily_budget
+
+    def merge_charges(self, quota_entity: Optional[YouTubeQuotaEntity]) -> YouTubeQuotaEntity:
+        """Adds the units and calls charged since the creation of the object
+         to the usage of the day, as read again from the storage, so the
+         charges of other runs saved in the meantime are not overwritten
+
+        :param quota_entity: the usage of the day of the ledger, as read now
+         from the storage. None if it hasn't been saved yet
+        :type quota_entity: YouTubeQuotaEntity
+
+        :returns: the usage of the day to save, the given entity if any
+        :rtype: YouTubeQuotaEntity
+        """
+
+        with self._lock:
+            day = self._quota_entity.day
+            if quota_entity is None or day != getattr(quota_entity, "day", None):
+                quota_entity = YouTubeQuotaEntity()
+                quota_entity.day = day
+            quota_entity.units = (getattr(quota_entity, "units", None) or 0) + self._charged_units
+            quota_entity.calls = (getattr(quota_entity, "calls", None) or 0) + self._charged_calls
+            return quota_entity
+
+    def get_summary(self) -> str:
+        """Returns a description of the usage of the day
+        """
+
+        summary = "YouTube API quota used on {}: {} units in {} calls".format(
+            self._quota_entity.day,
+            self.get_used_units(),
+            self.get_calls()
+        )
+        if self._daily_budget > 0:
+            summary += ", daily budget is {} units".format(self._daily_budget)
+            if self.is_budget_used_up():
+                summary += ", used up"
+            elif self.is_budget_near():
+                summary += ", almost used up: channels are checked with their feeds"
+        return summary
@@ -40,7 +40,19 @@ class GlobalBag:
     # NewsReporter
     CHECKFORNEWS_INTENT: ClassVar[str] = "checkfornews"
     CHECKFORNEWS_PARAM_SILENT: ClassVar[str] = "silent"
+    CHECKFORNEWS_PARAM_FORCE: ClassVar[str] = "force"
+    CHECKFORNEWS_PARAM_DEADLINE: ClassVar[str] = "deadline"
     NEWSSOURCES_INTENT: ClassVar[str] = "newsources"
+    WEBSUB_VERIFY_INTENT: ClassVar[str] = "websub_verify"
+    WEBSUB_NOTIFICATION_INTENT: ClassVar[str] = "websub_notification"
+    WEBSUB_PARAM_SUBSCRIPTION_ID: ClassVar[str] = "subscription_id"
+    WEBSUB_PARAM_MODE: ClassVar[str] = "hub.mode"
+    WEBSUB_PARAM_TOPIC: ClassVar[str] = "hub.topic"
+    WEBSUB_PARAM_CHALLENGE: ClassVar[str] = "hub.challenge"
+    WEBSUB_PARAM_LEASE_SECONDS: ClassVar[str] = "hub.lease_seconds"
+    WEBSUB_PARAM_CONTENT: ClassVar[str] = "content"
+    WEBSUB_PARAM_SIGNATURE: ClassVar[str] = "signature"
+    YOUTUBE_QUOTA_INTENT: ClassVar[str] = "youtube_quota"
 
     # Interaction surfaces
     SURFACE_TELEGRAM_BOT_LURCH: ClassVar[str] = "Telegram-Lurch"  # Lurch telegram bot
@@ -48,6 +60,10 @@ class GlobalBag:
 
     # Database file name
     DATABASE_FILE: ClassVar[str] = "yellowbot_db.json"
+    # SQLite database file name
+    SQLITE_DATABASE_FILE: ClassVar[str] = "yellowbot_db.sqlite3"
+    # Append-only log database file name
+    LOG_DATABASE_FILE: ClassVar[str] = "yellowbot_db.log"
     # File with the configurations
     CONFIG_FILE: ClassVar[str] = "yellowbot_config.json"
     # File with the tasks for the scheduler service
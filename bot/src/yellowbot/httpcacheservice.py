@@ -0,0 +1,366 @@
+"""
+Shared on-disk cache for the HTTP responses read by the gears
+
+Responses are cached following their Cache-Control and Expires headers,
+ unless the caller sets its own time to live. Each response is a file in
+ the cache folder, named after the hash of its url. Files are written to a
+ temporary name and then renamed, so different processes, like gunicorn
+ workers, can share the same folder without locks: a reader always finds
+ a complete response, or nothing.
+
+The folder is bounded in size: once it grows over the limit, the least
+ recently used responses are removed. Every hit touches the file, so its
+ modification time tells when the response was last used.
+
+Requirements
+- requests
+"""
+
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, ClassVar, Dict, Optional, Tuple, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from yellowbot.httpsessionservice import HttpSessionService
+from yellowbot.loggingservice import LoggingService
+
+
+class CachedResponse:
+    """A response read from the cache
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        headers: Dict[str, str],
+        content: bytes,
+        encoding: Optional[str]
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def to_response(self) -> requests.Response:
+        """Returns the cached response as a requests one, so callers don't
+         know if it came from the network or from the cache
+        """
+
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        return response
+
+
+class HttpCacheService:
+    """Cache the responses of HTTP GET calls on disk
+    """
+
+    DEFAULT_MAX_SIZE: ClassVar[int] = 50 * 1024 * 1024  # Bytes
+    CACHE_FILE_SUFFIX: ClassVar[str] = ".cache"
+
+    def __init__(
+        self,
+        cache_folder: str,
+        max_size: int = DEFAULT_MAX_SIZE
+    ) -> None:
+        """Initialize this class.
+
+        :param cache_folder: folder where the responses are stored, created
+         if it doesn't exist. Can be shared between processes
+        :type cache_folder: str
+
+        :param max_size: max size of all the cached responses, in bytes
+        :type max_size: int
+        """
+
+        self._logger = LoggingService.get_logger(__name__)
+        self._cache_folder = cache_folder
+        self._max_size = max_size
+        os.makedirs(self._cache_folder, exist_ok=True)
+
+    def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+        ttl: Optional[int] = None,
+        http_session: Optional[HttpSessionService] = None
+    ) -> requests.Response:
+        """Read an url, from the cache if there is a fresh response for it,
+         otherwise from the network, caching the response
+
+        :raises: requests.RequestException if the request fails
+
+        :param url: the url to read
+        :type url: str
+
+        :param headers: additional request headers
+        :type headers: dict
+
+        :param timeout: timeout of the request, as for requests.get
+        :type timeout: float or tuple
+
+        :param ttl: seconds the response is cached, regardless of its
+         headers. If None, the headers of the response are used
+        :type ttl: int
+
+        :param http_session: pooled sessions used to send the request. If
+         None, a new connection is opened
+        :type http_session: HttpSessionService
+
+        :returns: the response, whatever its status code
+        :rtype: requests.Response
+        """
+
+        cached_response = self.lookup(url)
+        if cached_response is not None:
+            return cached_response.to_response()
+        http_client = http_session if http_session is not None else requests
+        response = http_client.get(url, headers=headers, timeout=timeout)
+        self.store_response(url, response, ttl)
+        return response
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Search a fresh response for the url in the cache
+
+        :param url: the url to search
+        :type url: str
+
+        :returns: the cached response, None if there isn't one or it is
+         expired
+        :rtype: CachedResponse
+        """
+
+        cache_file = self._get_cache_file(url)
+        try:
+            with open(cache_file, "rb") as f:
+                metadata = json.loads(f.readline().decode("utf-8"))
+                if metadata["expires"] <= time.time():
+                    return None
+                content = f.read()
+            # Used now, so it is the last one to be evicted
+            os.utime(cache_file)
+        except FileNotFoundError:
+            return None
+        except BaseException as err:
+            self._logger.exception("Error while reading the cached response for {}: {}".format(url, err))
+            return None
+
+        self._logger.debug("Found cached response for {}".format(url))
+        return CachedResponse(url, metadata["status"], metadata["headers"], content, metadata["encoding"])
+
+    def store_response(self, url: str, response: requests.Response, ttl: Optional[int] = None) -> bool:
+        """Store a requests response in the cache, if it can be cached
+
+        :param url: the requested url, that could be different from the url
+         of the response, in case of redirects
+        :type url: str
+
+        :param response: the response to store
+        :type response: requests.Response
+
+        :param ttl: seconds the response is cached, regardless of its
+         headers. If None, the headers of the response are used
+        :type ttl: int
+
+        :returns: True if the response was stored
+        :rtype: bool
+        """
+
+        return self.store(
+            url,
+            response.status_code,
+            dict(response.headers),
+            response.content,
+            response.encoding,
+            ttl
+        )
+
+    def store(
+        self,
+        url: str,
+        status: int,
+        headers: Dict[str, str],
+        content: bytes,
+        encoding: Optional[str] = None,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """Store a response in the cache, if it can be cached
+
+        Only successful responses are cached
+
+        :param url: the url of the response
+        :type url: str
+
+        :param status: the HTTP status code of the response
+        :type status: int
+
+        :param headers: the headers of the response
+        :type headers: dict
+
+        :param content: the body of the response
+        :type content: bytes
+
+        :param encoding: the encoding of the body
+        :type encoding: str
+
+        :param ttl: seconds the response is cached, regardless of its
+         headers. If None, the headers of the response are used
+        :type ttl: int
+
+        :returns: True if the response was stored
+        :rtype: bool
+        """
+
+        if 200 != status:
+            return False
+        lifetime = self._get_freshness_lifetime(headers, ttl)
+        if lifetime <= 0:
+            return False
+
+        metadata = {
+            "expires": time.time() + lifetime,
+            "status": status,
+            "headers": headers,
+            "encoding": encoding
+        }
+        try:
+            # Written to a temporary file and then renamed, so other
+            #  processes never read a partial response
+            fd, temp_file = tempfile.mkstemp(dir=self._cache_folder)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(json.dumps(metadata).encode("utf-8"))
+                    f.write(b"\n")
+                    f.write(content)
+                os.replace(temp_file, self._get_cache_file(url))
+            except BaseException:
+                os.remove(temp_file)
+                raise
+        except BaseException as err:
+            self._logger.exception("Error while caching the response for {}: {}".format(url, err))
+            return False
+
+        self._logger.debug("Cached response for {} for {} seconds".format(url, lifetime))
+        self._evict()
+        return True
+
+    def clear(self) -> None:
+        """Removes all the cached responses
+        """
+
+        for entry in os.scandir(self._cache_folder):
+            if entry.name.endswith(HttpCacheService.CACHE_FILE_SUFFIX):
+                self._remove_file(entry.path)
+
+    def _get_cache_file(self, url: str) -> str:
+        """Full path of the file with the cached response of an url
+        """
+
+        return os.path.join(
+            self._cache_folder,
+            hashlib.sha256(url.encode("utf-8")).hexdigest() + HttpCacheService.CACHE_FILE_SUFFIX
+        )
+
+    def _get_freshness_lifetime(self, headers: Dict[str, Any], ttl: Optional[int]) -> float:
+        """Seconds a response can be cached, 0 or less if it cannot be cached
+
+        no-store is always honored, then the given ttl is used, if any.
+         Otherwise, max-age of Cache-Control, and finally Expires
+        """
+
+        headers = CaseInsensitiveDict(headers)
+        directives = self._parse_cache_control(headers.get("Cache-Control", ""))
+        if "no-store" in directives or "*" == headers.get("Vary", "").strip():
+            return 0
+        if ttl is not None:
+            return ttl
+        if "no-cache" in directives:
+            return 0
+
+        age = self._to_seconds(headers.get("Age")) or 0
+        max_age = self._to_seconds(directives.get("max-age"))
+        if max_age is not None:
+            return max_age - age
+        if "Expires" in headers:
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+                date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+            except (TypeError, ValueError):
+                # Invalid dates, like "0", mean already expired
+                return 0
+            return expires - date - age
+        return 0
+
+    def _parse_cache_control(self, cache_control: str) -> Dict[str, Optional[str]]:
+        """Returns the directives of a Cache-Control header, with their
+         value, if any
+        """
+
+        directives: Dict[str, Optional[str]] = {}
+        for directive in cache_control.split(","):
+            match = re.match(r'\s*([\w-]+)\s*(?:=\s*"?([^"]*)"?)?\s*$', directive)
+            if match:
+                directives[match.group(1).lower()] = match.group(2)
+        return directives
+
+    def _to_seconds(self, value: Optional[str]) -> Optional[int]:
+        """Converts a header value to seconds, None if not valid
+        """
+
+        if value is None:
+            return None
+        try:
+            return max(0, int(value))
+        except ValueError:
+            return None
+
+    def _evict(self) -> None:
+        """Removes the least recently used responses, until the cache is
+         smaller than its max size
+        """
+
+        cache_files = []
+        total_size = 0
+        for entry in os.scandir(self._cache_folder):
+            if not entry.name.endswith(HttpCacheService.CACHE_FILE_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Already removed by another process
+                continue
+            cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        if total_size <= self._max_size:
+            return
+        cache_files.sort()
+        for _, size, path in cache_files:
+            self._remove_file(path)
+            total_size -= size
+            if total_size <= self._max_size:
+                break
+
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,241 @@
+"""
+Pooled HTTP sessions, shared by all the gears
+
+Each host gets its own requests.Session, created on first use, with a pool
+ of keep-alive connections, so calls to the same host, like the many ones
+ to the YouTube APIs during a news check, reuse the same TCP and TLS
+ connection instead of opening a new one every time.
+
+Failed requests can be retried, with an exponential backoff, by urllib3.
+ Only idempotent methods, like GET, are retried: a POST is never sent twice.
+
+Http2SessionService has the same interface, and returns requests responses
+ and errors too, but sends the requests with httpx over HTTP/2, so all the
+ calls to the same host are multiplexed on a single connection.
+
+Requirements
+- requests
+- httpx[http2], only for Http2SessionService
+"""
+
+import threading
+from typing import Any, ClassVar, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from yellowbot.loggingservice import LoggingService
+
+
+class HttpSessionService:
+    """Registry of pooled, per-host, HTTP sessions
+    """
+
+    RETRY_STATUS_CODES: ClassVar[Tuple[int, ...]] = (502, 503, 504)  # Temporary errors worth a retry
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 0,
+        backoff_factor: float = 0.5
+    ) -> None:
+        """Initialize this class.
+
+        :param pool_size: max number of keep-alive connections for each
+         host. Should be at least the number of threads using the sessions
+         at the same time
+        :type pool_size: int
+
+        :param max_retries: how many times a failed idempotent request is
+         retried. 0, the default, never retries
+        :type max_retries: int
+
+        :param backoff_factor: the seconds waited before the retries are
+         backoff_factor * (2 ^ (retry number - 1))
+        :type backoff_factor: float
+        """
+
+        self._logger = LoggingService.get_logger(__name__)
+        self._pool_size = max(1, pool_size or 1)
+        self._max_retries = max(0, max_retries or 0)
+        self._backoff_factor = backoff_factor
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Sends a GET request, as requests.get does, using the session
+         of the host of the url
+
+        :raises: requests.RequestException if the request fails
+        """
+
+        return self._request("GET", url, **kwargs)
+
+    def post(self, url: str, data: Any = None, **kwargs: Any) -> requests.Response:
+        """Sends a POST request, as requests.post does, using the session
+         of the host of the url
+
+        :raises: requests.RequestException if the request fails
+        """
+
+        return self._request("POST", url, data=data, **kwargs)
+
+    def _get_session(self, url: str) -> requests.Session:
+        """Returns the session for the host of the url, created the first
+         time the host is used
+
+        :param url: the url to read
+        :type url: str
+
+        :returns: the session of the host
+        :rtype: requests.Session
+        """
+
+        parsed_url = urlparse(url)
+        host = "{}://{}".format(parsed_url.scheme, parsed_url.netloc).lower()
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                self._logger.debug("Creating HTTP session for {}".format(host))
+                session = self._create_session()
+                self._sessions[host] = session
+            return session
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Sends a request with the session of the host of the url
+        """
+
+        return self._get_session(url).request(method, url, **kwargs)
+
+    def close(self) -> None:
+        """Closes all the sessions, and their connections
+        """
+
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _create_session(self) -> requests.Session:
+        """Creates a session with a pool of keep-alive connections and the
+         retry policy
+        """
+
+        retry = Retry(
+            total=self._max_retries,
+            backoff_factor=self._backoff_factor,
+            status_forcelist=HttpSessionService.RETRY_STATUS_CODES,
+            # The last response is returned, instead of raising an error,
+            #  so callers can check its status code as usual
+            raise_on_status=False
+        )
+        # One pool per session, as each session is used for a single host
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+class Http2SessionService(HttpSessionService):
+    """Sends the requests over HTTP/2, with a single httpx client
+
+    httpx keeps one connection for each host, and multiplexes on it all the
+     concurrent requests to the host. Only connection errors are retried,
+     as httpx doesn't retry on status codes
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 0,
+        backoff_factor: float = 0.5
+    ) -> None:
+        """Initialize this class.
+
+        :raises: ImportError if httpx, or its HTTP/2 support, is not installed
+
+        :param pool_size: max number of connections kept open, for all the
+         hosts together
+        :type pool_size: int
+
+        :param max_retries: how many times a request failed to connect is
+         retried. 0, the default, never retries
+        :type max_retries: int
+
+        :param backoff_factor: not used, httpx has its own backoff
+        :type backoff_factor: float
+        """
+
+        # Checked now, so a missing dependency is found at startup, and not
+        #  at the first request
+        import h2  # noqa: F401
+        import httpx
+
+        super().__init__(pool_size, max_retries, backoff_factor)
+        self._client: Optional[httpx.Client] = None
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Sends a request with httpx, converting the response and the
+         errors to the requests ones, so callers work with both the backends
+
+        :raises: requests.Timeout if the request times out,
+         requests.ConnectionError for the other transport errors
+        """
+
+        import httpx
+
+        timeout = kwargs.pop("timeout", None)
+        if isinstance(timeout, tuple):
+            # requests uses connect and read timeouts
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            response = self._get_client().request(method, url, timeout=timeout, **kwargs)
+        except httpx.TimeoutException as err:
+            raise requests.Timeout(str(err)) from err
+        except httpx.TransportError as err:
+            raise requests.ConnectionError(str(err)) from err
+        return self._to_requests_response(response)
+
+    def _get_client(self) -> Any:
+        """Returns the httpx client, created the first time
+        """
+
+        import httpx
+
+        with self._sessions_lock:
+            if self._client is None:
+                self._logger.debug("Creating HTTP/2 client")
+                transport = httpx.HTTPTransport(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=self._pool_size, max_keepalive_connections=self._pool_size),
+                    retries=self._max_retries
+                )
+                # requests follows redirects by default, httpx doesn't
+                self._client = httpx.Client(transport=transport, follow_redirects=True)
+            return self._client
+
+    def _to_requests_response(self, response: Any) -> requests.Response:
+        """Converts a httpx response to a requests one
+        """
+
+        requests_response = requests.Response()
+        requests_response.url = str(response.url)
+        requests_response.status_code = response.status_code
+        requests_response.reason = response.reason_phrase
+        requests_response.headers = CaseInsensitiveDict(response.headers)
+        requests_response._content = response.content
+        requests_response.encoding = response.encoding
+        return requests_response
+
+    def close(self) -> None:
+        """Closes the httpx client, and its connections
+        """
+
+        with self._sessions_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -95,6 +95,8 @@ class NluEngine:
         if any(message.lower().startswith(header) for header in headers):
             intent = GlobalBag.CHECKFORNEWS_INTENT
             params[GlobalBag.CHECKFORNEWS_PARAM_SILENT] = False
+            # Manual checks ignore the adaptive polling intervals
+            params[GlobalBag.CHECKFORNEWS_PARAM_FORCE] = True
             return intent, params
 
         # Checks for CheckForNews intent
@@ -103,6 +105,12 @@ class NluEngine:
             intent = GlobalBag.NEWSSOURCES_INTENT
             return intent, params
 
+        # Checks for YouTube quota intent
+        headers = ["youtubequota", "/youtubequota"]
+        if any(message.lower().startswith(header) for header in headers):
+            intent = GlobalBag.YOUTUBE_QUOTA_INTENT
+            return intent, params
+
         # Checks for other intents
 
         return intent, params
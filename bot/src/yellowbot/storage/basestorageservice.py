@@ -1,10 +1,16 @@
 """Generic class for implementing a storage service
 
 Subclasses have to implement the most important method, using the storage
-they prefer
+they prefer. Batch methods (*_multi) have a generic implementation that calls
+the single entity methods, subclasses can override them with native batch
+operations
+
+Streaming methods (iter_*) return the entities one at a time, for kinds too
+big to keep in memory. Their generic implementation reads all the entities
+at once, subclasses can override them reading a page at a time
 """
 
-from typing import List, Optional, Type, TypeVar, Union
+from typing import Iterable, Iterator, List, Optional, Type, TypeVar, Union
 import datetime
 
 from yellowbot.storage.baseentity import BaseEntity
@@ -112,3 +118,152 @@ class BaseStorageService():
         """
 
         raise ValueError("delete_by_id method wasn't implemented for {}".format(self.__class__.__name__))
+
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids
+
+        The generic implementation calls get_by_id for each id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :returns: the entities, in the same order of the ids. None for the
+         ids without an entity
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return [self.get_by_id(entity_class, entity_id) for entity_id in entity_ids]
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Save several entities in the datastore, or update existing ones
+
+        The generic implementation calls put for each entity
+
+        :param entities: the entities to save
+        :type entities: list of classes that inherit BaseEntity
+
+        :returns: the ids of the entities, in the same order
+        :rtype: list[int]
+
+        :raises: ValueError if one entity is not a subclass of BaseEntity
+        """
+
+        return [self.put(entity) for entity in entities]
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Delete several entities given their ids
+
+        The generic implementation calls delete_by_id for each id
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        for entity_id in entity_ids:
+            self.delete_by_id(entity_class, entity_id)
+
+    def iter_all(
+        self,
+        entity_class: Type[BE],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, all the entities for the given type
+
+        The generic implementation calls get_all
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. The other properties are missing in the returned entities
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self._limit_and_project(self.get_all(entity_class), limit, projection)
+
+    def iter_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, the entities with a property matching a
+         value
+
+        The generic implementation calls get_by_property
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: what's the comparison applied between the property and the value
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. The other properties are missing in the returned entities
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self._limit_and_project(
+            self.get_by_property(entity_class, property_name, operator, property_value),
+            limit,
+            projection
+        )
+
+    def _limit_and_project(
+        self,
+        entities: Iterable[BE],
+        limit: Optional[int],
+        projection: Optional[List[str]]
+    ) -> Iterator[BE]:
+        """Returns the first limit entities, with only the properties in
+         projection
+        """
+
+        for count, entity in enumerate(entities):
+            if limit is not None and count >= limit:
+                return
+            if projection is None:
+                yield entity
+                continue
+            projected_entity = entity.__class__()
+            projected_entity.from_dict({
+                name: value for name, value in entity.to_dict().items() if name in projection
+            })
+            projected_entity.id = entity.id
+            yield projected_entity
@@ -0,0 +1,409 @@
+"""Read-through cache in front of any storage service
+
+Reads are served from memory when possible, and sent to the wrapped storage
+ otherwise, caching what it returns:
+- entities, keyed by kind and id, in a LRU bounded by number of entities
+- results of get_all and get_by_property, keyed by kind and by property,
+   operator and value of the query, in a smaller LRU
+
+Writes go to the wrapped storage first, then the cache is updated: saved
+ entities are cached with their new values, deleted ones are removed, and
+ all the query results of the kind are dropped, as they could have changed.
+
+Each kind has a time to live, so data changed by other processes, like other
+ gunicorn workers or other App Engine instances, is read again after a while.
+ A time to live of 0 disables the cache for the kind.
+
+Streaming reads (iter_*) go straight to the wrapped storage, and are not
+ cached, as they are meant for kinds too big to keep in memory.
+
+Cached values are copies of the entities data, and every read returns new
+ entity objects, as the wrapped storage does, so callers can change the
+ returned entities without changing the cache.
+"""
+
+from collections import OrderedDict
+import copy
+import datetime
+import threading
+import time
+from typing import Any, Callable, ClassVar, Dict, Hashable, Iterator, List, Optional, Tuple, Type, Union
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.basestorageservice import BaseStorageService, BE
+from yellowbot.storage.baseentity import BaseEntity
+
+# Id and data of a cached entity
+CachedEntity = Tuple[int, Dict[str, Any]]
+
+
+class CachingStorageService(BaseStorageService):
+    """Cache the entities, and the queries results, of another storage service
+    """
+
+    DEFAULT_MAX_ENTITIES: ClassVar[int] = 1000
+    DEFAULT_MAX_QUERIES: ClassVar[int] = 100
+    DEFAULT_TTL: ClassVar[int] = 60  # Seconds
+
+    def __init__(
+        self,
+        storage_service: BaseStorageService,
+        max_entities: int = DEFAULT_MAX_ENTITIES,
+        max_queries: int = DEFAULT_MAX_QUERIES,
+        default_ttl: int = DEFAULT_TTL,
+        kind_ttls: Optional[Dict[str, int]] = None
+    ) -> None:
+        """Initialize the class
+
+        :param storage_service: the storage to cache
+        :type storage_service: BaseStorageService
+
+        :param max_entities: max number of cached entities, of all the kinds
+        :type max_entities: int
+
+        :param max_queries: max number of cached query results, of all the
+         kinds
+        :type max_queries: int
+
+        :param default_ttl: seconds the entities, and the query results, are
+         cached, for the kinds without their own time to live
+        :type default_ttl: int
+
+        :param kind_ttls: seconds the entities, and the query results, are
+         cached, by entity name. 0 disables the cache for the kind
+        :type kind_ttls: dict
+        """
+
+        super().__init__()
+        self._logger = LoggingService.get_logger(__name__)
+        self._storage = storage_service
+        self._max_entities = max(1, max_entities or 1)
+        self._max_queries = max(1, max_queries or 1)
+        self._default_ttl = max(0, default_ttl or 0)
+        self._kind_ttls = kind_ttls or {}
+        self._lock = threading.Lock()
+        # Values are the expiration time, as time.monotonic(), and the data
+        self._entities: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._queries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, List[CachedEntity]]]" = OrderedDict()
+        # Incremented at every write of a kind, so what was read from the
+        #  storage while another thread was writing is not cached
+        self._generations: Dict[str, int] = {}
+
+    def put(self, entity: BE) -> int:
+        """Saves an entity in the wrapped storage, and caches its new values
+        """
+
+        try:
+            entity_id = self._storage.put(entity)
+        except BaseException:
+            # The write could have been done anyway
+            self._forget_entities([entity])
+            raise
+        kind = entity.get_entity_name()
+        with self._lock:
+            self._invalidate_queries(kind)
+            self._cache_entity(kind, entity_id, entity.to_dict())
+        return entity_id
+
+    def get_all(self, entity_class: Type[BE]) -> List[BE]:
+        """Returns all the entities of the given type, from the cache if
+         the same query was done recently
+        """
+
+        kind = entity_class.get_entity_name()
+        return self._query(entity_class, (kind,), lambda: self._storage.get_all(entity_class))
+
+    def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
+        """Finds a specific entity given its id, from the cache if possible
+        """
+
+        kind = entity_class.get_entity_name()
+        with self._lock:
+            data = self._get_cached_entity(kind, entity_id)
+            generation = self._generations.get(kind, 0)
+        if data is not None:
+            return self._create_entity(entity_class, entity_id, data)
+
+        entity = self._storage.get_by_id(entity_class, entity_id)
+        if entity is not None:
+            with self._lock:
+                if generation == self._generations.get(kind, 0):
+                    self._cache_entity(kind, entity_id, entity.to_dict())
+        return entity
+
+    def get_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date]
+    ) -> List[BE]:
+        """Finds the entities matching a property, from the cache if the
+         same query was done recently
+        """
+
+        kind = entity_class.get_entity_name()
+        query_key = (kind, property_name, operator, property_value)
+        try:
+            hash(query_key)
+        except TypeError:
+            # Values like lists cannot be a key of the cache
+            return self._storage.get_by_property(entity_class, property_name, operator, property_value)
+        return self._query(
+            entity_class,
+            query_key,
+            lambda: self._storage.get_by_property(entity_class, property_name, operator, property_value)
+        )
+
+    def delete_all(self, entity_class: Type[BE]) -> None:
+        """Deletes all the entities of the given type, and their cached data
+        """
+
+        self._storage.delete_all(entity_class)
+        kind = entity_class.get_entity_name()
+        with self._lock:
+            self._invalidate_queries(kind)
+            for key in [key for key in self._entities if kind == key[0]]:
+                del self._entities[key]
+
+    def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
+        """Deletes a specific entity given its id, and its cached data
+        """
+
+        self._storage.delete_by_id(entity_class, entity_id)
+        kind = entity_class.get_entity_name()
+        with self._lock:
+            self._invalidate_queries(kind)
+            self._entities.pop((kind, entity_id), None)
+
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids, reading from the wrapped
+         storage, with a single call, only the ones not cached
+        """
+
+        kind = entity_class.get_entity_name()
+        entities_by_id: Dict[int, Optional[BE]] = {}
+        with self._lock:
+            for entity_id in entity_ids:
+                data = self._get_cached_entity(kind, entity_id)
+                if data is not None:
+                    entities_by_id[entity_id] = self._create_entity(entity_class, entity_id, data)
+            generation = self._generations.get(kind, 0)
+
+        # Only the missing entities are read from the storage
+        missing_ids = [entity_id for entity_id in entity_ids if entity_id not in entities_by_id]
+        if missing_ids:
+            missing_entities = self._storage.get_multi(entity_class, missing_ids)
+            with self._lock:
+                cache_entities = generation == self._generations.get(kind, 0)
+                for entity_id, entity in zip(missing_ids, missing_entities):
+                    entities_by_id[entity_id] = entity
+                    if entity is not None and cache_entities:
+                        self._cache_entity(kind, entity_id, entity.to_dict())
+
+        return [entities_by_id.get(entity_id) for entity_id in entity_ids]
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Saves several entities in the wrapped storage, with a single call,
+         and caches their new values
+        """
+
+        try:
+            entity_ids = self._storage.put_multi(entities)
+        except BaseException:
+            # Some of the entities could have been saved anyway
+            self._forget_entities(entities)
+            raise
+        with self._lock:
+            for entity, entity_id in zip(entities, entity_ids):
+                kind = entity.get_entity_name()
+                self._invalidate_queries(kind)
+                self._cache_entity(kind, entity_id, entity.to_dict())
+        return entity_ids
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Deletes several entities given their ids, with a single call, and
+         their cached data
+        """
+
+        self._storage.delete_multi(entity_class, entity_ids)
+        kind = entity_class.get_entity_name()
+        with self._lock:
+            self._invalidate_queries(kind)
+            for entity_id in entity_ids:
+                self._entities.pop((kind, entity_id), None)
+
+    def iter_all(
+        self,
+        entity_class: Type[BE],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, all the entities for the given type, read
+         from the wrapped storage without caching them
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for all
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self._storage.iter_all(entity_class, limit, projection)
+
+    def iter_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, the entities with a property matching a
+         value, read from the wrapped storage without caching them
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: what's the comparison applied between the property and the value
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for all
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self._storage.iter_by_property(entity_class, property_name, operator, property_value, limit, projection)
+
+    def clear(self) -> None:
+        """Removes all the cached entities and query results
+        """
+
+        with self._lock:
+            self._entities.clear()
+            self._queries.clear()
+
+    def _query(
+        self,
+        entity_class: Type[BE],
+        query_key: Tuple[Hashable, ...],
+        read_function: Callable[[], List[BE]]
+    ) -> List[BE]:
+        """Returns the result of a query from the cache or, if not cached,
+         from the storage, caching it
+
+        :param query_key: the key of the query, with the kind as first value
+        :type query_key: tuple
+
+        :param read_function: the function that reads the entities from the
+         storage
+        :type read_function: callable
+        """
+
+        kind = entity_class.get_entity_name()
+        with self._lock:
+            cached_query = self._queries.get(query_key)
+            if cached_query is not None:
+                if cached_query[0] > time.monotonic():
+                    self._queries.move_to_end(query_key)
+                    self._logger.debug("Found cached result for query {}".format(query_key))
+                    return [self._create_entity(entity_class, entity_id, data) for entity_id, data in cached_query[1]]
+                del self._queries[query_key]
+            generation = self._generations.get(kind, 0)
+
+        entities = read_function()
+        ttl = self._get_ttl(kind)
+        if ttl > 0:
+            cached_entities = [(entity.id, entity.to_dict()) for entity in entities]
+            with self._lock:
+                if generation != self._generations.get(kind, 0):
+                    # The kind was changed in the meantime
+                    return entities
+                self._queries[query_key] = (time.monotonic() + ttl, copy.deepcopy(cached_entities))
+                self._queries.move_to_end(query_key)
+                while len(self._queries) > self._max_queries:
+                    self._queries.popitem(last=False)
+                for entity_id, data in cached_entities:
+                    self._cache_entity(kind, entity_id, data)
+        return entities
+
+    def _get_ttl(self, kind: str) -> int:
+        return self._kind_ttls.get(kind, self._default_ttl)
+
+    def _get_cached_entity(self, kind: str, entity_id: int) -> Optional[Dict[str, Any]]:
+        """Returns the data of a cached entity, None if not cached or
+         expired. To call with the lock held
+        """
+
+        cached_entity = self._entities.get((kind, entity_id))
+        if cached_entity is None:
+            return None
+        if cached_entity[0] <= time.monotonic():
+            del self._entities[(kind, entity_id)]
+            return None
+        self._entities.move_to_end((kind, entity_id))
+        return cached_entity[1]
+
+    def _cache_entity(self, kind: str, entity_id: int, data: Dict[str, Any]) -> None:
+        """Caches the data of an entity, removing the least recently used
+         ones if the cache is full. To call with the lock held
+        """
+
+        ttl = self._get_ttl(kind)
+        if ttl <= 0 or BaseEntity.NO_ID == entity_id:
+            return
+        self._entities[(kind, entity_id)] = (time.monotonic() + ttl, copy.deepcopy(data))
+        self._entities.move_to_end((kind, entity_id))
+        while len(self._entities) > self._max_entities:
+            self._entities.popitem(last=False)
+
+    def _forget_entities(self, entities: List[BE]) -> None:
+        """Removes the given entities, and the query results of their kinds,
+         from the cache
+        """
+
+        with self._lock:
+            for entity in entities:
+                kind = entity.get_entity_name()
+                self._invalidate_queries(kind)
+                self._entities.pop((kind, entity.id), None)
+
+    def _invalidate_queries(self, kind: str) -> None:
+        """Removes all the cached query results of a kind. To call with the
+         lock held
+        """
+
+        self._generations[kind] = self._generations.get(kind, 0) + 1
+        for query_key in [query_key for query_key in self._queries if kind == query_key[0]]:
+            del self._queries[query_key]
+
+    def _create_entity(self, entity_class: Type[BE], entity_id: int, data: Dict[str, Any]) -> BE:
+        """Creates a new entity with the cached data
+        """
+
+        new_entity = entity_class()
+        new_entity.from_dict(copy.deepcopy(data))
+        new_entity.id = entity_id
+        return new_entity
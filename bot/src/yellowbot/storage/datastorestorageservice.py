@@ -18,7 +18,7 @@ Codice da vedere
 - https://github.com/cirbuk/datastore-orm/blob/master/datastore_orm/model.py
 """
 
-from typing import List, Optional, Type, TypeVar, Union
+from typing import ClassVar, Iterator, List, Optional, Type, TypeVar, Union
 import datetime
 
 from google.cloud import datastore
@@ -35,8 +35,18 @@ class DatastoreStorageService(BaseStorageService):
     Datastore requires a Kind for the entities to save into the db.
      https://cloud.google.com/datastore/docs/concepts/entities#kinds_and_identifiers
      The name of the specific entity class is used
+
+    Batch operations are split in chunks, to respect Datastore limits
+     https://cloud.google.com/datastore/docs/concepts/limits
+
+    Queries are read a page at a time, using cursors, so memory doesn't grow
+     with the number of entities of a kind
     """
 
+    MAX_KEYS_PER_LOOKUP: ClassVar[int] = 1000  # Max keys in a lookup (get_multi)
+    MAX_ENTITIES_PER_COMMIT: ClassVar[int] = 500  # Max entities in a commit (put_multi, delete_multi)
+    PAGE_SIZE: ClassVar[int] = 500  # Entities read at a time by iter_* methods
+
     def __init__(self) -> None:
         """Initialize the class
         """
@@ -93,19 +103,7 @@ class DatastoreStorageService(BaseStorageService):
         if not issubclass(entity_class, BaseEntity):
             raise ValueError("Param entity_class has to be subclass of BaseEntity")
 
-        kind = entity_class.get_entity_name()
-        self._logger.info("Getting all the entities of kind {}".format(kind))
-        query = self._client.query(kind=kind)
-        datastore_results = list(query.fetch())
-
-        entity_list = []
-        for datastore_item in datastore_results:
-            # Create a new entity to store the data
-            new_entity = self._create_entity_from_datastore(entity_class,  datastore_item)
-            entity_list.append(new_entity)
-            # print("ID {} - {}".format(entity.id, entity))
-
-        return entity_list
+        return list(self.iter_all(entity_class))
 
     def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
         """Finds a specific entity given its id
@@ -174,24 +172,7 @@ class DatastoreStorageService(BaseStorageService):
         if not issubclass(entity_class, BaseEntity):
             raise ValueError("Param entity_class has to be subclass of BaseEntity")
 
-        kind = entity_class.get_entity_name()
-        self._logger.debug("Searching for entity of kind {} with {} {} ##{}## (## excluded)".format(
-            kind,
-            property_name,
-            operator,
-            property_value
-        ))
-        query = self._client.query(kind=kind)
-        query.add_filter(property_name, operator, property_value)
-        datastore_results = list(query.fetch())
-
-        entity_list = []
-        for datastore_item in datastore_results:
-            # Create a new entity to store the data
-            new_entity = self._create_entity_from_datastore(entity_class,  datastore_item)
-            entity_list.append(new_entity)
-
-        return entity_list
+        return list(self.iter_by_property(entity_class, property_name, operator, property_value))
 
     def delete_all(self, entity_class: Type[BE]) -> None:
         """Delete all the entiries of the given type
@@ -211,8 +192,15 @@ class DatastoreStorageService(BaseStorageService):
         query = self._client.query(kind=kind)
         query.keys_only()
 
-        datastore_keys = list(query.fetch())
-        self._client.delete_multi(datastore_keys)
+        # Keys are deleted while they are read, so only a chunk is in memory
+        keys_chunk = []
+        for datastore_item in query.fetch():
+            keys_chunk.append(datastore_item.key)
+            if len(keys_chunk) >= DatastoreStorageService.MAX_ENTITIES_PER_COMMIT:
+                self._client.delete_multi(keys_chunk)
+                keys_chunk = []
+        if keys_chunk:
+            self._client.delete_multi(keys_chunk)
 
     def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
         """Delete a specific entity given its id
@@ -238,6 +226,233 @@ class DatastoreStorageService(BaseStorageService):
         key = self._client.key(kind, entity_id)
         self._client.delete(key)
 
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids, with one lookup for each
+         chunk of MAX_KEYS_PER_LOOKUP ids
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :returns: the entities, in the same order of the ids. None for the
+         ids without an entity
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+
+        kind = entity_class.get_entity_name()
+        self._logger.debug("Get {} entities of kind {}".format(len(entity_ids), kind))
+
+        # Datastore doesn't return the entities in the same order of the keys
+        entities_by_id = {}
+        for ids_chunk in self._chunks(entity_ids, DatastoreStorageService.MAX_KEYS_PER_LOOKUP):
+            keys = [self._client.key(kind, entity_id) for entity_id in ids_chunk]
+            for datastore_item in self._client.get_multi(keys):
+                entities_by_id[datastore_item.key.id] = self._create_entity_from_datastore(entity_class, datastore_item)
+
+        return [entities_by_id.get(entity_id) for entity_id in entity_ids]
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Save several entities in the datastore, or update existing ones,
+         with one commit for each chunk of MAX_ENTITIES_PER_COMMIT entities
+
+        :param entities: the entities to save
+        :type entities: list of classes that inherit BaseEntity
+
+        :returns: the ids of the entities, in the same order
+        :rtype: list[int]
+
+        :raises: ValueError if one entity is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given classes are subclasses of BaseEntity
+        for entity in entities:
+            if not isinstance(entity, BaseEntity):
+                raise ValueError("Param entities has to contain only subclasses of BaseEntity")
+
+        self._logger.debug("Saving {} entities".format(len(entities)))
+        for entities_chunk in self._chunks(entities, DatastoreStorageService.MAX_ENTITIES_PER_COMMIT):
+            datastore_entities = []
+            for entity in entities_chunk:
+                kind = entity.get_entity_name()
+                if BaseEntity.NO_ID == entity.id:
+                    key = self._client.key(kind)
+                else:
+                    key = self._client.key(kind, entity.id)
+                datastore_entity = datastore.Entity(key=key)
+                # Updates all the fields of the entity
+                datastore_entity.update(entity.to_dict())
+                datastore_entities.append(datastore_entity)
+
+            # put_multi assigns the ids to the new keys
+            self._client.put_multi(datastore_entities)
+            for entity, datastore_entity in zip(entities_chunk, datastore_entities):
+                if BaseEntity.NO_ID == entity.id:
+                    entity.id = datastore_entity.key.id
+
+        return [entity.id for entity in entities]
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Delete several entities given their ids, with one commit for each
+         chunk of MAX_ENTITIES_PER_COMMIT ids
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+
+        kind = entity_class.get_entity_name()
+        self._logger.debug("Delete {} entities of kind {}".format(len(entity_ids), kind))
+        for ids_chunk in self._chunks(entity_ids, DatastoreStorageService.MAX_ENTITIES_PER_COMMIT):
+            self._client.delete_multi([self._client.key(kind, entity_id) for entity_id in ids_chunk])
+
+    def iter_all(
+        self,
+        entity_class: Type[BE],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, all the entities for the given type,
+         reading a page of PAGE_SIZE entities at a time
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. Datastore requires an index for projection queries, and
+         returns only entities with those properties
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+
+        kind = entity_class.get_entity_name()
+        self._logger.info("Getting all the entities of kind {}".format(kind))
+        query = self._client.query(kind=kind)
+        return self._fetch_pages(entity_class, query, limit, projection)
+
+    def iter_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, the entities with a property matching a
+         value, reading a page of PAGE_SIZE entities at a time
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: what's the comparison applied between the property and the value
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. Datastore requires an index for projection queries, and
+         returns only entities with those properties
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+
+        kind = entity_class.get_entity_name()
+        self._logger.debug("Searching for entity of kind {} with {} {} ##{}## (## excluded)".format(
+            kind,
+            property_name,
+            operator,
+            property_value
+        ))
+        query = self._client.query(kind=kind)
+        query.add_filter(property_name, operator, property_value)
+        return self._fetch_pages(entity_class, query, limit, projection)
+
+    def _fetch_pages(
+        self,
+        entity_class: Type[BE],
+        query: datastore.query.Query,
+        limit: Optional[int],
+        projection: Optional[List[str]]
+    ) -> Iterator[BE]:
+        """Runs the query a page at a time, starting each page from the
+         cursor of the previous one, and converts the entities only when
+         they are requested
+         https://cloud.google.com/datastore/docs/concepts/queries#cursors_limits_and_offsets
+        """
+
+        if projection:
+            query.projection = projection
+        cursor = None
+        returned = 0
+        while limit is None or returned < limit:
+            page_size = DatastoreStorageService.PAGE_SIZE
+            if limit is not None:
+                page_size = min(page_size, limit - returned)
+            query_iter = query.fetch(start_cursor=cursor, limit=page_size)
+
+            # Iterating the items, and not only the first of query_iter.pages,
+            #  because Datastore can return a page in more than one batch.
+            #  The iterator requests the next batches itself
+            page_count = 0
+            for datastore_item in query_iter:
+                page_count += 1
+                yield self._create_entity_from_datastore(entity_class, datastore_item)
+            returned += page_count
+
+            # Set once the iterator is exhausted
+            cursor = query_iter.next_page_token
+            if page_count < page_size or cursor is None:
+                break
+
+    def _chunks(self, items: list, chunk_size: int) -> Iterator[list]:
+        """Split a list in consecutive chunks of, at most, chunk_size items
+        """
+
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
+
     def _create_entity_from_datastore(
         self,
         entity_class: Type[BE],
@@ -0,0 +1,65 @@
+"""
+https://docs.python.org/3/tutorial/datastructures.html#dictionaries
+"""
+
+import datetime
+from typing import Any, Dict, Optional
+from yellowbot.storage.baseentity import BaseEntity
+
+
+class HostCircuitEntity(BaseEntity):
+    """Entity to store the state of the circuit breaker of a host
+    """
+
+    host: str
+    failures: int  # Consecutive failed requests to the host
+    open_until: Optional[datetime.datetime]  # When set, requests to the host are paused until this date
+    last_error: Optional[str]
+
+    def __init__(self) -> None:
+        """
+        """
+        super().__init__()  # Sets fundamental entity properties
+        self.host: None
+        self.failures: None
+        self.open_until: None
+        self.last_error: None
+
+    @staticmethod
+    def get_entity_name() -> str:
+        """Returns the name of the class only, not the package + name
+        """
+        return "HostCircuitEntity"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Transform the entity values in a dict
+
+        :returns: a dict containing the entity values
+        :rtype: dict
+        """
+
+        fields: Dict[str, Any] = {}
+        if hasattr(self, "host"):
+            fields["host"] = self.host
+        if hasattr(self, "failures"):
+            fields["failures"] = self.failures
+        if hasattr(self, "open_until"):
+            fields["open_until"] = self.open_until
+        if hasattr(self, "last_error"):
+            fields["last_error"] = self.last_error
+        return fields
+
+    def from_dict(self, source_dict: dict) -> 'HostCircuitEntity':
+        """Fill the entity data from a dict
+        """
+        if "host" in source_dict:
+            self.host = source_dict["host"]
+        if "failures" in source_dict:
+            self.failures = source_dict["failures"]
+        if "open_until" in source_dict:
+            # While saving to Datastore, a DatetimeWithNanoseconds is returned instead of a Datetime.date
+            self.open_until = source_dict["open_until"]
+        if "last_error" in source_dict:
+            self.last_error = source_dict["last_error"]
+
+        return self
@@ -0,0 +1,526 @@
+"""Implements storage service using an append-only log file
+
+Every change is a record appended at the end of the log, so the cost of a
+ write doesn't depend on the size of the database:
+- P: an entity saved, with all its values
+- D: an entity deleted
+- K: all the entities of a kind deleted
+
+Each record is a line, with the record type, the kind and the id separated
+ by tabs, and then the values of the entity as JSON, converted by
+ StorageValues. An in-memory index keeps, for each entity, the position of
+ its last record in the log. At startup, the index is rebuilt reading the
+ log line by line, and only the beginning of each line is parsed. A partial
+ record at the end of the log, left by a crash, is removed.
+
+Records of entities changed or deleted later are garbage. Once the garbage
+ is more than a given part of the log, a background thread compacts it: the
+ live records are copied to a new log, together with the records written in
+ the meantime, and the new log replaces the old one.
+
+The log can be used by only one process at a time, and it's locked, where
+ the platform allows it, to avoid corruptions. All the threads of the
+ process can share the same object.
+"""
+
+import json
+import os
+import sys
+import threading
+from typing import ClassVar, Dict, Iterator, List, Optional, Tuple, Type, Union
+import datetime
+
+if "win32" != sys.platform:
+    # Not available on Windows
+    import fcntl
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.basestorageservice import BaseStorageService, BE
+from yellowbot.storage.baseentity import BaseEntity
+from yellowbot.storage.storagevalues import StorageValues
+
+# Offset and length of a record in the log
+RecordPosition = Tuple[int, int]
+
+
+class LogStorageService(BaseStorageService):
+    """This class implements the storage interface using an append-only log
+
+    The name of the specific entity class is used as kind, as for Datastore
+    """
+
+    RECORD_PUT: ClassVar[bytes] = b"P"
+    RECORD_DELETE: ClassVar[bytes] = b"D"
+    RECORD_DELETE_KIND: ClassVar[bytes] = b"K"
+    DEFAULT_MIN_GARBAGE_SIZE: ClassVar[int] = 1024 * 1024  # Bytes
+    DEFAULT_GARBAGE_RATIO: ClassVar[float] = 0.5
+
+    def __init__(
+        self,
+        log_file: str,
+        min_garbage_size: int = DEFAULT_MIN_GARBAGE_SIZE,
+        garbage_ratio: float = DEFAULT_GARBAGE_RATIO,
+        fsync: bool = False
+    ) -> None:
+        """Initialize the class
+
+        :raises: BlockingIOError if the log is used by another process
+
+        :param log_file: file of the log, created if it doesn't exist
+        :type log_file: str
+
+        :param min_garbage_size: the log is never compacted if the garbage
+         is smaller than this size, in bytes
+        :type min_garbage_size: int
+
+        :param garbage_ratio: the log is compacted once the garbage is more
+         than this part of the log
+        :type garbage_ratio: float
+
+        :param fsync: if True, every write is flushed to the disk before
+         returning. If False, the default, a crash of the system, but not of
+         the process, could lose the latest writes
+        :type fsync: bool
+        """
+
+        super().__init__()
+        self._logger = LoggingService.get_logger(__name__)
+        self._log_file = log_file
+        self._min_garbage_size = min_garbage_size
+        self._garbage_ratio = garbage_ratio
+        self._fsync = fsync
+        # Protects the file, the index and the sizes
+        self._lock = threading.Lock()
+        # Only one compaction at a time
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        self._index: Dict[str, Dict[int, RecordPosition]] = {}
+        self._next_id = 1
+        self._log_size = 0
+        self._garbage_size = 0
+        self._open_log()
+        self._load_index()
+
+    def put(self, entity: BE) -> int:
+        """Save an entity in the log, or update an existing one
+
+        :param entity: the entity to save
+        :type entity: a class that inherits BaseEntity
+
+        :returns: the id of the entity
+        :rtype: int
+
+        :raises: ValueError if entity is not a subclass of BaseEntity
+        """
+
+        return self.put_multi([entity])[0]
+
+    def get_all(self, entity_class: Type[BE]) -> List[BE]:
+        """Returns all the entities for the given type
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.info("Getting all the entities of kind {}".format(kind))
+        return [
+            self._create_entity(entity_class, entity_id, values, types)
+            for entity_id, values, types in self._read_kind(kind)
+        ]
+
+    def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
+        """Finds a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self.get_multi(entity_class, [entity_id])[0]
+
+    def get_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date]
+    ) -> List[BE]:
+        """Finds the entities with a property matching a value, reading all
+         the entities of the kind
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: the comparison applied between the property and
+         the value, one of StorageValues.OPERATORS
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :returns: a list of entity matching the search criteria
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity,
+         or the operator is not valid
+        """
+
+        kind = self._get_kind(entity_class)
+        if operator.upper() not in StorageValues.OPERATORS:
+            raise ValueError("Operator {} is not supported".format(operator))
+        self._logger.debug("Searching for entity of kind {} with {} {} ##{}## (## excluded)".format(
+            kind,
+            property_name,
+            operator,
+            property_value
+        ))
+        return [
+            self._create_entity(entity_class, entity_id, values, types)
+            for entity_id, values, types in self._read_kind(kind)
+            if StorageValues.matches(values.get(property_name), operator, property_value)
+        ]
+
+    def delete_all(self, entity_class: Type[BE]) -> None:
+        """Delete all the entiries of the given type
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.info("Deleting all the entities of kind {}".format(kind))
+        with self._lock:
+            if self._index.get(kind):
+                self._append([self._create_record(LogStorageService.RECORD_DELETE_KIND, kind)])
+
+    def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
+        """Delete a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        self.delete_multi(entity_class, [entity_id])
+
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :returns: the entities, in the same order of the ids. None for the
+         ids without an entity
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.debug("Get {} entities of kind {}".format(len(entity_ids), kind))
+        entities: List[Optional[BE]] = []
+        with self._lock:
+            kind_index = self._index.get(kind, {})
+            for entity_id in entity_ids:
+                position = kind_index.get(entity_id)
+                if position is None:
+                    entities.append(None)
+                    continue
+                values, types = self._read_values(position)
+                entities.append(self._create_entity(entity_class, entity_id, values, types))
+        return entities
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Save several entities in the log, or update existing ones, with a
+         single write
+
+        :param entities: the entities to save
+        :type entities: list of classes that inherit BaseEntity
+
+        :returns: the ids of the entities, in the same order
+        :rtype: list[int]
+
+        :raises: ValueError if one entity is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given classes are subclasses of BaseEntity
+        for entity in entities:
+            if not isinstance(entity, BaseEntity):
+                raise ValueError("Param entities has to contain only subclasses of BaseEntity")
+
+        self._logger.debug("Saving {} entities".format(len(entities)))
+        entity_ids = []
+        with self._lock:
+            records = []
+            for entity in entities:
+                entity_id = entity.id
+                if BaseEntity.NO_ID == entity_id:
+                    entity_id = self._next_id
+                    self._next_id += 1
+                values, types = StorageValues.encode_fields(entity.to_dict())
+                records.append(self._create_record(
+                    LogStorageService.RECORD_PUT,
+                    entity.get_entity_name(),
+                    entity_id,
+                    json.dumps({"values": values, "types": types})
+                ))
+                entity_ids.append(entity_id)
+            self._append(records)
+
+        # Only once the records are written
+        for entity, entity_id in zip(entities, entity_ids):
+            entity.id = entity_id
+        return entity_ids
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Delete several entities given their ids, with a single write
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.debug("Delete {} entities of kind {}".format(len(entity_ids), kind))
+        with self._lock:
+            kind_index = self._index.get(kind, {})
+            self._append([
+                self._create_record(LogStorageService.RECORD_DELETE, kind, entity_id)
+                for entity_id in set(entity_ids) if entity_id in kind_index
+            ])
+
+    def compact(self) -> None:
+        """Rewrites the log with only the live records
+
+        The live records are copied without blocking the other threads,
+         then the records written in the meantime are copied too, and the
+         new log replaces the old one
+        """
+
+        with self._compaction_lock:
+            with self._lock:
+                positions = sorted(
+                    (position, kind, entity_id)
+                    for kind, kind_index in self._index.items()
+                    for entity_id, position in kind_index.items()
+                )
+                copied_size = self._log_size
+                garbage_size = self._garbage_size
+            self._logger.info("Compacting the log {}, {} bytes of garbage".format(self._log_file, garbage_size))
+
+            # Records are never changed once written, so they can be read
+            #  while other threads append new ones. The file is replaced
+            #  only by a compaction, so it's still open
+            fd = self._file.fileno()
+            compact_file = self._log_file + ".compact"
+            new_index: Dict[str, Dict[int, RecordPosition]] = {}
+            new_offset = 0
+            try:
+                with open(compact_file, "wb") as compact_log:
+                    for (offset, length), kind, entity_id in positions:
+                        compact_log.write(os.pread(fd, length, offset))
+                        new_index.setdefault(kind, {})[entity_id] = (new_offset, length)
+                        new_offset += length
+
+                    with self._lock:
+                        # Records written during the copy
+                        tail = os.pread(fd, self._log_size - copied_size, copied_size)
+                        compact_log.write(tail)
+                        new_garbage_size = 0
+                        for line in tail.splitlines(keepends=True):
+                            new_garbage_size += self._apply_record(new_index, line, new_offset)
+                            new_offset += len(line)
+                        compact_log.flush()
+                        os.fsync(compact_log.fileno())
+
+                        os.replace(compact_file, self._log_file)
+                        self._file.close()
+                        self._open_log()
+                        self._index = new_index
+                        self._log_size = new_offset
+                        self._garbage_size = new_garbage_size
+            except BaseException:
+                if os.path.exists(compact_file):
+                    os.remove(compact_file)
+                raise
+            self._logger.info("Log {} compacted, {} bytes".format(self._log_file, new_offset))
+
+    def close(self) -> None:
+        """Waits for the compaction in progress, if any, and closes the log
+        """
+
+        compaction_thread = self._compaction_thread
+        if compaction_thread is not None:
+            compaction_thread.join()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _open_log(self) -> None:
+        """Opens the log, for appending and reading, and locks it
+        """
+
+        # Writes always go to the end of the file
+        self._file = open(self._log_file, "a+b")
+        if "win32" != sys.platform:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise
+
+    def _load_index(self) -> None:
+        """Builds the index reading all the records of the log
+        """
+
+        offset = 0
+        with open(self._log_file, "rb") as log:
+            for line in log:
+                if not line.endswith(b"\n"):
+                    # Partial record, written while crashing
+                    break
+                self._garbage_size += self._apply_record(self._index, line, offset)
+                offset += len(line)
+
+        file_size = os.path.getsize(self._log_file)
+        if offset < file_size:
+            self._logger.warning("Removing {} bytes of partial record at the end of the log {}".format(
+                file_size - offset,
+                self._log_file
+            ))
+            self._file.truncate(offset)
+        self._log_size = offset
+        self._logger.info("Read the log {}, {} bytes, {} bytes of garbage".format(
+            self._log_file,
+            self._log_size,
+            self._garbage_size
+        ))
+
+    def _apply_record(self, index: Dict[str, Dict[int, RecordPosition]], line: bytes, offset: int) -> int:
+        """Updates the index with a record
+
+        :returns: the size of the records that became garbage
+        :rtype: int
+        """
+
+        record_type, kind_bytes, entity_id_bytes, _ = line.split(b"\t", 3)
+        kind = kind_bytes.decode("utf-8")
+        if LogStorageService.RECORD_PUT == record_type:
+            entity_id = int(entity_id_bytes)
+            self._next_id = max(self._next_id, entity_id + 1)
+            previous_position = index.setdefault(kind, {}).get(entity_id)
+            index[kind][entity_id] = (offset, len(line))
+            return previous_position[1] if previous_position is not None else 0
+        if LogStorageService.RECORD_DELETE == record_type:
+            previous_position = index.get(kind, {}).pop(int(entity_id_bytes), None)
+            return len(line) + (previous_position[1] if previous_position is not None else 0)
+        if LogStorageService.RECORD_DELETE_KIND == record_type:
+            kind_index = index.pop(kind, {})
+            return len(line) + sum(length for _, length in kind_index.values())
+        raise ValueError("Unknown record type {!r} in the log".format(record_type))
+
+    def _create_record(self, record_type: bytes, kind: str, entity_id: Optional[int] = None, data: str = "") -> bytes:
+        # JSON escapes tabs and newlines, so they can separate fields and records
+        return b"\t".join([
+            record_type,
+            kind.encode("utf-8"),
+            str(entity_id if entity_id is not None else "").encode("utf-8"),
+            data.encode("utf-8")
+        ]) + b"\n"
+
+    def _append(self, records: List[bytes]) -> None:
+        """Writes the records at the end of the log, and updates the index.
+         To call with the lock held
+        """
+
+        if not records:
+            return
+        self._file.write(b"".join(records))
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        for record in records:
+            self._garbage_size += self._apply_record(self._index, record, self._log_size)
+            self._log_size += len(record)
+        self._start_compaction_if_needed()
+
+    def _start_compaction_if_needed(self) -> None:
+        """Starts the compaction in background, if there is enough garbage.
+         To call with the lock held
+        """
+
+        if self._garbage_size < self._min_garbage_size or self._garbage_size < self._log_size * self._garbage_ratio:
+            return
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(
+            target=self._compact_in_background,
+            name="LogStorageCompaction",
+            daemon=True
+        )
+        self._compaction_thread.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except BaseException as err:
+            self._logger.exception("Error while compacting the log {}: {}".format(self._log_file, err))
+
+    def _read_values(self, position: RecordPosition) -> Tuple[dict, dict]:
+        """Reads the values of an entity from its record. To call with the
+         lock held
+        """
+
+        offset, length = position
+        line = os.pread(self._file.fileno(), length, offset)
+        document = json.loads(line.split(b"\t", 3)[3])
+        return document["values"], document["types"]
+
+    def _read_kind(self, kind: str) -> Iterator[Tuple[int, dict, dict]]:
+        """Returns id and values of all the entities of a kind, sorted by id
+        """
+
+        with self._lock:
+            kind_index = self._index.get(kind, {})
+            records = [(entity_id, self._read_values(kind_index[entity_id])) for entity_id in sorted(kind_index)]
+        for entity_id, (values, types) in records:
+            yield entity_id, values, types
+
+    def _get_kind(self, entity_class: Type[BE]) -> str:
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+        return entity_class.get_entity_name()
+
+    def _create_entity(self, entity_class: Type[BE], entity_id: int, values: dict, types: dict) -> BE:
+        """Instantiate a new entity using data from the log
+        """
+
+        new_entity = entity_class()
+        new_entity.from_dict(StorageValues.decode_fields(values, types))
+        new_entity.id = entity_id
+        return new_entity
@@ -0,0 +1,419 @@
+"""Implements storage service keeping all the entities in memory
+
+Entities are kept per kind, as JSON values converted by StorageValues, so
+ the same semantics of the other storage services apply, and each read
+ returns a new entity that can be changed without touching the storage.
+
+Queries on a property build, the first time, an index for the property of
+ that kind, then kept updated by the writes:
+- a hash index, from each value to the ids, for =, !=, IN and NOT_IN
+- a sorted index, for <, <=, > and >=. Only numbers and strings, dates
+ included, are sorted, as values of different types never match
+
+Data is lost when the process ends, so it fits tests, local runs, and the
+ data that can be rebuilt. All the threads of the process can share the
+ same object.
+"""
+
+import bisect
+import copy
+import datetime
+import threading
+from typing import Any, Collection, Dict, Hashable, List, Optional, Set, Tuple, Type, Union, cast
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.basestorageservice import BaseStorageService, BE
+from yellowbot.storage.baseentity import BaseEntity
+from yellowbot.storage.storagevalues import StorageValues
+
+# JSON values and types of the fields of an entity
+StoredEntity = Tuple[Dict[str, Any], Dict[str, str]]
+# Index key of the kind and the property
+IndexKey = Tuple[str, str]
+
+
+class MemoryStorageService(BaseStorageService):
+    """This class implements the storage interface in memory
+
+    The name of the specific entity class is used as kind, as for Datastore
+    """
+
+    SORT_GROUP_NUMBER = "number"
+    SORT_GROUP_STRING = "string"
+
+    def __init__(self) -> None:
+        """Initialize the class
+        """
+
+        super().__init__()
+        self._logger = LoggingService.get_logger(__name__)
+        self._lock = threading.Lock()
+        self._entities: Dict[str, Dict[int, StoredEntity]] = {}
+        self._next_id = 1
+        # Value to ids, for each indexed property
+        self._hash_indexes: Dict[IndexKey, Dict[Hashable, Set[int]]] = {}
+        # (value, id) sorted, for each sort group of each indexed property
+        self._sorted_indexes: Dict[IndexKey, Dict[str, List[Tuple[Any, int]]]] = {}
+
+    def put(self, entity: BE) -> int:
+        """Save an entity in memory, or update an existing one
+
+        :param entity: the entity to save
+        :type entity: a class that inherits BaseEntity
+
+        :returns: the id of the entity
+        :rtype: int
+
+        :raises: ValueError if entity is not a subclass of BaseEntity
+        """
+
+        return self.put_multi([entity])[0]
+
+    def get_all(self, entity_class: Type[BE]) -> List[BE]:
+        """Returns all the entities for the given type
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        with self._lock:
+            kind_entities = self._entities.get(kind, {})
+            return [
+                self._create_entity(entity_class, entity_id, kind_entities[entity_id])
+                for entity_id in sorted(kind_entities)
+            ]
+
+    def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
+        """Finds a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self.get_multi(entity_class, [entity_id])[0]
+
+    def get_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date]
+    ) -> List[BE]:
+        """Finds the entities with a property matching a value, using the
+         indexes of the property
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: the comparison applied between the property and
+         the value, one of StorageValues.OPERATORS
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :returns: a list of entity matching the search criteria
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity,
+         or the operator is not valid
+        """
+
+        kind = self._get_kind(entity_class)
+        operator = operator.upper()
+        if operator not in StorageValues.OPERATORS:
+            raise ValueError("Operator {} is not supported".format(operator))
+        if operator in ("IN", "NOT_IN") and not isinstance(property_value, (list, tuple, set)):
+            raise ValueError("Operator {} requires a list of values".format(operator))
+
+        with self._lock:
+            kind_entities = self._entities.get(kind, {})
+            entity_ids: Collection[int]
+            if operator in ("=", "!=", "IN", "NOT_IN"):
+                entity_ids = self._find_in_hash_index(kind, property_name, operator, property_value)
+            else:
+                entity_ids = self._find_in_sorted_index(kind, property_name, operator, property_value)
+            return [
+                self._create_entity(entity_class, entity_id, kind_entities[entity_id])
+                for entity_id in sorted(entity_ids)
+            ]
+
+    def delete_all(self, entity_class: Type[BE]) -> None:
+        """Delete all the entiries of the given type
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        with self._lock:
+            self._entities.pop(kind, None)
+            for index_key in [index_key for index_key in self._hash_indexes if kind == index_key[0]]:
+                del self._hash_indexes[index_key]
+                del self._sorted_indexes[index_key]
+
+    def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
+        """Delete a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        self.delete_multi(entity_class, [entity_id])
+
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :returns: the entities, in the same order of the ids. None for the
+         ids without an entity
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        with self._lock:
+            kind_entities = self._entities.get(kind, {})
+            return [
+                self._create_entity(entity_class, entity_id, kind_entities[entity_id])
+                if entity_id in kind_entities else None
+                for entity_id in entity_ids
+            ]
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Save several entities in memory, or update existing ones
+
+        :param entities: the entities to save
+        :type entities: list of classes that inherit BaseEntity
+
+        :returns: the ids of the entities, in the same order
+        :rtype: list[int]
+
+        :raises: ValueError if one entity is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given classes are subclasses of BaseEntity
+        for entity in entities:
+            if not isinstance(entity, BaseEntity):
+                raise ValueError("Param entities has to contain only subclasses of BaseEntity")
+
+        # Converted outside the lock, and copied, so later changes to the
+        #  entities don't reach the storage
+        stored_entities = [
+            copy.deepcopy(StorageValues.encode_fields(entity.to_dict())) for entity in entities
+        ]
+        with self._lock:
+            for entity, stored_entity in zip(entities, stored_entities):
+                if BaseEntity.NO_ID == entity.id:
+                    entity.id = self._next_id
+                    self._next_id += 1
+                else:
+                    self._next_id = max(self._next_id, entity.id + 1)
+                kind = entity.get_entity_name()
+                kind_entities = self._entities.setdefault(kind, {})
+                self._unindex_entity(kind, entity.id, kind_entities.get(entity.id))
+                kind_entities[entity.id] = stored_entity
+                self._index_entity(kind, entity.id, stored_entity)
+        return [entity.id for entity in entities]
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Delete several entities given their ids
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        with self._lock:
+            kind_entities = self._entities.get(kind, {})
+            for entity_id in entity_ids:
+                self._unindex_entity(kind, entity_id, kind_entities.pop(entity_id, None))
+
+    def _find_in_hash_index(self, kind: str, property_name: str, operator: str, property_value: Any) -> Set[int]:
+        """Returns the ids of the entities matching an equality comparison.
+         To call with the lock held
+        """
+
+        hash_index = self._get_hash_index(kind, property_name)
+        if operator in ("IN", "NOT_IN"):
+            keys = [self._get_hash_key(StorageValues.to_json_value(value)) for value in property_value]
+        else:
+            keys = [self._get_hash_key(StorageValues.to_json_value(property_value))]
+        entity_ids: Set[int] = set()
+        for key in keys:
+            entity_ids |= hash_index.get(key, set())
+        if "=" == operator:
+            return entity_ids
+        if "IN" == operator:
+            # None in the list doesn't match the entities without the property
+            return entity_ids - hash_index.get(None, set()) if None in keys else entity_ids
+        # The entities without the property never match, unless != None
+        if not (None in keys and "!=" == operator):
+            entity_ids |= hash_index.get(None, set())
+        return set(self._entities.get(kind, {})) - entity_ids
+
+    def _find_in_sorted_index(self, kind: str, property_name: str, operator: str, property_value: Any) -> List[int]:
+        """Returns the ids of the entities matching an order comparison.
+         To call with the lock held
+        """
+
+        value = StorageValues.to_json_value(property_value)
+        sort_group = self._get_sort_group(value)
+        if sort_group is None:
+            # Not sortable, but still checked as the other storage services
+            kind_entities = self._entities.get(kind, {})
+            return [
+                entity_id for entity_id, (values, _) in kind_entities.items()
+                if StorageValues.matches(values.get(property_name), operator, property_value)
+            ]
+
+        sorted_index = self._get_sorted_index(kind, property_name).get(sort_group, [])
+        # (value,) is before, and (value, inf) after, all the ids of value
+        if "<" == operator:
+            return [entity_id for _, entity_id in sorted_index[:bisect.bisect_left(sorted_index, (value,))]]
+        if "<=" == operator:
+            return [entity_id for _, entity_id in sorted_index[:bisect.bisect_right(sorted_index, (value, float("inf")))]]
+        if ">" == operator:
+            return [entity_id for _, entity_id in sorted_index[bisect.bisect_right(sorted_index, (value, float("inf"))):]]
+        return [entity_id for _, entity_id in sorted_index[bisect.bisect_left(sorted_index, (value,)):]]
+
+    def _get_hash_index(self, kind: str, property_name: str) -> Dict[Hashable, Set[int]]:
+        """Returns the hash index of a property, built if missing. To call
+         with the lock held
+        """
+
+        if (kind, property_name) not in self._hash_indexes:
+            self._build_indexes(kind, property_name)
+        return self._hash_indexes[(kind, property_name)]
+
+    def _get_sorted_index(self, kind: str, property_name: str) -> Dict[str, List[Tuple[Any, int]]]:
+        """Returns the sorted index of a property, built if missing. To call
+         with the lock held
+        """
+
+        if (kind, property_name) not in self._sorted_indexes:
+            self._build_indexes(kind, property_name)
+        return self._sorted_indexes[(kind, property_name)]
+
+    def _build_indexes(self, kind: str, property_name: str) -> None:
+        """Builds both the indexes of a property, with all the entities of
+         the kind. To call with the lock held
+        """
+
+        self._logger.debug("Building the indexes of property {} of kind {}".format(property_name, kind))
+        hash_index: Dict[Hashable, Set[int]] = {}
+        sorted_index: Dict[str, List[Tuple[Any, int]]] = {}
+        for entity_id, (values, _) in self._entities.get(kind, {}).items():
+            value = values.get(property_name)
+            hash_index.setdefault(self._get_hash_key(value), set()).add(entity_id)
+            sort_group = self._get_sort_group(value)
+            if sort_group is not None:
+                sorted_index.setdefault(sort_group, []).append((value, entity_id))
+        for group_index in sorted_index.values():
+            group_index.sort()
+        self._hash_indexes[(kind, property_name)] = hash_index
+        self._sorted_indexes[(kind, property_name)] = sorted_index
+
+    def _index_entity(self, kind: str, entity_id: int, stored_entity: StoredEntity) -> None:
+        """Adds an entity to the indexes of its kind. To call with the lock
+         held
+        """
+
+        for index_kind, property_name in self._hash_indexes:
+            if kind != index_kind:
+                continue
+            value = stored_entity[0].get(property_name)
+            self._hash_indexes[(kind, property_name)].setdefault(self._get_hash_key(value), set()).add(entity_id)
+            sort_group = self._get_sort_group(value)
+            if sort_group is not None:
+                bisect.insort(
+                    self._sorted_indexes[(kind, property_name)].setdefault(sort_group, []),
+                    (value, entity_id)
+                )
+
+    def _unindex_entity(self, kind: str, entity_id: int, stored_entity: Optional[StoredEntity]) -> None:
+        """Removes an entity from the indexes of its kind. To call with the
+         lock held
+        """
+
+        if stored_entity is None:
+            return
+        for index_kind, property_name in self._hash_indexes:
+            if kind != index_kind:
+                continue
+            value = stored_entity[0].get(property_name)
+            self._hash_indexes[(kind, property_name)].get(self._get_hash_key(value), set()).discard(entity_id)
+            sort_group = self._get_sort_group(value)
+            if sort_group is not None:
+                group_index = self._sorted_indexes[(kind, property_name)].get(sort_group, [])
+                position = bisect.bisect_left(group_index, (value, entity_id))
+                if position < len(group_index) and (value, entity_id) == group_index[position]:
+                    del group_index[position]
+
+    def _get_hash_key(self, value: Any) -> Hashable:
+        """Returns a hashable key for a JSON value. Lists and dicts are
+         tagged, so they don't match tuples used in queries
+        """
+
+        if isinstance(value, list):
+            return ("list", tuple(self._get_hash_key(item) for item in value))
+        if isinstance(value, dict):
+            return ("dict", tuple(sorted((key, self._get_hash_key(item)) for key, item in value.items())))
+        # Other JSON values are strings, numbers, booleans or None
+        return cast(Hashable, value)
+
+    def _get_sort_group(self, value: Any) -> Optional[str]:
+        """Returns the group of values that can be sorted together, None if
+         the value can't be sorted
+        """
+
+        if isinstance(value, (int, float)) and value == value:  # NaN never matches
+            return MemoryStorageService.SORT_GROUP_NUMBER
+        if isinstance(value, str):
+            return MemoryStorageService.SORT_GROUP_STRING
+        return None
+
+    def _get_kind(self, entity_class: Type[BE]) -> str:
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+        return entity_class.get_entity_name()
+
+    def _create_entity(self, entity_class: Type[BE], entity_id: int, stored_entity: StoredEntity) -> BE:
+        """Instantiate a new entity using data kept in memory
+        """
+
+        values, types = stored_entity
+        new_entity = entity_class()
+        new_entity.from_dict(StorageValues.decode_fields(copy.deepcopy(values), types))
+        new_entity.id = entity_id
+        return new_entity
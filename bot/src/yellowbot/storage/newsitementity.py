@@ -3,7 +3,7 @@ https://docs.python.org/3/tutorial/datastructures.html#dictionaries
 """
 
 import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List
 from yellowbot.storage.baseentity import BaseEntity
 
 # Reference for the  type hint of the same (enclosing) class
@@ -16,6 +16,13 @@ class NewsItemEntity(BaseEntity):
     url: str
     last_check: datetime.datetime
     param1: str
+    etag: str  # HTTP validators returned by the server for the source
+    last_modified: str
+    content_hash: str  # Digest of the last content downloaded for the source
+    check_interval: int  # Adaptive polling, minutes between two checks
+    next_check: datetime.datetime
+    last_entry_date: datetime.datetime  # Newest entry found on the source, for adaptive polling
+    seen_ids: List[str]  # Digests of the latest entries found on the source
 
     def __init__(self) -> None:
         """
@@ -24,6 +31,13 @@ class NewsItemEntity(BaseEntity):
         self.url: None
         self.last_check: None
         self.param1: None
+        self.etag: None
+        self.last_modified: None
+        self.content_hash: None
+        self.check_interval: None
+        self.next_check: None
+        self.last_entry_date: None
+        self.seen_ids: None
 
     @staticmethod
     def get_entity_name() -> str:
@@ -45,6 +59,20 @@ class NewsItemEntity(BaseEntity):
             fields["last_check"] = self.last_check
         if hasattr(self, "param1"):
             fields["param1"] = self.param1
+        if hasattr(self, "etag"):
+            fields["etag"] = self.etag
+        if hasattr(self, "last_modified"):
+            fields["last_modified"] = self.last_modified
+        if hasattr(self, "content_hash"):
+            fields["content_hash"] = self.content_hash
+        if hasattr(self, "check_interval"):
+            fields["check_interval"] = self.check_interval
+        if hasattr(self, "next_check"):
+            fields["next_check"] = self.next_check
+        if hasattr(self, "last_entry_date"):
+            fields["last_entry_date"] = self.last_entry_date
+        if hasattr(self, "seen_ids"):
+            fields["seen_ids"] = self.seen_ids
         return fields
 
     def from_dict(self, source_dict: dict) -> 'NewsItemEntity':
@@ -57,6 +85,20 @@ class NewsItemEntity(BaseEntity):
             self.last_check = source_dict["last_check"]
         if "param1" in source_dict:
             self.param1 = source_dict["param1"]
+        if "etag" in source_dict:
+            self.etag = source_dict["etag"]
+        if "last_modified" in source_dict:
+            self.last_modified = source_dict["last_modified"]
+        if "content_hash" in source_dict:
+            self.content_hash = source_dict["content_hash"]
+        if "check_interval" in source_dict:
+            self.check_interval = source_dict["check_interval"]
+        if "next_check" in source_dict:
+            self.next_check = source_dict["next_check"]
+        if "last_entry_date" in source_dict:
+            self.last_entry_date = source_dict["last_entry_date"]
+        if "seen_ids" in source_dict:
+            self.seen_ids = source_dict["seen_ids"]
 
         return self
         
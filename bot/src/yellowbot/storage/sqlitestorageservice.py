@@ -0,0 +1,468 @@
+"""Implements storage service using an embedded SQLite database
+
+All the entities are in a single table, with their kind, their id and their
+ values as a JSON document, so new entities don't need any schema change.
+ Properties are read with json_extract, and every property used in a query
+ gets its own index on (kind, json_extract(data, property)), created the
+ first time the property is queried.
+
+The database uses the WAL journal mode, so readers don't block the writer,
+ and each thread has its own connection.
+
+Values are stored as JSON, converted by StorageValues, so dates and
+ datetimes can be compared in queries too.
+
+Docs:
+- https://www.sqlite.org/json1.html
+- https://www.sqlite.org/wal.html
+- https://www.sqlite.org/expridx.html
+"""
+
+import datetime
+import json
+import re
+import sqlite3
+import threading
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Set, Tuple, Type, Union, cast
+
+from yellowbot.loggingservice import LoggingService
+from yellowbot.storage.basestorageservice import BaseStorageService, BE
+from yellowbot.storage.baseentity import BaseEntity
+from yellowbot.storage.storagevalues import StorageValues
+
+
+class SqliteStorageService(BaseStorageService):
+    """This class implements the storage interface using SQLite
+
+    The name of the specific entity class is used as kind, as for Datastore
+    """
+
+    # Max ids in a single statement, SQLite default limit is 999 variables
+    MAX_IDS_PER_STATEMENT: ClassVar[int] = 500
+    # Entities read at a time by iter_* methods
+    PAGE_SIZE: ClassVar[int] = 500
+    # Operators accepted by Datastore, and their SQL version
+    OPERATORS: ClassVar[Dict[str, str]] = {
+        "=": "=",
+        "!=": "!=",
+        "<": "<",
+        "<=": "<=",
+        ">": ">",
+        ">=": ">=",
+        "IN": "IN",
+        "NOT_IN": "NOT IN"
+    }
+
+    def __init__(self, database_file: str) -> None:
+        """Initialize the class
+
+        :param database_file: file of the database, created if it doesn't exist
+        :type database_file: str
+        """
+
+        super().__init__()
+        self._logger = LoggingService.get_logger(__name__)
+        self._database_file = database_file
+        self._local = threading.local()
+        self._indexed_properties: Set[str] = set()
+        self._indexes_lock = threading.Lock()
+
+        connection = self._get_connection()
+        # Persistent, so it has to be set only once
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " types TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entities_kind ON entities (kind)")
+
+    def put(self, entity: BE) -> int:
+        """Save an entity in the database, or update an existing one
+
+        :param entity: the entity to save
+        :type entity: a class that inherits BaseEntity
+
+        :returns: the id of the entity
+        :rtype: int
+
+        :raises: ValueError if entity is not a subclass of BaseEntity
+        """
+
+        return self.put_multi([entity])[0]
+
+    def get_all(self, entity_class: Type[BE]) -> List[BE]:
+        """Returns all the entities for the given type
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return list(self.iter_all(entity_class))
+
+    def get_by_id(self, entity_class: Type[BE], entity_id: int) -> Optional[BE]:
+        """Finds a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        return self.get_multi(entity_class, [entity_id])[0]
+
+    def get_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date]
+    ) -> List[BE]:
+        """Finds the entities with a property matching a value
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: the comparison applied between the property and
+         the value, one of OPERATORS. IN and NOT_IN require a list of values
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :returns: a list of entity matching the search criteria
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity,
+         or the property name or the operator are not valid
+        """
+
+        return list(self.iter_by_property(entity_class, property_name, operator, property_value))
+
+    def delete_all(self, entity_class: Type[BE]) -> None:
+        """Delete all the entiries of the given type
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.info("Deleting all the entities of kind {}".format(kind))
+        with self._get_connection() as connection:
+            connection.execute("DELETE FROM entities WHERE kind = ?", (kind,))
+
+    def delete_by_id(self, entity_class: Type[BE], entity_id: int) -> None:
+        """Delete a specific entity given its id
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_id: the id of the entity
+        :type entity_id: int
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        self.delete_multi(entity_class, [entity_id])
+
+    def get_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> List[Optional[BE]]:
+        """Finds several entities given their ids, with one query for each
+         chunk of MAX_IDS_PER_STATEMENT ids
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :returns: the entities, in the same order of the ids. None for the
+         ids without an entity
+        :rtype: list
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.debug("Get {} entities of kind {}".format(len(entity_ids), kind))
+        connection = self._get_connection()
+        entities_by_id = {}
+        for ids_chunk in self._chunks(entity_ids, SqliteStorageService.MAX_IDS_PER_STATEMENT):
+            rows = connection.execute(
+                "SELECT id, data, types FROM entities WHERE kind = ? AND id IN ({})".format(",".join("?" * len(ids_chunk))),
+                [kind] + list(ids_chunk)
+            )
+            for row in rows:
+                entities_by_id[row[0]] = self._create_entity_from_row(entity_class, row)
+        return [entities_by_id.get(entity_id) for entity_id in entity_ids]
+
+    def put_multi(self, entities: List[BE]) -> List[int]:
+        """Save several entities in the database, or update existing ones,
+         in a single transaction
+
+        :param entities: the entities to save
+        :type entities: list of classes that inherit BaseEntity
+
+        :returns: the ids of the entities, in the same order
+        :rtype: list[int]
+
+        :raises: ValueError if one entity is not a subclass of BaseEntity
+        """
+
+        # Just to be sure the given classes are subclasses of BaseEntity
+        for entity in entities:
+            if not isinstance(entity, BaseEntity):
+                raise ValueError("Param entities has to contain only subclasses of BaseEntity")
+
+        self._logger.debug("Saving {} entities".format(len(entities)))
+        new_ids: List[int] = []
+        with self._get_connection() as connection:
+            for entity in entities:
+                values, value_types = StorageValues.encode_fields(entity.to_dict())
+                data, types = json.dumps(values), json.dumps(value_types)
+                if BaseEntity.NO_ID == entity.id:
+                    cursor = connection.execute(
+                        "INSERT INTO entities (kind, data, types) VALUES (?, ?, ?)",
+                        (entity.get_entity_name(), data, types)
+                    )
+                    # Always set after an INSERT
+                    new_ids.append(cast(int, cursor.lastrowid))
+                else:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entities (id, kind, data, types) VALUES (?, ?, ?, ?)",
+                        (entity.id, entity.get_entity_name(), data, types)
+                    )
+                    new_ids.append(entity.id)
+
+        # Only once the transaction is committed
+        for entity, entity_id in zip(entities, new_ids):
+            entity.id = entity_id
+        return new_ids
+
+    def delete_multi(self, entity_class: Type[BE], entity_ids: List[int]) -> None:
+        """Delete several entities given their ids, in a single transaction
+
+        :param entity_class: the class of the Entity to delete
+        :type entity_class: a subclass of BaseEntity
+
+        :param entity_ids: the ids of the entities
+        :type entity_ids: list[int]
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.debug("Delete {} entities of kind {}".format(len(entity_ids), kind))
+        with self._get_connection() as connection:
+            for ids_chunk in self._chunks(entity_ids, SqliteStorageService.MAX_IDS_PER_STATEMENT):
+                connection.execute(
+                    "DELETE FROM entities WHERE kind = ? AND id IN ({})".format(",".join("?" * len(ids_chunk))),
+                    [kind] + list(ids_chunk)
+                )
+
+    def iter_all(
+        self,
+        entity_class: Type[BE],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, all the entities for the given type,
+         reading a page of PAGE_SIZE entities at a time
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. The other properties are missing in the returned entities
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity
+        """
+
+        kind = self._get_kind(entity_class)
+        self._logger.info("Getting all the entities of kind {}".format(kind))
+        return self._limit_and_project(self._fetch_pages(entity_class, kind, "1", [], limit), None, projection)
+
+    def iter_by_property(
+        self,
+        entity_class: Type[BE],
+        property_name: str,
+        operator: str,
+        property_value: Union[int, str, bool, float, None, datetime.date],
+        limit: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[BE]:
+        """Returns, one at a time, the entities with a property matching a
+         value, reading a page of PAGE_SIZE entities at a time
+
+        :param entity_class: the final Entity where to put data
+        :type entity_class: a subclass of BaseEntity
+
+        :param property_name: the name of the property
+        :type property_name: str
+
+        :param operator: the comparison applied between the property and
+         the value, one of OPERATORS. IN and NOT_IN require a list of values
+        :type operator: str
+
+        :param property_value: the value to compare the property with
+        :type property_value: int, str, bool, float, NoneType, datetime.datetime
+
+        :param limit: max number of entities to return, None for all
+        :type limit: int
+
+        :param projection: names of the only properties to read, None for
+         all. The other properties are missing in the returned entities
+        :type projection: list[str]
+
+        :returns: an iterator over the entities
+        :rtype: iterator
+
+        :raises: ValueError if entity_class is not a subclass of BaseEntity,
+         or the property name or the operator are not valid
+        """
+
+        kind = self._get_kind(entity_class)
+        sql_operator = SqliteStorageService.OPERATORS.get(operator.upper())
+        if sql_operator is None:
+            raise ValueError("Operator {} is not supported".format(operator))
+        property_expression = self._get_property_expression(property_name)
+        self._logger.debug("Searching for entity of kind {} with {} {} ##{}## (## excluded)".format(
+            kind,
+            property_name,
+            operator,
+            property_value
+        ))
+        self._create_property_index(property_name)
+
+        if sql_operator in ("IN", "NOT IN"):
+            if not isinstance(property_value, (list, tuple, set)):
+                raise ValueError("Operator {} requires a list of values".format(operator))
+            values = [StorageValues.to_json_value(value) for value in property_value]
+            condition = "{} {} ({})".format(property_expression, sql_operator, ",".join("?" * len(values)))
+        elif property_value is None and sql_operator in ("=", "!="):
+            # In SQL, comparisons with NULL are never true. Entities without
+            #  the property are considered as having a None value
+            values = []
+            condition = "{} {}".format(property_expression, "IS NULL" if "=" == sql_operator else "IS NOT NULL")
+        else:
+            values = [StorageValues.to_json_value(property_value)]
+            condition = "{} {} ?".format(property_expression, sql_operator)
+        return self._limit_and_project(self._fetch_pages(entity_class, kind, condition, values, limit), None, projection)
+
+    def _fetch_pages(
+        self,
+        entity_class: Type[BE],
+        kind: str,
+        condition: str,
+        values: List[Any],
+        limit: Optional[int]
+    ) -> Iterator[BE]:
+        """Runs the query a page at a time, starting each page after the last
+         id of the previous one, so no statement is left open between pages
+        """
+
+        last_id = 0
+        returned = 0
+        while limit is None or returned < limit:
+            page_size = SqliteStorageService.PAGE_SIZE
+            if limit is not None:
+                page_size = min(page_size, limit - returned)
+            rows = self._get_connection().execute(
+                "SELECT id, data, types FROM entities WHERE kind = ? AND {} AND id > ? ORDER BY id LIMIT ?".format(
+                    condition),
+                [kind] + values + [last_id, page_size]
+            ).fetchall()
+            for row in rows:
+                yield self._create_entity_from_row(entity_class, row)
+            returned += len(rows)
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1][0]
+
+    def close(self) -> None:
+        """Closes the connection of the calling thread
+        """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Returns the connection of the calling thread, opened the first time
+        """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Waits for the other writers, instead of failing immediately
+            connection = sqlite3.connect(self._database_file, timeout=30)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get_kind(self, entity_class: Type[BE]) -> str:
+        # Just to be sure the given class is a subclass of BaseEntity
+        if not issubclass(entity_class, BaseEntity):
+            raise ValueError("Param entity_class has to be subclass of BaseEntity")
+        return entity_class.get_entity_name()
+
+    def _get_property_expression(self, property_name: str) -> str:
+        """Returns the SQL expression that reads a property
+
+        :raises: ValueError if the property name is not a valid identifier,
+         as it's part of the SQL statement
+        """
+
+        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", property_name or ""):
+            raise ValueError("Property name {} is not valid".format(property_name))
+        return "json_extract(data, '$.{}')".format(property_name)
+
+    def _create_property_index(self, property_name: str) -> None:
+        """Creates the index of a property, if not already done
+        """
+
+        with self._indexes_lock:
+            if property_name in self._indexed_properties:
+                return
+            self._logger.info("Creating the index of property {}".format(property_name))
+            with self._get_connection() as connection:
+                connection.execute("CREATE INDEX IF NOT EXISTS entities_property_{} ON entities (kind, {})".format(
+                    property_name,
+                    self._get_property_expression(property_name)
+                ))
+            self._indexed_properties.add(property_name)
+
+    def _create_entity_from_row(self, entity_class: Type[BE], row: Tuple[int, str, str]) -> BE:
+        """Instantiate a new entity using data from the database
+        """
+
+        new_entity = entity_class()
+        new_entity.from_dict(StorageValues.decode_fields(json.loads(row[1]), json.loads(row[2])))
+        new_entity.id = row[0]
+        return new_entity
+
+    def _chunks(self, items: list, chunk_size: int) -> Iterator[list]:
+        """Split a list in consecutive chunks of, at most, chunk_size items
+        """
+
+        for start in range(0, len(items), chunk_size):
+            yield items[start:start + chunk_size]
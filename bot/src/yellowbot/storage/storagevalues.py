@@ -0,0 +1,139 @@
+"""Conversion and comparison of entity values, for the storage services that
+ save entities as JSON documents
+
+Dates and datetimes are not JSON types, so they are stored as ISO 8601
+ strings, datetimes converted to UTC and always with microseconds, so two
+ stored values compare as the dates they represent. The types of these
+ fields are kept aside, to convert them back when the entity is read.
+
+The comparisons follow the Datastore semantics, as close as possible:
+ entities whose property is missing, or of a different type, never match,
+ apart from the = and != comparisons with None.
+"""
+
+import datetime
+from typing import Any, ClassVar, Dict, Tuple
+
+
+class StorageValues:
+    """Helpers to store entity values as JSON, and to compare them
+    """
+
+    TYPE_DATETIME: ClassVar[str] = "datetime"
+    TYPE_DATE: ClassVar[str] = "date"
+    # Operators accepted by Datastore
+    OPERATORS: ClassVar[Tuple[str, ...]] = ("=", "!=", "<", "<=", ">", ">=", "IN", "NOT_IN")
+
+    @staticmethod
+    def to_json_value(value: Any) -> Any:
+        """Converts a value to the format used in the JSON documents
+        """
+
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            # Always with microseconds, so strings can be compared
+            return value.isoformat(timespec="microseconds")
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def encode_fields(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Converts the fields of an entity to JSON values
+
+        :param fields: the fields of the entity, as returned by to_dict
+        :type fields: dict
+
+        :returns: the JSON values, and the types of the fields that are not
+         JSON types
+        :rtype: dict, dict
+        """
+
+        values = {}
+        types = {}
+        for name, value in fields.items():
+            if isinstance(value, datetime.datetime):
+                types[name] = StorageValues.TYPE_DATETIME
+            elif isinstance(value, datetime.date):
+                types[name] = StorageValues.TYPE_DATE
+            values[name] = StorageValues.to_json_value(value)
+        return values, types
+
+    @staticmethod
+    def decode_fields(values: Dict[str, Any], types: Dict[str, str]) -> Dict[str, Any]:
+        """Converts the JSON values back to the fields of an entity, with
+         datetimes in UTC, as Datastore returns them
+
+        :param values: the JSON values
+        :type values: dict
+
+        :param types: the types of the fields that are not JSON types
+        :type types: dict
+
+        :returns: the fields, to use with from_dict
+        :rtype: dict
+        """
+
+        fields = dict(values)
+        for name, field_type in types.items():
+            if fields.get(name) is None:
+                continue
+            if StorageValues.TYPE_DATETIME == field_type:
+                fields[name] = datetime.datetime.fromisoformat(fields[name]).replace(tzinfo=datetime.timezone.utc)
+            elif StorageValues.TYPE_DATE == field_type:
+                fields[name] = datetime.date.fromisoformat(fields[name])
+        return fields
+
+    @staticmethod
+    def matches(stored_value: Any, operator: str, property_value: Any) -> bool:
+        """Compares a stored JSON value with the value of a query
+
+        :raises: ValueError if the operator is not supported, or IN and
+         NOT_IN are not used with a list of values
+
+        :param stored_value: the JSON value of the property, None if the
+         entity doesn't have the property
+        :type stored_value: any
+
+        :param operator: one of OPERATORS
+        :type operator: str
+
+        :param property_value: the value of the query, not yet converted
+        :type property_value: any
+
+        :returns: True if the stored value satisfies the comparison
+        :rtype: bool
+        """
+
+        operator = operator.upper()
+        if operator not in StorageValues.OPERATORS:
+            raise ValueError("Operator {} is not supported".format(operator))
+        if operator in ("IN", "NOT_IN"):
+            if not isinstance(property_value, (list, tuple, set)):
+                raise ValueError("Operator {} requires a list of values".format(operator))
+            if stored_value is None:
+                return False
+            values = [StorageValues.to_json_value(value) for value in property_value]
+            return (stored_value in values) == ("IN" == operator)
+
+        value = StorageValues.to_json_value(property_value)
+        if value is None and operator in ("=", "!="):
+            return (stored_value is None) == ("=" == operator)
+        if stored_value is None or value is None:
+            return False
+        try:
+            if "=" == operator:
+                return bool(stored_value == value)
+            if "!=" == operator:
+                return bool(stored_value != value)
+            if "<" == operator:
+                return bool(stored_value < value)
+            if "<=" == operator:
+                return bool(stored_value <= value)
+            if ">" == operator:
+                return bool(stored_value > value)
+            return bool(stored_value >= value)
+        except TypeError:
+            # Values of different types, like a string and a number
+            return False
@@ -0,0 +1,89 @@
+"""
+https://docs.python.org/3/tutorial/datastructures.html#dictionaries
+"""
+
+import datetime
+from typing import Any, Dict
+from yellowbot.storage.baseentity import BaseEntity
+
+
+class WebSubSubscriptionEntity(BaseEntity):
+    """Entity to store the WebSub subscription of a news source
+    """
+
+    subscription_id: str  # Last part of the callback url, identifies the subscription
+    news_source: str  # Url of the news source, as in the configuration
+    hub: str
+    topic: str
+    secret: str  # Used by the hub to sign the notifications
+    state: str  # One of the WebSubSubscriber.STATE_* values
+    lease_until: datetime.datetime  # When the hub stops sending notifications
+    next_attempt: datetime.datetime  # When the subscription is requested, or renewed, again
+
+    def __init__(self) -> None:
+        """
+        """
+        super().__init__()  # Sets fundamental entity properties
+        self.subscription_id: None
+        self.news_source: None
+        self.hub: None
+        self.topic: None
+        self.secret: None
+        self.state: None
+        self.lease_until: None
+        self.next_attempt: None
+
+    @staticmethod
+    def get_entity_name() -> str:
+        """Returns the name of the class only, not the package + name
+        """
+        return "WebSubSubscriptionEntity"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Transform the entity values in a dict
+
+        :returns: a dict containing the entity values
+        :rtype: dict
+        """
+
+        fields: Dict[str, Any] = {}
+        if hasattr(self, "subscription_id"):
+            fields["subscription_id"] = self.subscription_id
+        if hasattr(self, "news_source"):
+            fields["news_source"] = self.news_source
+        if hasattr(self, "hub"):
+            fields["hub"] = self.hub
+        if hasattr(self, "topic"):
+            fields["topic"] = self.topic
+        if hasattr(self, "secret"):
+            fields["secret"] = self.secret
+        if hasattr(self, "state"):
+            fields["state"] = self.state
+        if hasattr(self, "lease_until"):
+            fields["lease_until"] = self.lease_until
+        if hasattr(self, "next_attempt"):
+            fields["next_attempt"] = self.next_attempt
+        return fields
+
+    def from_dict(self, source_dict: dict) -> 'WebSubSubscriptionEntity':
+        """Fill the entity data from a dict
+        """
+        if "subscription_id" in source_dict:
+            self.subscription_id = source_dict["subscription_id"]
+        if "news_source" in source_dict:
+            self.news_source = source_dict["news_source"]
+        if "hub" in source_dict:
+            self.hub = source_dict["hub"]
+        if "topic" in source_dict:
+            self.topic = source_dict["topic"]
+        if "secret" in source_dict:
+            self.secret = source_dict["secret"]
+        if "state" in source_dict:
+            self.state = source_dict["state"]
+        if "lease_until" in source_dict:
+            # While saving to Datastore, a DatetimeWithNanoseconds is returned instead of a Datetime.date
+            self.lease_until = source_dict["lease_until"]
+        if "next_attempt" in source_dict:
+            self.next_attempt = source_dict["next_attempt"]
+
+        return self
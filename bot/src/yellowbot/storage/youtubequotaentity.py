@@ -0,0 +1,57 @@
+"""
+https://docs.python.org/3/tutorial/datastructures.html#dictionaries
+"""
+
+from typing import Any, Dict
+from yellowbot.storage.baseentity import BaseEntity
+
+
+class YouTubeQuotaEntity(BaseEntity):
+    """Entity to store the YouTube Data API quota used in a day
+    """
+
+    day: str  # YYYY-MM-DD, in Pacific time, when the YouTube quota resets
+    units: int  # Quota units used in the day
+    calls: int  # API calls sent in the day
+
+    def __init__(self) -> None:
+        """
+        """
+        super().__init__()  # Sets fundamental entity properties
+        self.day: None
+        self.units: None
+        self.calls: None
+
+    @staticmethod
+    def get_entity_name() -> str:
+        """Returns the name of the class only, not the package + name
+        """
+        return "YouTubeQuotaEntity"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Transform the entity values in a dict
+
+        :returns: a dict containing the entity values
+        :rtype: dict
+        """
+
+        fields: Dict[str, Any] = {}
+        if hasattr(self, "day"):
+            fields["day"] = self.day
+        if hasattr(self, "units"):
+            fields["units"] = self.units
+        if hasattr(self, "calls"):
+            fields["calls"] = self.calls
+        return fields
+
+    def from_dict(self, source_dict: dict) -> 'YouTubeQuotaEntity':
+        """Fill the entity data from a dict
+        """
+        if "day" in source_dict:
+            self.day = source_dict["day"]
+        if "units" in source_dict:
+            self.units = source_dict["units"]
+        if "calls" in source_dict:
+            self.calls = source_dict["calls"]
+
+        return self
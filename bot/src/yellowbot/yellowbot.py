@@ -3,6 +3,9 @@
 
 from re import M
 from sys import exc_info
+import os
+import tempfile
+import time
 from typing import Any, Dict, List, Optional
 from yellowbot.configservice import ConfigService
 from yellowbot.gears.basegear import BaseGear
@@ -14,11 +17,17 @@ from yellowbot.gears.sendmessagegear import SendMessageGear
 from yellowbot.gears.weathergear import WeatherGear
 from yellowbot.gears.newsreportergear import NewsReportGear
 from yellowbot.globalbag import GlobalBag
+from yellowbot.httpcacheservice import HttpCacheService
+from yellowbot.httpsessionservice import Http2SessionService, HttpSessionService
 from yellowbot.loggingservice import LoggingService
 from yellowbot.nluengine import NluEngine
 from yellowbot.schedulerservice import SchedulerService
 from yellowbot.storage.datastorestorageservice import DatastoreStorageService
 from yellowbot.storage.basestorageservice import BaseStorageService
+from yellowbot.storage.cachingstorageservice import CachingStorageService
+from yellowbot.storage.logstorageservice import LogStorageService
+from yellowbot.storage.memorystorageservice import MemoryStorageService
+from yellowbot.storage.sqlitestorageservice import SqliteStorageService
 from yellowbot.surfaces.surfacemessage import SurfaceMessage
 
 
@@ -81,13 +90,44 @@ class YellowBot:
         :type test_mode: bool
         """
 
+        # Shared cache for the HTTP responses, disabled by default
+        http_cache = None
+        http_cache_max_size = self._config_service.get_config("http_cache_max_size", False) or 0
+        if http_cache_max_size > 0 and not test_mode:
+            http_cache = HttpCacheService(
+                self._config_service.get_config("http_cache_folder", False)
+                    or os.path.join(tempfile.gettempdir(), "yellowbot_http_cache"),
+                http_cache_max_size * 1024 * 1024
+            )
+
+        # Shared pooled keep-alive sessions, disabled by default
+        http_session: Optional[HttpSessionService] = None
+        http_pool_size = self._config_service.get_config("http_pool_size", False) or 0
+        if http_pool_size > 0:
+            http_session_args = (
+                http_pool_size,
+                self._config_service.get_config("http_max_retries", False) or 0,
+                self._config_service.get_config("http_retry_backoff", False) or 0.5
+            )
+            if "http2" == self._config_service.get_config("http_backend", False):
+                try:
+                    http_session = Http2SessionService(*http_session_args)
+                except ImportError as err:
+                    self._logger.exception("HTTP/2 backend not available, using HTTP/1.1: {}".format(err))
+            if http_session is None:
+                http_session = HttpSessionService(*http_session_args)
+
         self._gears.append(MusicGear(
             self._config_service.get_config("tracemusic_destination_url"),
-            test_mode
+            test_mode,
+            http_session
         ))
         self._gears.append(EchoMessageGear())
         self._gears.append(WeatherGear(
-            self._config_service.get_config("darksky_api")
+            self._config_service.get_config("darksky_api"),
+            http_cache,
+            self._config_service.get_config("weather_http_cache_ttl", False),
+            http_session
         ))
         #self._gears.append(EasyNidoGear(
         #    self._config_service.get_config("easynido_username"),
@@ -108,13 +148,74 @@ class YellowBot:
         ))
 
         # CheckForNews gear
-        storage_service = DatastoreStorageService() if not test_mode else BaseStorageService()
+        storage_service = self._create_storage_service(test_mode)
+        # In-memory cache in front of the storage, disabled by default
+        storage_cache_max_entities = self._config_service.get_config("storage_cache_max_entities", False) or 0
+        if storage_cache_max_entities > 0:
+            storage_service = CachingStorageService(
+                storage_service,
+                storage_cache_max_entities,
+                self._config_service.get_config("storage_cache_max_queries", False) or 100,
+                self._config_service.get_config("storage_cache_ttl", False) or 60,
+                self._config_service.get_config("storage_cache_kind_ttls", False)
+            )
         self._gears.append(NewsReportGear(
             self._config_service.get_config("youtube_api"),
             self._config_service.get_config("newssources_urls"),
-            storage_service
+            storage_service,
+            self._config_service.get_config("newssources_max_workers", False) or 1,
+            self._config_service.get_config("newssources_fetch_mode", False) or NewsReportGear.FETCH_MODE_THREADS,
+            self._config_service.get_config("newssources_max_connections_per_host", False) or 4,
+            bool(self._config_service.get_config("youtube_use_feed", False)),
+            self._config_service.get_config("feed_stop_after_old_entries", False) or 0,
+            self._config_service.get_config("newssources_min_check_interval", False) or 0,
+            self._config_service.get_config("newssources_max_check_interval", False) or 0,
+            self._config_service.get_config("newssources_breaker_failures", False) or 0,
+            self._config_service.get_config("newssources_breaker_cooldown", False) or 60,
+            self._config_service.get_config("newssources_connect_timeout", False) or 5,
+            self._config_service.get_config("newssources_read_timeout", False) or 20,
+            self._config_service.get_config("checkfornews_deadline", False) or 0,
+            self._config_service.get_config("feed_parse_processes", False) or 0,
+            http_cache,
+            self._config_service.get_config("newssources_http_cache_ttl", False),
+            http_session,
+            self._config_service.get_config("websub_callback_url", False),
+            self._config_service.get_config("websub_lease_seconds", False) or 864000,
+            self._config_service.get_config("youtube_daily_budget", False) or 0
         ))
 
+    def _create_storage_service(self, test_mode: bool) -> BaseStorageService:
+        """Creates the storage service used by the gears
+
+        :param test_mode: class instance created for test purposes, some
+        features are disabled
+        :type test_mode: bool
+
+        :returns: the storage service set in the configuration, Datastore
+         by default, and in memory in test mode
+        :rtype: BaseStorageService
+        """
+
+        storage_backend = self._config_service.get_config("storage_backend", False)
+        if test_mode or "memory" == storage_backend:
+            return MemoryStorageService()
+        if "sqlite" == storage_backend:
+            return SqliteStorageService(
+                self._config_service.get_config("storage_sqlite_file", False)
+                    or os.path.join(os.path.dirname(__file__), GlobalBag.SQLITE_DATABASE_FILE)
+            )
+        if "log" == storage_backend:
+            return LogStorageService(
+                self._config_service.get_config("storage_log_file", False)
+                    or os.path.join(os.path.dirname(__file__), GlobalBag.LOG_DATABASE_FILE),
+                self._config_service.get_config("storage_log_min_garbage_size", False)
+                    or LogStorageService.DEFAULT_MIN_GARBAGE_SIZE,
+                self._config_service.get_config("storage_log_garbage_ratio", False)
+                    or LogStorageService.DEFAULT_GARBAGE_RATIO,
+                self._config_service.get_config("storage_log_fsync", False) or False
+            )
+        return DatastoreStorageService()
+
     def get_config(
         self,
         key_to_read: str,
@@ -260,12 +361,65 @@ class YellowBot:
             surface_message.channel_id,
             output_messages)
 
-    def tick_scheduler(self):
+    def receive_websub_notification(
+        self,
+        subscription_id: str,
+        content: bytes,
+        signature: Optional[str]
+    ) -> None:
+        """Process the content pushed by a WebSub hub for a news source.
+        New contents are sent to the same surface of the scheduled news checks
+
+        :param subscription_id: the id of the subscription, from the callback url
+        :type subscription_id: str
+
+        :param content: the raw body of the request
+        :type content: bytes
+
+        :param signature: the X-Hub-Signature header of the request
+        :type signature: str
+        """
+
+        execution_result = self.process_intent(
+            GlobalBag.WEBSUB_NOTIFICATION_INTENT,
+            {
+                GlobalBag.WEBSUB_PARAM_SUBSCRIPTION_ID: subscription_id,
+                GlobalBag.WEBSUB_PARAM_CONTENT: content,
+                GlobalBag.WEBSUB_PARAM_SIGNATURE: signature
+            }
+        )
+        if not execution_result.went_well() or not execution_result.has_messages():
+            return
+
+        for task in self._scheduler.get_tasks():
+            if GlobalBag.CHECKFORNEWS_INTENT == task.intent and task.surface is not None:
+                self._send_multiple_messages_to_a_surface(
+                    task.surface.surface_id,
+                    task.surface.channel_id,
+                    execution_result.get_messages())
+                return
+        self._logger.warning("No scheduled news check with a surface, pushed news are not sent: {}".format(
+            execution_result.get_messages()
+        ))
+
+    def tick_scheduler(self, max_duration: Optional[int] = None):
         """Check for tasks to run for the scheduler service and, in case, executes them.
 
         Right now, only the hour is taken into account
+
+        The whole run has a max duration, so it doesn't overlap with the next
+         one: tasks not started in time are skipped, and news checks receive
+         the time left as deadline
+
+        :param max_duration: max seconds for the run. If None, the
+         scheduler_max_duration config value is used
+        :type max_duration: int
         """
 
+        if max_duration is None:
+            max_duration = self._config_service.get_config("scheduler_max_duration", False) or 3000
+        end_time = time.monotonic() + max_duration
+
         check_time = self._scheduler.get_current_datetime()
         self._logger.info("Processing scheduler for time {}".format(check_time))
 
@@ -276,15 +430,23 @@ class YellowBot:
         else:
             # Executes them
             for task in tasks:
+                remaining_time = int(end_time - time.monotonic())
+                if remaining_time <= 0:
+                    self._logger.warning("Scheduler run out of time, skipping task {}".format(task.name))
+                    continue
+                params = task.params
+                if GlobalBag.CHECKFORNEWS_INTENT == task.intent and GlobalBag.CHECKFORNEWS_PARAM_DEADLINE not in (params or {}):
+                    params = dict(params or {})
+                    params[GlobalBag.CHECKFORNEWS_PARAM_DEADLINE] = remaining_time
                 self._logger.info("Executing scheduler task {}".format(task.name))
-                execution_result = self.process_intent(task.intent, task.params)
+                execution_result = self.process_intent(task.intent, params)
 
                 if task.surface is not None:
                     self._logger.debug("Task executed, sending the result to the surface {} channel_id {}")
                     output_messages = None
                     # If the intent has returned something, use that text, otherwise the default
                     #  text in the configuration file
-                    if execution_result.has_messages:
+                    if execution_result.has_messages():
                         output_messages = execution_result.get_messages()
                     else:
                         if task.default_message: